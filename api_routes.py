@@ -1,6 +1,9 @@
-from flask import jsonify, request, session, flash, redirect, url_for
+from flask import jsonify, request, session, flash, redirect, url_for, Response, stream_with_context
 from app import app, db
-from models import Player, PlayerBadge, Badge, ASCENDData, GameMode, ASCENDHistory, ShopItem, ShopPurchase, CustomTitle, PlayerTitle, PlayerGradientSetting, Quest, PlayerQuest, Achievement, PlayerAchievement, Candidate, CandidateReaction
+from models import Player, PlayerBadge, Badge, ASCENDData, GameMode, ASCENDHistory, ShopItem, ShopCatalog, ShopPurchase, InventoryItem, CustomTitle, PlayerTitle, PlayerGradientSetting, Quest, PlayerQuest, Achievement, PlayerAchievement, Candidate, CandidateReaction, LeaderboardSnapshot, DiscordLink, BotEvent
+import csv
+import hmac
+import io
 import json
 from datetime import datetime
 
@@ -31,24 +34,23 @@ def api_leaderboard():
     try:
         sort_by = request.args.get('sort', 'experience')
         limit = min(int(request.args.get('limit', 50)), 100)
+        include_delta = request.args.get('include_delta') in ('1', 'true')
 
-        players = Player.get_leaderboard(sort_by=sort_by, limit=limit) or []
+        rows = Player.get_leaderboard_page(sort_by=sort_by, limit=limit)
 
-        # Convert players to dict format
+        # Convert rows to the public API shape
+        fields = ('id', 'nickname', 'level', 'experience', 'kills', 'final_kills', 'deaths',
+                  'beds_broken', 'wins', 'games_played', 'karma', 'kd_ratio', 'win_rate')
         players_data = []
-        for player in players:
-            players_data.append({
-                'id': player.id,
-                'nickname': player.nickname,
-                'level': player.level,
-                'experience': player.experience,
-                'kills': player.kills,
-                'deaths': player.deaths,
-                'wins': player.wins,
-                'games_played': player.games_played,
-                'kd_ratio': player.kd_ratio,
-                'win_rate': player.win_rate
-            })
+        for rank, row in enumerate(rows, 1):
+            player = {'rank': rank}
+            player.update((field, row[field]) for field in fields)
+            players_data.append(player)
+
+        if include_delta and sort_by in LeaderboardSnapshot.SORT_KEYS:
+            deltas = LeaderboardSnapshot.rank_deltas(sort_by, [player['id'] for player in players_data])
+            for player in players_data:
+                player['rank_delta'] = deltas.get(player['id'])
 
         return jsonify({
             'success': True,
@@ -110,40 +112,10 @@ def purchase_shop_item():
         if not shop_item or not shop_item.is_active:
             return jsonify({'success': False, 'error': 'Товар не найден'})
 
-        # Check if already purchased
-        existing_purchase = ShopPurchase.query.filter_by(
-            player_id=player.id,
-            item_id=item_id
-        ).first()
-
-        if existing_purchase:
-            return jsonify({'success': False, 'error': 'Товар уже куплен'})
-
-        # Check level requirement
-        if player.level < shop_item.unlock_level:
-            return jsonify({'success': False, 'error': f'Требуется {shop_item.unlock_level} уровень'})
-
-        # Check currency
-        if shop_item.price_coins > 0 and player.coins < shop_item.price_coins:
-            return jsonify({'success': False, 'error': 'Недостаточно койнов'})
-
-        if shop_item.price_reputation > 0 and player.reputation < shop_item.price_reputation:
-            return jsonify({'success': False, 'error': 'Недостаточно репутации'})
-
-        # Process purchase
-        if shop_item.price_coins > 0:
-            player.coins -= shop_item.price_coins
-        if shop_item.price_reputation > 0:
-            player.reputation -= shop_item.price_reputation
-
-        # Create purchase record
-        purchase = ShopPurchase(
-            player_id=player.id,
-            item_id=item_id,
-            price_paid_coins=shop_item.price_coins,
-            price_paid_reputation=shop_item.price_reputation
-        )
-        db.session.add(purchase)
+        # Debit currency and record the purchase atomically
+        success, error_msg, purchase = ShopPurchase.purchase(player, shop_item)
+        if not success:
+            return jsonify({'success': False, 'error': error_msg})
 
         # Apply item effects
         success, message = shop_item.apply_item_effect(player)
@@ -339,6 +311,90 @@ def get_ascend_data_alt(player_id, gamemode='bedwars'):
             'error': str(e)
         }), 500
 
+@app.route('/api/ascend/<int:player_id>/<gamemode>/card.png')
+def api_ascend_card_image(player_id, gamemode):
+    """ASCEND card as PNG, rendered once per evaluation and revalidated by ETag"""
+    from ascend_card import PIL_AVAILABLE, card_renderer, card_key, card_etag, card_from_ascend
+
+    if not PIL_AVAILABLE:
+        return jsonify({'success': False, 'error': 'Card rendering is unavailable'}), 503
+
+    row = db.session.query(ASCENDData, Player.nickname).join(
+        Player, Player.id == ASCENDData.player_id
+    ).filter(ASCENDData.player_id == player_id, ASCENDData.gamemode == gamemode).first()
+    if not row:
+        return jsonify({'success': False, 'error': 'ASCEND data not found'}), 404
+
+    ascend, nickname = row
+    key = card_key(player_id, gamemode, ascend.updated_at)
+    etag = card_etag(key)
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        try:
+            png = card_renderer.render(key, card_from_ascend(nickname, ascend.to_dict()))
+        except Exception as e:
+            app.logger.error(f"Error rendering ASCEND card: {e}")
+            return jsonify({'success': False, 'error': 'Failed to render card'}), 500
+        response = app.response_class(png, mimetype='image/png')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    return response
+
+@app.route('/avatar/<nickname>/<int:size>')
+def avatar_image(nickname, size):
+    """Player head from the local avatar cache, so pages never wait on mc-heads.net"""
+    from avatars import PIL_AVAILABLE, AVATAR_SIZES, AVATAR_DEFAULT_NICKNAME, NICKNAME_PATTERN, avatar_store
+
+    if not PIL_AVAILABLE:
+        return jsonify({'success': False, 'error': 'Avatars are unavailable'}), 503
+    if size not in AVATAR_SIZES:
+        return jsonify({'success': False, 'error': f"size must be one of {', '.join(map(str, AVATAR_SIZES))}"}), 400
+    if not NICKNAME_PATTERN.match(nickname):
+        nickname = AVATAR_DEFAULT_NICKNAME
+
+    try:
+        avatar = avatar_store.get(nickname, size)
+    except Exception as e:
+        app.logger.error(f"Error loading avatar for {nickname}: {e}")
+        avatar = None
+    if avatar is None:
+        return jsonify({'success': False, 'error': 'Avatar is unavailable'}), 502
+
+    png, etag = avatar
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(png, mimetype='image/png')
+    response.set_etag(etag)
+    # Heads rarely change; the store refreshes them in the background
+    response.headers['Cache-Control'] = 'public, max-age=86400, stale-while-revalidate=604800'
+    return response
+
+@app.route('/api/player/<int:player_id>/history')
+def api_player_history(player_id):
+    """Player counters over time as chart-ready arrays"""
+    try:
+        from models import PlayerStatSnapshot
+        from cache import Cache
+
+        days = min(int(request.args.get('days', 30)), 3650)
+        cache_key = f'player:{player_id}:history:{days}'
+        series = Cache.get(cache_key)
+        if series is None:
+            series = PlayerStatSnapshot.get_series(player_id, days)
+            Cache.set(cache_key, series, 60)
+
+        return jsonify({'success': True, 'player_id': player_id, 'days': days, **series})
+    except Exception as e:
+        app.logger.error(f"Error getting player history: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/player/<int:player_id>/ascend-history')
 def api_get_ascend_history(player_id):
     """Get ASCEND evaluation history for player"""
@@ -418,21 +474,15 @@ def api_global_leaderboard():
         gamemode = request.args.get('gamemode', 'bedwars')
         limit = min(int(request.args.get('limit', 50)), 100)
 
-        # Get top players by average score in gamemode
-        leaderboard = db.session.query(
-            ASCENDData,
-            Player,
-            ((ASCENDData.skill1_score + ASCENDData.skill2_score +
-              ASCENDData.skill3_score + ASCENDData.skill4_score) / 4).label('avg_score')
-        ).join(Player, ASCENDData.player_id == Player.id).filter(
+        # Get top players by stored average score, an index scan on (gamemode, avg_score)
+        leaderboard = db.session.query(ASCENDData, Player).join(
+            Player, ASCENDData.player_id == Player.id
+        ).filter(
             ASCENDData.gamemode == gamemode
-        ).order_by(
-            ((ASCENDData.skill1_score + ASCENDData.skill2_score +
-              ASCENDData.skill3_score + ASCENDData.skill4_score) / 4).desc()
-        ).limit(limit).all()
+        ).order_by(ASCENDData.avg_score.desc()).limit(limit).all()
 
         result = []
-        for ascend, player, avg_score in leaderboard:
+        for ascend, player in leaderboard:
             result.append({
                 'rank': len(result) + 1,
                 'player': {
@@ -442,7 +492,7 @@ def api_global_leaderboard():
                     'skin_url': player.minecraft_skin_url
                 },
                 'ascend': ascend.to_dict(),
-                'average_score': round(avg_score, 1)
+                'average_score': round(ascend.avg_score, 1)
             })
 
         return jsonify({
@@ -461,119 +511,23 @@ def api_global_leaderboard():
 def api_gamemode_leaderboard():
     """API endpoint for gamemode-specific leaderboard"""
     try:
-        gamemode = request.args.get('gamemode', 'bedwars')
-        limit = min(int(request.args.get('limit', 50)), 100)
-
-        leaderboard_data = []
-
-        if gamemode == 'bedwars':
-            players = Player.query.filter(Player.experience > 0).order_by(Player.experience.desc()).limit(limit).all()
-
-            for idx, player in enumerate(players, 1):
-                leaderboard_data.append({
-                    'rank': idx,
-                    'id': player.id,
-                    'nickname': player.nickname,
-                    'level': player.level,
-                    'experience': player.experience,
-                    'kills': player.kills,
-                    'final_kills': player.final_kills,
-                    'deaths': player.deaths,
-                    'final_deaths': player.final_deaths,
-                    'beds_broken': player.beds_broken,
-                    'wins': player.wins,
-                    'games_played': player.games_played,
-                    'kd_ratio': player.kd_ratio,
-                    'fkd_ratio': player.fkd_ratio,
-                    'win_rate': player.win_rate,
-                    'role': player.display_role,
-                    'skin_url': player.minecraft_skin_url
-                })
-
-        elif gamemode == 'kitpvp':
-            players = Player.query.filter(Player.kitpvp_kills > 0).order_by(Player.kitpvp_kills.desc()).limit(limit).all()
-
-            for idx, player in enumerate(players, 1):
-                kd = round(player.kitpvp_kills / player.kitpvp_deaths, 2) if player.kitpvp_deaths > 0 else player.kitpvp_kills
-                leaderboard_data.append({
-                    'rank': idx,
-                    'id': player.id,
-                    'nickname': player.nickname,
-                    'kills': player.kitpvp_kills,
-                    'deaths': player.kitpvp_deaths,
-                    'kd_ratio': kd,
-                    'role': player.display_role,
-                    'skin_url': player.minecraft_skin_url
-                })
-
-        elif gamemode == 'skywars':
-            players = Player.query.filter(Player.skywars_wins > 0).order_by(Player.skywars_wins.desc()).limit(limit).all()
-
-            for idx, player in enumerate(players, 1):
-                leaderboard_data.append({
-                    'rank': idx,
-                    'id': player.id,
-                    'nickname': player.nickname,
-                    'wins': player.skywars_wins,
-                    'solo_wins': player.skywars_solo_wins,
-                    'team_wins': player.skywars_team_wins,
-                    'mega_wins': player.skywars_mega_wins,
-                    'mini_wins': player.skywars_mini_wins,
-                    'ranked_wins': player.skywars_ranked_wins,
-                    'kills': player.skywars_kills,
-                    'solo_kills': player.skywars_solo_kills,
-                    'team_kills': player.skywars_team_kills,
-                    'mega_kills': player.skywars_mega_kills,
-                    'mini_kills': player.skywars_mini_kills,
-                    'ranked_kills': player.skywars_ranked_kills,
-                    'role': player.display_role,
-                    'skin_url': player.minecraft_skin_url
-                })
-
-        elif gamemode == 'sumo':
-            players = Player.query.filter(Player.sumo_games_played > 0).order_by(Player.sumo_wins.desc()).limit(limit).all()
-
-            for idx, player in enumerate(players, 1):
-                leaderboard_data.append({
-                    'rank': idx,
-                    'id': player.id,
-                    'nickname': player.nickname,
-                    'level': player.level,
-                    'role': player.display_role,
-                    'games_played': player.sumo_games_played,
-                    'monthly_games': player.sumo_monthly_games,
-                    'daily_games': player.sumo_daily_games,
-                    'deaths': player.sumo_deaths,
-                    'monthly_deaths': player.sumo_monthly_deaths,
-                    'daily_deaths': player.sumo_daily_deaths,
-                    'wins': player.sumo_wins,
-                    'monthly_wins': player.sumo_monthly_wins,
-                    'daily_wins': player.sumo_daily_wins,
-                    'losses': player.sumo_losses,
-                    'monthly_losses': player.sumo_monthly_losses,
-                    'daily_losses': player.sumo_daily_losses,
-                    'kills': player.sumo_kills,
-                    'monthly_kills': player.sumo_monthly_kills,
-                    'daily_kills': player.sumo_daily_kills,
-                    'winstreak': player.sumo_winstreak,
-                    'monthly_winstreak': player.sumo_monthly_winstreak,
-                    'daily_winstreak': player.sumo_daily_winstreak,
-                    'best_winstreak': player.sumo_best_winstreak,
-                    'monthly_best_winstreak': player.sumo_monthly_best_winstreak,
-                    'daily_best_winstreak': player.sumo_daily_best_winstreak,
-                    'role': player.display_role,
-                    'skin_url': player.minecraft_skin_url
-                })
+        from models import GameModeManager
 
+        gamemode = request.args.get('gamemode', 'bedwars')
+        limit = min(max(1, int(request.args.get('limit', 50))), 100)
+        cursor = request.args.get('cursor')
 
-        # Remove unsupported game modes (fireball_fight, bridge, bridgefight)
-        # Only support: bedwars, kitpvp, skywars, sumo
+        try:
+            page = GameModeManager.get_leaderboard_page(gamemode, limit, cursor)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
 
         return jsonify({
             'success': True,
             'gamemode': gamemode,
-            'players': leaderboard_data,
-            'total': len(leaderboard_data)
+            'players': page['players'],
+            'next_cursor': page['next_cursor'],
+            'total': len(page['players'])
         })
 
     except Exception as e:
@@ -586,6 +540,33 @@ def api_gamemode_leaderboard():
             'total': 0
         }), 500
 
+@app.route('/api/period-leaderboard')
+def api_period_leaderboard():
+    """Daily, weekly, monthly or seasonal gains leaderboard for any gamemode"""
+    try:
+        from models import StatRollup
+        from cache import Cache
+
+        gamemode = request.args.get('gamemode', 'bedwars')
+        stat = request.args.get('stat', 'wins')
+        period = request.args.get('period', 'day')
+        limit = min(int(request.args.get('limit', 50)), 100)
+
+        cache_key = f'leaderboard:period:{gamemode}:{stat}:{period}:{limit}'
+        board = Cache.get(cache_key)
+        if board is None:
+            try:
+                board = StatRollup.get_leaderboard(gamemode, stat, period, limit)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            Cache.set(cache_key, board, 60)
+
+        return jsonify({'success': True, 'gamemode': gamemode, 'stat': stat, **board})
+
+    except Exception as e:
+        app.logger.error(f"Error in period leaderboard API: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/player/<int:player_id>/gamemode-stats/<gamemode>')
 def api_player_gamemode_stats(player_id, gamemode):
     """Get player statistics for specific gamemode"""
@@ -684,19 +665,19 @@ def api_save_ascend_data(player_id):
         ascend_data.skill4_tier = ascend_data.gamesense_tier = data.get('gamesense_tier', calculate_tier_from_score(ascend_data.skill4_score))
 
         # Calculate overall tier
+        ascend_data.avg_score = ascend_data.calculate_average_score()
         if 'overall_tier' in data:
             ascend_data.overall_tier = data['overall_tier']
         else:
-            avg_score = (ascend_data.skill1_score + ascend_data.skill2_score +
-                        ascend_data.skill3_score + ascend_data.skill4_score) / 4
-            ascend_data.overall_tier = calculate_tier_from_score(avg_score)
+            ascend_data.overall_tier = calculate_tier_from_score(ascend_data.avg_score)
 
         ascend_data.comment = data.get('comment', '')
         ascend_data.evaluator_name = data.get('evaluator_name', 'Elite Squad')
         ascend_data.updated_at = datetime.utcnow()
 
-        # Update global rank
-        ascend_data.update_global_rank()
+        # Recompute global ranks for the whole gamemode
+        db.session.flush()
+        ASCENDData.recompute_global_ranks([ascend_data.gamemode])
 
         db.session.commit()
 
@@ -782,9 +763,8 @@ def api_import_ascend_data(player_id):
                     ascend_data.skill4_tier = tier
 
         # Calculate overall tier
-        avg_score = (ascend_data.skill1_score + ascend_data.skill2_score +
-                    ascend_data.skill3_score + ascend_data.skill4_score) / 4
-        ascend_data.overall_tier = calculate_tier_from_score(avg_score)
+        ascend_data.avg_score = ascend_data.calculate_average_score()
+        ascend_data.overall_tier = calculate_tier_from_score(ascend_data.avg_score)
 
         # Update legacy fields
         ascend_data.pvp_score = ascend_data.skill1_score
@@ -801,8 +781,9 @@ def api_import_ascend_data(player_id):
         ascend_data.comment = data.get('comment', 'Imported data')
         ascend_data.updated_at = datetime.utcnow()
 
-        # Update global rank
-        ascend_data.update_global_rank()
+        # Recompute global ranks for the whole gamemode
+        db.session.flush()
+        ASCENDData.recompute_global_ranks([ascend_data.gamemode])
 
         db.session.commit()
 
@@ -819,6 +800,180 @@ def api_import_ascend_data(player_id):
             'error': str(e)
         }), 500
 
+def parse_ascend_bulk_records(rows, default_gamemode='bedwars'):
+    """Validate bulk ASCEND rows in one pass.
+
+    Each row names a player (player_id or nickname), a gamemode and up to four
+    scores given as skillN_score, legacy pvp_score/clutching_score/... columns
+    or the gamemode's skill names. A row may instead carry a "gamemodes" dict
+    of {gamemode: scores}. Returns (records, errors).
+    """
+    from models import GameModeManager
+    legacy_keys = {'pvp_score': 1, 'clutching_score': 2, 'block_placement_score': 3, 'gamesense_score': 4}
+
+    # Flatten nested {"gamemodes": {...}} rows first
+    flat_rows = []
+    for row_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            flat_rows.append((row_number, None))
+        elif isinstance(row.get('gamemodes'), dict):
+            for gamemode, scores in row['gamemodes'].items():
+                entry = {k: v for k, v in row.items() if k != 'gamemodes'}
+                entry.update(scores if isinstance(scores, dict) else {})
+                entry['gamemode'] = gamemode
+                flat_rows.append((row_number, entry))
+        else:
+            flat_rows.append((row_number, row))
+
+    # Resolve players and gamemodes with one query each
+    nicknames = {str(row.get('nickname')).strip().lower() for _, row in flat_rows if row and row.get('nickname')}
+    ids = set()
+    for _, row in flat_rows:
+        if row and row.get('player_id') not in (None, ''):
+            try:
+                ids.add(int(row['player_id']))
+            except (TypeError, ValueError):
+                pass
+
+    players_by_id = {}
+    players_by_nickname = {}
+    if ids or nicknames:
+        for player_id, nickname in db.session.query(Player.id, Player.nickname).filter(
+                db.or_(Player.id.in_(ids), db.func.lower(Player.nickname).in_(nicknames))).all():
+            players_by_id[player_id] = player_id
+            players_by_nickname[nickname.lower()] = player_id
+
+    skill_names = {
+        mode.name: {
+            mode.skill1_name.lower(): 1, mode.skill2_name.lower(): 2,
+            mode.skill3_name.lower(): 3, mode.skill4_name.lower(): 4
+        }
+        for mode in GameMode.query.all()
+    }
+    known_gamemodes = set(GameModeManager.GAMEMODE_MODELS) | set(skill_names)
+
+    records = []
+    errors = []
+    seen = set()
+    for row_number, row in flat_rows:
+        if row is None:
+            errors.append({'row': row_number, 'error': 'Row must be an object'})
+            continue
+
+        player_id = None
+        if row.get('player_id') not in (None, ''):
+            try:
+                player_id = players_by_id.get(int(row['player_id']))
+            except (TypeError, ValueError):
+                pass
+        elif row.get('nickname'):
+            player_id = players_by_nickname.get(str(row['nickname']).strip().lower())
+        if player_id is None:
+            errors.append({'row': row_number, 'error': 'Player not found'})
+            continue
+
+        gamemode = str(row.get('gamemode') or default_gamemode).strip().lower()
+        if gamemode not in known_gamemodes:
+            errors.append({'row': row_number, 'error': f'Unknown gamemode: {gamemode}'})
+            continue
+        mode_skills = skill_names.get(gamemode, {})
+
+        scores = {}
+        row_error = None
+        for key, value in row.items():
+            if value in (None, ''):
+                continue
+            normalized = str(key).strip().lower()
+            number = None
+            if normalized.startswith('skill') and normalized.endswith('_score') and normalized[5:-6].isdigit():
+                number = int(normalized[5:-6])
+            elif normalized in legacy_keys:
+                number = legacy_keys[normalized]
+            elif normalized in mode_skills:
+                number = mode_skills[normalized]
+            if number is None or not 1 <= number <= 4:
+                continue
+            try:
+                score = int(float(value))
+            except (TypeError, ValueError, OverflowError):
+                # OverflowError: "inf" parses as a float but has no int value
+                row_error = f'Invalid score for {key}'
+                break
+            if not 0 <= score <= 100:
+                row_error = f'Score for {key} must be between 0 and 100'
+                break
+            scores[number] = score
+
+        if row_error:
+            errors.append({'row': row_number, 'error': row_error})
+            continue
+        if not scores:
+            errors.append({'row': row_number, 'error': 'No scores provided'})
+            continue
+        if (player_id, gamemode) in seen:
+            errors.append({'row': row_number, 'error': f'Duplicate entry for {gamemode}'})
+            continue
+        seen.add((player_id, gamemode))
+
+        records.append({
+            'player_id': player_id,
+            'gamemode': gamemode,
+            'scores': scores,
+            'comment': row.get('comment') or None,
+            'evaluator_name': row.get('evaluator_name') or None
+        })
+
+    return records, errors
+
+@app.route('/api/ascend/bulk-import', methods=['POST'])
+def api_bulk_import_ascend_data():
+    """Import a whole ASCEND evaluation session from CSV or JSON (admin only)"""
+    if not session.get('is_admin', False):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 403
+
+    try:
+        upload = request.files.get('file')
+        options = request.form if upload else request.get_json(silent=True)
+        if options is None:
+            options = {}
+        if not isinstance(options, dict):
+            return jsonify({'success': False, 'error': 'JSON body must be an object with a "players" list'}), 400
+        default_gamemode = options.get('gamemode', 'bedwars')
+        evaluator_name = options.get('evaluator_name') or 'Elite Squad AI (Import)'
+
+        if upload:
+            content = upload.read().decode('utf-8-sig')
+            if upload.filename.lower().endswith('.csv') or not content.lstrip().startswith(('[', '{')):
+                rows = list(csv.DictReader(io.StringIO(content)))
+            else:
+                rows = json.loads(content)
+        else:
+            rows = options
+
+        if isinstance(rows, dict):
+            rows = rows.get('players') or rows.get('records') or []
+        if not rows:
+            return jsonify({'success': False, 'error': 'No import data provided'}), 400
+        if not isinstance(rows, list):
+            return jsonify({'success': False, 'error': 'Import data must be a list of players'}), 400
+
+        records, errors = parse_ascend_bulk_records(rows, default_gamemode)
+        if errors:
+            return jsonify({'success': False, 'error': 'Validation failed', 'errors': errors}), 400
+
+        summary = ASCENDData.bulk_import(records, evaluator_name=evaluator_name)
+        db.session.commit()
+
+        return jsonify({'success': True, **summary})
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'Invalid file: {e}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error bulk importing ASCEND data: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # Target List API endpoints
 @app.route('/api/targets', methods=['GET'])
 def api_get_targets():
@@ -1389,6 +1544,183 @@ def api_candidate_react(candidate_id):
 
 # New API endpoints for Discord bot integration
 
+def is_bot_request():
+    """True for admin sessions and requests carrying the configured bot token"""
+    if session.get('is_admin', False):
+        return True
+    token = app.config.get('BOT_API_TOKEN')
+    provided = request.headers.get('X-Bot-Token', '')
+    return bool(token) and hmac.compare_digest(provided, token)
+
+BULK_PLAYERS_MAX = 1000
+BULK_PLAYER_COLUMNS = (Player.id, Player.nickname, Player.kills, Player.deaths, Player.beds_broken)
+
+def bulk_player_row(player_id, nickname, kills, deaths, beds_broken, discord_user_id=None):
+    """Fields determine_clan_role and check_prestige_roles read, from a projected row"""
+    row = {
+        'id': player_id,
+        'nickname': nickname,
+        'kills': kills or 0,
+        'deaths': deaths or 0,
+        'beds_broken': beds_broken or 0,
+        'kd_ratio': round(kills / deaths, 2) if deaths else (kills or 0)
+    }
+    if discord_user_id is not None:
+        row['discord_user_id'] = discord_user_id
+    return row
+
+@app.route('/api/players/bulk')
+def api_players_bulk():
+    """Role-relevant stats for many players in one query.
+
+    ?ids=1,2,3 or ?nicknames=a,b (case-insensitive), up to BULK_PLAYERS_MAX.
+    ?linked=1 streams every player with a Discord link as NDJSON.
+    """
+    if request.args.get('linked') in ('1', 'true'):
+        if not is_bot_request():
+            return jsonify({'success': False, 'error': 'Access denied'}), 403
+
+        query = db.session.query(*BULK_PLAYER_COLUMNS, DiscordLink.discord_user_id).join(
+            DiscordLink, DiscordLink.player_id == Player.id
+        ).order_by(Player.id).yield_per(500)
+
+        def generate():
+            for row in query:
+                yield json.dumps(bulk_player_row(*row), ensure_ascii=False) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    ids = [part for part in request.args.get('ids', '').split(',') if part.strip()]
+    nicknames = [part.strip().lower() for part in request.args.get('nicknames', '').split(',') if part.strip()]
+    if not ids and not nicknames:
+        return jsonify({'success': False, 'error': 'ids or nicknames is required'}), 400
+    if len(ids) + len(nicknames) > BULK_PLAYERS_MAX:
+        return jsonify({'success': False, 'error': f'At most {BULK_PLAYERS_MAX} players per request'}), 400
+    try:
+        ids = [int(part) for part in ids]
+    except ValueError:
+        return jsonify({'success': False, 'error': 'ids must be integers'}), 400
+
+    conditions = []
+    if ids:
+        conditions.append(Player.id.in_(ids))
+    if nicknames:
+        conditions.append(db.func.lower(Player.nickname).in_(nicknames))
+    rows = db.session.query(*BULK_PLAYER_COLUMNS).filter(db.or_(*conditions)).all()
+
+    return jsonify({'success': True, 'players': [bulk_player_row(*row) for row in rows]})
+
+@app.route('/api/players/karma')
+def api_players_karma():
+    """Players at risk by karma.
+
+    ?below=N (default BotEvent.KARMA_WARNING_THRESHOLD) lists every player
+    under the threshold; ?since=<checked_at of an earlier response> instead
+    lists only players whose karma changed after it, flagged with at_risk.
+    Follow next_cursor until it is null.
+    """
+    try:
+        below = int(request.args.get('below', BotEvent.KARMA_WARNING_THRESHOLD))
+        limit = min(max(1, int(request.args.get('limit', 100))), 500)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'below and limit must be integers'}), 400
+
+    since = request.args.get('since')
+    if since:
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'since must be an ISO timestamp'}), 400
+
+    checked_at = datetime.utcnow()
+    try:
+        page = Player.get_karma_page(below, limit, request.args.get('cursor'), since or None)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    return jsonify({
+        'success': True,
+        'below': below,
+        'players': page['players'],
+        'next_cursor': page['next_cursor'],
+        'checked_at': checked_at.isoformat()
+    })
+
+@app.route('/api/bot/events')
+def api_bot_events():
+    """Poll the bot event queue.
+
+    ?ack=1,2,3 acknowledges (deletes) the events the bot has handled; the
+    response holds the oldest unacknowledged ones. Answers immediately: the
+    bot polls on an interval rather than parking a sync worker on a wait.
+    """
+    if not is_bot_request():
+        return jsonify({'success': False, 'error': 'Access denied'}), 403
+
+    try:
+        ack = [int(part) for part in request.args.get('ack', '').split(',') if part.strip()]
+        limit = min(max(1, int(request.args.get('limit', 100))), 500)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'ack and limit must be integers'}), 400
+    if len(ack) > 500:
+        return jsonify({'success': False, 'error': 'At most 500 ids per ack'}), 400
+
+    BotEvent.acknowledge(ack)
+    db.session.commit()
+
+    events = BotEvent.pending(limit)
+    return jsonify({
+        'success': True,
+        'events': [event.to_dict() for event in events]
+    })
+
+@app.route('/api/discord/links')
+def api_discord_links():
+    """All Discord account links, for the bot's member lookup"""
+    if not is_bot_request():
+        return jsonify({'success': False, 'error': 'Access denied'}), 403
+
+    from sqlalchemy.orm import joinedload
+    links = DiscordLink.query.options(joinedload(DiscordLink.player)).all()
+    return jsonify({'success': True, 'links': [link.to_dict() for link in links]})
+
+@app.route('/api/discord/link', methods=['POST'])
+def api_discord_link():
+    """Link a Discord account to a player by player_id or nickname"""
+    if not is_bot_request():
+        return jsonify({'success': False, 'error': 'Access denied'}), 403
+
+    try:
+        data = request.get_json() or {}
+        discord_user_id = str(data.get('discord_user_id') or '').strip()
+        if not discord_user_id.isdigit():
+            return jsonify({'success': False, 'error': 'discord_user_id is required'}), 400
+
+        if data.get('player_id'):
+            player = Player.query.get(data['player_id'])
+        else:
+            player = Player.query.filter(Player.nickname.ilike(data.get('nickname') or '')).first()
+        if not player:
+            return jsonify({'success': False, 'error': 'Player not found'}), 404
+
+        link = DiscordLink.link(discord_user_id, player, linked_by=data.get('linked_by') or 'admin')
+        db.session.commit()
+        return jsonify({'success': True, 'link': link.to_dict()})
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error linking Discord account: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/discord/link/<discord_user_id>', methods=['DELETE'])
+def api_discord_unlink(discord_user_id):
+    """Remove a Discord account link"""
+    if not is_bot_request():
+        return jsonify({'success': False, 'error': 'Access denied'}), 403
+
+    removed = DiscordLink.query.filter_by(discord_user_id=discord_user_id).delete()
+    db.session.commit()
+    return jsonify({'success': True, 'removed': removed})
+
 @app.route('/api/shop/purchase', methods=['POST'])
 def api_purchase_shop_item():
     """API endpoint for purchasing shop items (Discord bot integration)"""
@@ -1410,29 +1742,14 @@ def api_purchase_shop_item():
         if not shop_item:
             return jsonify({'success': False, 'message': f'Товар "{item_name}" не найден'}), 404
 
-        # Check if can purchase
-        can_purchase, error_msg = shop_item.can_purchase(player)
-        if not can_purchase:
+        # Debit currency and record the purchase atomically
+        success, error_msg, purchase = ShopPurchase.purchase(player, shop_item)
+        if not success:
             return jsonify({'success': False, 'message': error_msg}), 400
 
-        # Process purchase
         coins_spent = shop_item.price_coins
         reputation_spent = shop_item.price_reputation
 
-        if shop_item.price_coins > 0:
-            player.coins -= shop_item.price_coins
-        if shop_item.price_reputation > 0:
-            player.reputation -= shop_item.price_reputation
-
-        # Create purchase record
-        purchase = ShopPurchase(
-            player_id=player.id,
-            item_id=shop_item.id,
-            price_paid_coins=shop_item.price_coins,
-            price_paid_reputation=shop_item.price_reputation
-        )
-        db.session.add(purchase)
-
         # Apply item effects
         success, message = shop_item.apply_item_effect(player)
 
@@ -1531,8 +1848,8 @@ def api_apply_item(player_id):
 def api_shop_items():
     """API endpoint to get all shop items (Discord bot integration)"""
     try:
-        # Get all active shop items
-        items = ShopItem.query.filter_by(is_active=True).all()
+        # Get all active shop items from the catalog snapshot
+        items = ShopCatalog.get()['items']
 
         items_data = []
         for item in items:
@@ -1566,44 +1883,53 @@ def api_shop_items():
 def api_player_inventory(player_id):
     """API endpoint to get player inventory (Discord bot integration)"""
     try:
-        player = Player.query.get(player_id)
+        player = db.session.query(Player.coins, Player.reputation, Player.experience).filter(
+            Player.id == player_id
+        ).first()
         if not player:
             return jsonify({'success': False, 'message': 'Игрок не найден'}), 404
 
-        # Get purchased items
-        purchases = ShopPurchase.query.filter_by(player_id=player_id).all()
-
-        inventory = {
-            'titles': [],
-            'themes': [],
-            'gradients': [],
-            'boosters': [],
-            'roles': [],
-            'other': []
-        }
-
-        for purchase in purchases:
-            item = purchase.shop_item
-            item_data = {
-                'id': item.id,
-                'name': item.name,
-                'display_name': item.display_name,
-                'category': item.category,
-                'purchased_at': purchase.purchased_at.isoformat(),
-                'rarity': item.rarity
-            }
-
-            if item.category in inventory:
-                inventory[item.category].append(item_data)
-            else:
-                inventory['other'].append(item_data)
+        # Counted items live in InventoryItem; titles, themes and other items
+        # applied at purchase time only leave a ShopPurchase row
+        held = dict(db.session.query(InventoryItem.item_id, InventoryItem.quantity).filter(
+            InventoryItem.player_id == player_id
+        ).all())
+        rows = db.session.query(
+            ShopItem.id, ShopItem.name, ShopItem.display_name, ShopItem.category, ShopItem.rarity,
+            db.func.count(ShopPurchase.id).label('purchases'),
+            db.func.max(ShopPurchase.purchased_at).label('purchased_at')
+        ).outerjoin(
+            ShopPurchase, db.and_(ShopPurchase.item_id == ShopItem.id, ShopPurchase.player_id == player_id)
+        ).filter(
+            db.or_(ShopItem.id.in_(list(held)), ShopPurchase.id.isnot(None))
+        ).group_by(
+            ShopItem.id, ShopItem.name, ShopItem.display_name, ShopItem.category, ShopItem.rarity
+        ).order_by(ShopItem.id).all()
+
+        inventory = {}
+        items = []
+        for row in rows:
+            quantity = held.get(row.id, row.purchases)
+            if not quantity:
+                continue
+            inventory.setdefault(row.category, {})[str(row.id)] = quantity
+            items.append({
+                'id': row.id,
+                'name': row.name,
+                'display_name': row.display_name,
+                'category': row.category,
+                'rarity': row.rarity,
+                'quantity': quantity,
+                'purchased_at': row.purchased_at.isoformat() if row.purchased_at else None
+            })
 
         return jsonify({
             'success': True,
             'inventory': inventory,
+            'items': items,
             'coins': player.coins,
             'reputation': player.reputation,
-            'level': player.level
+            'level': Player.level_for_experience(player.experience)
         })
 
     except Exception as e:
@@ -26,6 +26,9 @@ app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
+# Shared secret the Discord bot sends as X-Bot-Token for bot-only endpoints
+app.config["BOT_API_TOKEN"] = os.environ.get("BOT_API_TOKEN")
+
 # Configure the database
 database_url = os.environ.get("DATABASE_URL")
 if database_url and database_url.startswith("postgres://"):
@@ -49,6 +52,10 @@ with app.app_context():
     # Register translation filter
     from translations import register_translation_filter
     register_translation_filter(app)
+
+    # Built static bundles (/assets) and the asset_url/page_stylesheets template helpers
+    import assets
+    assets.init_app(app)
     
     # Create all tables
     db.create_all()
@@ -0,0 +1,210 @@
+"""ASCEND card images rendered with Pillow in a process pool.
+
+Used by the web app (/api/ascend/<id>/<gamemode>/card.png) and by the
+Discord bot's /ascend visual mode. Rendering never runs on the caller's
+thread or event loop; finished PNGs are cached per evaluation.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+    PIL_AVAILABLE = False
+
+# Bump when the layout changes so cached cards and ETags are replaced
+CARD_VERSION = 1
+CARD_SIZE = (800, 420)
+FONT_PATHS = (
+    os.environ.get('ASCEND_CARD_FONT'),
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    'DejaVuSans-Bold.ttf',
+)
+TIER_COLORS = {
+    'S+': (255, 23, 68), 'S': (255, 87, 34),
+    'A+': (255, 152, 0), 'A': (255, 193, 7),
+    'B+': (76, 175, 80), 'B': (33, 150, 243),
+    'C+': (156, 39, 176), 'C': (96, 125, 139),
+    'D': (121, 85, 72)
+}
+DEFAULT_TIER_COLOR = (96, 125, 139)
+
+# Per worker process, filled by _init_worker
+_fonts = None
+_template = None
+
+
+def _load_font(size):
+    for path in FONT_PATHS:
+        if not path:
+            continue
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def _init_worker():
+    """Load fonts and draw the static card background once per worker"""
+    global _fonts, _template
+    _fonts = {
+        'title': _load_font(40),
+        'tier': _load_font(72),
+        'label': _load_font(22),
+        'small': _load_font(16),
+    }
+
+    width, height = CARD_SIZE
+    template = Image.new('RGB', CARD_SIZE, (18, 18, 28))
+    draw = ImageDraw.Draw(template)
+    for y in range(height):
+        shade = int(18 + 22 * y / height)
+        draw.line([(0, y), (width, y)], fill=(shade, shade, shade + 14))
+    draw.rounded_rectangle([10, 10, width - 10, height - 10], radius=18, outline=(255, 215, 0), width=3)
+    draw.text((30, height - 40), 'Elite Squad ASCEND', font=_fonts['small'], fill=(150, 150, 170))
+    _template = template
+
+
+def _centered(draw, box, text, font, fill):
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    x = box[0] + (box[2] - box[0] - (right - left)) / 2 - left
+    y = box[1] + (box[3] - box[1] - (bottom - top)) / 2 - top
+    draw.text((x, y), text, font=font, fill=fill)
+
+
+def render_card(card):
+    """Render a card dict (see card_from_ascend) to PNG bytes"""
+    if _template is None:
+        _init_worker()
+
+    width, _ = CARD_SIZE
+    image = _template.copy()
+    draw = ImageDraw.Draw(image)
+    color = TIER_COLORS.get(card['overall_tier'], DEFAULT_TIER_COLOR)
+
+    draw.text((30, 28), card['nickname'], font=_fonts['title'], fill=(255, 255, 255))
+    draw.text((30, 80), card['gamemode'].replace('_', ' ').title(), font=_fonts['label'], fill=(170, 170, 190))
+
+    badge = (width - 200, 30, width - 30, 170)
+    draw.rounded_rectangle(badge, radius=16, fill=color)
+    _centered(draw, badge, card['overall_tier'], _fonts['tier'], (255, 255, 255))
+    _centered(draw, (badge[0], 178, badge[2], 206), f"{card['avg_score']:.1f}/100", _fonts['label'], (230, 230, 240))
+
+    bar_right = width - 240
+    for index, (name, tier, score) in enumerate(card['skills']):
+        y = 128 + index * 58
+        skill_color = TIER_COLORS.get(tier, DEFAULT_TIER_COLOR)
+        draw.text((30, y), name, font=_fonts['label'], fill=(230, 230, 240))
+        draw.text((bar_right - 110, y), f'{tier}  {score}', font=_fonts['label'], fill=skill_color)
+        draw.rounded_rectangle([30, y + 32, bar_right, y + 44], radius=6, fill=(48, 48, 64))
+        filled = 30 + (bar_right - 30) * max(0, min(score, 100)) / 100
+        if filled > 36:
+            draw.rounded_rectangle([30, y + 32, filled, y + 44], radius=6, fill=skill_color)
+
+    if card.get('evaluator_name'):
+        _centered(draw, (badge[0] - 40, 360, badge[2], 390), card['evaluator_name'], _fonts['small'], (150, 150, 170))
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def card_from_ascend(nickname, ascend):
+    """Picklable card description from ASCENDData.to_dict() output"""
+    skills = [
+        (ascend.get(f'skill{n}_name') or '', ascend.get(f'skill{n}_tier') or 'D', ascend.get(f'skill{n}_score') or 0)
+        for n in range(1, 5)
+    ]
+    avg_score = ascend.get('avg_score')
+    return {
+        'nickname': nickname,
+        'gamemode': ascend.get('gamemode') or 'bedwars',
+        'overall_tier': ascend.get('overall_tier') or 'D',
+        'skills': skills,
+        'avg_score': avg_score if avg_score is not None else sum(skill[2] for skill in skills) / 4,
+        'evaluator_name': ascend.get('evaluator_name'),
+    }
+
+
+def card_key(player_id, gamemode, updated_at):
+    """Cache key of one evaluation's card; updated_at may be a datetime or ISO string"""
+    if hasattr(updated_at, 'isoformat'):
+        updated_at = updated_at.isoformat()
+    return f'{player_id}:{gamemode}:{updated_at}:{CARD_VERSION}'
+
+
+def card_etag(key):
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+class CardRenderer:
+    """Process pool for render_card plus an LRU of finished PNGs.
+
+    max_workers=0 renders inline, which is only meant for tests and tools.
+    """
+
+    def __init__(self, max_workers=None, cache_size=256):
+        if max_workers is None:
+            max_workers = int(os.environ.get('ASCEND_CARD_WORKERS', 2))
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self._pool = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+            return self._pool
+
+    def cached(self, key):
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+            return png
+
+    def _store(self, key, png):
+        with self._lock:
+            self._cache[key] = png
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def render(self, key, card):
+        """Blocking render for request threads; the work itself runs in the pool"""
+        png = self.cached(key)
+        if png is None:
+            png = self._executor().submit(render_card, card).result() if self.max_workers else render_card(card)
+            self._store(key, png)
+        return png
+
+    async def render_async(self, key, card):
+        """Render without blocking the event loop"""
+        import asyncio
+
+        png = self.cached(key)
+        if png is None:
+            if self.max_workers:
+                png = await asyncio.get_running_loop().run_in_executor(self._executor(), render_card, card)
+            else:
+                png = render_card(card)
+            self._store(key, png)
+        return png
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+card_renderer = CardRenderer()
@@ -0,0 +1,437 @@
+"""Static asset pipeline: minified, fingerprinted, precompressed bundles.
+
+`python build_assets.py` writes static/dist/ with a manifest.json mapping
+logical names ('js/main.js', 'css/base.css') to content-hashed files, each
+with .gz (and .br when the brotli package is installed) siblings. They are
+served from /assets/ with immutable caching.
+
+style.css is split per page: rules whose classes only appear in one
+template go to css/pages/<template>.css, everything else (element
+selectors, keyframes, classes used by base.html, the shared scripts or
+Python code, and classes nothing references) stays in css/base.css.
+
+Templates call asset_url() and page_stylesheets(); without a build both
+fall back to the source files under /static, so development needs no step.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+from flask import abort, request, send_file, url_for
+from jinja2 import pass_context
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT_DIR, 'static')
+TEMPLATES_DIR = os.path.join(ROOT_DIR, 'templates')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+ASSET_URL_PREFIX = '/assets'
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+STYLESHEET = 'css/style.css'
+BASE_TEMPLATE = 'base.html'
+SHARED_BUNDLE = 'css/base.css'
+PAGE_BUNDLE = 'css/pages/{}.css'
+# critical.js loads main.js on every page, so their class names count as shared
+SHARED_SCRIPTS = ('js/critical.js', 'js/main.js', 'js/i18n.js')
+# Python modules that build markup or class names
+SHARED_SOURCES = ('routes.py', 'api_routes.py', 'models.py', 'translations.py')
+# Copied through minify + fingerprint as they are
+STANDALONE_ASSETS = (
+    'css/critical.css',
+    'js/critical.js',
+    'js/main.js',
+    'js/i18n.js',
+    'js/gallery.js',
+    'js/target-list.js',
+    'js/custom-role-preview.js',
+)
+
+_CSS_STRING_OR_COMMENT = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.S)
+_CSS_STRING = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_CSS_GROUPING_RULES = ('@media', '@supports', '@container', '@layer')
+_SELECTOR_NAMES = re.compile(r'[.#](-?[A-Za-z_][\w-]*)')
+_WORDS = re.compile(r'[A-Za-z0-9_-]+')
+_NEGATION = re.compile(r':not\([^)]*\)')
+_FORGIVING_SELECTORS = re.compile(r':(?:is|where|has)\(')
+# class="tier-{{ tier }}", `rank-${n}`, 'role-' + name
+_DYNAMIC_PREFIX = re.compile(r'([A-Za-z][\w-]*-)(?:\{\{|\{%|\$\{|[\'"]\s*\+)')
+
+
+def strip_css_comments(css):
+    return _CSS_STRING_OR_COMMENT.sub(lambda match: match.group(1) or '', css)
+
+
+def minify_css(css):
+    """Drop comments and insignificant whitespace; strings are left untouched"""
+    parts = _CSS_STRING.split(strip_css_comments(css))
+    for index in range(0, len(parts), 2):
+        text = re.sub(r'\s+', ' ', parts[index])
+        text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+        # Only after ':' - a space before it is a descendant combinator
+        text = re.sub(r':\s+', ':', text)
+        parts[index] = text.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+_JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                      'throw', 'case', 'do', 'else', 'yield', 'await'}
+
+
+def minify_js(source):
+    """Drop comments, indentation and blank lines.
+
+    Deliberately conservative: newlines are kept so automatic semicolon
+    insertion behaves exactly as in the source, and strings, template
+    literals and regex literals are copied verbatim.
+    """
+    out = []
+    i, n = 0, len(source)
+    last = ''        # previous significant token: a punctuation char or a word
+    templates = []   # brace depth of each open ${ ... } inside template literals
+    depth = 0
+
+    def copy_quoted(start, quote):
+        j = start + 1
+        while j < n and source[j] != quote:
+            j += 2 if source[j] == '\\' else 1
+        return j + 1
+
+    def copy_template(start):
+        """Copy template text from start up to the closing ` or an opening ${"""
+        j = start
+        while j < n:
+            if source[j] == '\\':
+                j += 2
+            elif source[j] == '`':
+                return j + 1, False
+            elif source.startswith('${', j):
+                return j + 2, True
+            else:
+                j += 1
+        return j, False
+
+    def space():
+        if out and out[-1] not in (' ', '\n'):
+            out.append(' ')
+
+    while i < n:
+        char = source[i]
+        if char == '\n':
+            while out and out[-1] == ' ':
+                out.pop()
+            if out and out[-1] != '\n':
+                out.append('\n')
+            i += 1
+        elif char in ' \t\r\f\v':
+            space()
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            if '\n' in source[i:end]:
+                out.append('\n')
+            else:
+                space()
+            i = end
+        elif char in '"\'':
+            end = copy_quoted(i, char)
+            out.append(source[i:end])
+            i, last = end, char
+        elif char == '`':
+            end, interpolation = copy_template(i + 1)
+            out.append(source[i:end])
+            i, last = end, '`'
+            if interpolation:
+                templates.append(depth)
+                last = '{'
+        elif char == '}' and templates and templates[-1] == depth:
+            templates.pop()
+            end, interpolation = copy_template(i + 1)
+            out.append(source[i:end])
+            i, last = end, '`'
+            if interpolation:
+                templates.append(depth)
+                last = '{'
+        elif char == '/' and (not last or last in _JS_REGEX_AFTER or last in _JS_REGEX_KEYWORDS):
+            j, in_class = i + 1, False
+            while j < n and source[j] != '\n':
+                if source[j] == '\\':
+                    j += 1
+                elif source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                elif source[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and (source[j].isalnum() or source[j] == '_'):
+                j += 1
+            out.append(source[i:j])
+            i, last = j, ')'
+        elif char.isalnum() or char in '_$':
+            j = i
+            while j < n and (source[j].isalnum() or source[j] in '_$'):
+                j += 1
+            last = source[i:j]
+            out.append(last)
+            i = j
+        else:
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            out.append(char)
+            i, last = i + 1, char
+    return ''.join(out).strip() + '\n'
+
+
+def parse_css(css):
+    """Split comment-free CSS into (prelude, body) rules.
+
+    Bodies of grouping at-rules (@media, @supports, ...) are parsed
+    recursively into lists; statement at-rules get a None body.
+    """
+    rules = []
+    i, n = 0, len(css)
+    while i < n:
+        j = i
+        while j < n and css[j] not in '{;':
+            if css[j] in '"\'':
+                j = _CSS_STRING.match(css, j).end()
+            else:
+                j += 1
+        prelude = css[i:j].strip()
+        if j >= n:
+            break
+        if css[j] == ';':
+            if prelude:
+                rules.append((prelude, None))
+            i = j + 1
+            continue
+
+        depth, k = 1, j + 1
+        while k < n and depth:
+            if css[k] in '"\'':
+                k = _CSS_STRING.match(css, k).end()
+                continue
+            if css[k] == '{':
+                depth += 1
+            elif css[k] == '}':
+                depth -= 1
+            k += 1
+        body = css[j + 1:k - 1]
+        if prelude.startswith(_CSS_GROUPING_RULES):
+            rules.append((prelude, parse_css(body)))
+        else:
+            rules.append((prelude, body))
+        i = k
+    return rules
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def _template_words(name, seen=None):
+    """Words of a template and everything it includes"""
+    seen = seen if seen is not None else set()
+    if name in seen:
+        return set()
+    seen.add(name)
+    source = _read(os.path.join(TEMPLATES_DIR, name))
+    words = set(_WORDS.findall(source))
+    for included in re.findall(r'{%\s*include\s+[\'"]([^\'"]+)[\'"]', source):
+        if os.path.exists(os.path.join(TEMPLATES_DIR, included)):
+            words |= _template_words(included, seen)
+    return words
+
+
+def split_stylesheet(css):
+    """(shared_css, {template name: page_css}), both minified"""
+    shared_sources = [_read(os.path.join(TEMPLATES_DIR, BASE_TEMPLATE))]
+    shared_sources += [_read(os.path.join(STATIC_DIR, name)) for name in SHARED_SCRIPTS]
+    shared_sources += [_read(os.path.join(ROOT_DIR, name)) for name in SHARED_SOURCES
+                       if os.path.exists(os.path.join(ROOT_DIR, name))]
+    shared_words = set()
+    dynamic_prefixes = set()
+    for source in shared_sources:
+        shared_words |= set(_WORDS.findall(source))
+
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(TEMPLATES_DIR, '*.html'))):
+        name = os.path.basename(path)
+        dynamic_prefixes |= set(_DYNAMIC_PREFIX.findall(_read(path)))
+        if name != BASE_TEMPLATE:
+            pages[name] = _template_words(name)
+    for source in shared_sources:
+        dynamic_prefixes |= set(_DYNAMIC_PREFIX.findall(source))
+    dynamic_prefixes = tuple(dynamic_prefixes)
+
+    def placement(prelude):
+        """None for the shared bundle, else the templates using the rule"""
+        if prelude.startswith('@') or _FORGIVING_SELECTORS.search(prelude):
+            return None
+        # .a:not(.b) matches pages without .b, so only .a is required
+        selectors = [set(_SELECTOR_NAMES.findall(_NEGATION.sub('', selector))) for selector in prelude.split(',')]
+        if any(not names or names <= shared_words or any(name.startswith(dynamic_prefixes) for name in names)
+               for names in selectors):
+            return None
+        users = [page for page, words in pages.items() if any(names <= words for names in selectors)]
+        # Referenced nowhere we can see: keep it rather than risk dropping a live rule
+        return users or None
+
+    shared = []
+    per_page = {page: [] for page in pages}
+
+    def place(rules, wrappers=()):
+        """Append rules to their bundles; wrappers are the enclosing @media/@supports preludes"""
+        for prelude, body in rules:
+            if isinstance(body, list):
+                place(body, wrappers + (prelude,))
+                continue
+            text = f'{prelude};' if body is None else f'{prelude}{{{body}}}'
+            users = placement(prelude)
+            for target in ([shared] if users is None else [per_page[page] for page in users]):
+                if wrappers and target and isinstance(target[-1], tuple) and target[-1][0] == wrappers:
+                    target[-1][1].append(text)
+                elif wrappers:
+                    target.append((wrappers, [text]))
+                else:
+                    target.append(text)
+
+    place(parse_css(strip_css_comments(css)))
+
+    def render(items):
+        return minify_css(''.join(
+            ''.join(f'{prelude}{{' for prelude in item[0]) + ''.join(item[1]) + '}' * len(item[0])
+            if isinstance(item, tuple) else item
+            for item in items
+        ))
+
+    return render(shared), {page: render(items) for page, items in per_page.items() if items}
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build(out_dir=None):
+    """Rebuild out_dir (static/dist) from the sources; returns the manifest"""
+    out_dir = out_dir or DIST_DIR
+    outputs = {}
+    for name in STANDALONE_ASSETS:
+        source = _read(os.path.join(STATIC_DIR, name))
+        outputs[name] = minify_css(source) if name.endswith('.css') else minify_js(source)
+
+    shared, pages = split_stylesheet(_read(os.path.join(STATIC_DIR, STYLESHEET)))
+    outputs[SHARED_BUNDLE] = shared
+    for template, css in pages.items():
+        outputs[PAGE_BUNDLE.format(os.path.splitext(template)[0])] = css
+
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    manifest = {}
+    for name, text in sorted(outputs.items()):
+        data = text.encode('utf-8')
+        stem, ext = os.path.splitext(name)
+        filename = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+        path = os.path.join(out_dir, filename)
+        _write(path, data)
+        # mtime=0 keeps the .gz byte-identical across builds
+        _write(f'{path}.gz', gzip.compress(data, 9, mtime=0))
+        if BROTLI_AVAILABLE:
+            _write(f'{path}.br', brotli.compress(data, quality=11))
+        manifest[name] = filename
+
+    _write(os.path.join(out_dir, 'manifest.json'), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    reset_manifest()
+    return manifest
+
+
+_manifest = None
+
+
+def load_manifest():
+    """Logical name -> built filename; empty when the pipeline hasn't run"""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(os.path.join(DIST_DIR, 'manifest.json')) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def reset_manifest():
+    global _manifest
+    _manifest = None
+
+
+def asset_url(name):
+    """url_for('static', ...) counterpart that prefers the built, fingerprinted file"""
+    built = load_manifest().get(name)
+    if built:
+        return f'{ASSET_URL_PREFIX}/{built}'
+    return url_for('static', filename=name)
+
+
+@pass_context
+def page_stylesheets(context):
+    """Stylesheet URLs for the page being rendered: shared bundle plus its own"""
+    manifest = load_manifest()
+    if not manifest:
+        return [url_for('static', filename=STYLESHEET)]
+    urls = [asset_url(SHARED_BUNDLE)]
+    page = PAGE_BUNDLE.format(os.path.splitext(os.path.basename(context.name or ''))[0])
+    if page in manifest:
+        urls.append(asset_url(page))
+    return urls
+
+
+def send_built_asset(filename):
+    """Serve a fingerprinted file, precompressed when the client accepts it"""
+    path = safe_join(DIST_DIR, filename)
+    if path is None or filename == 'manifest.json' or not os.path.isfile(path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if candidate in request.accept_encodings and os.path.isfile(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+
+    response = send_file(path, mimetype=mimetype, max_age=ASSET_MAX_AGE, conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # The name changes with the content, so the file never needs revalidation
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
+
+
+def init_app(app):
+    app.add_url_rule(f'{ASSET_URL_PREFIX}/<path:filename>', 'built_asset', send_built_asset)
+    app.jinja_env.globals.update(asset_url=asset_url, page_stylesheets=page_stylesheets)
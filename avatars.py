@@ -0,0 +1,257 @@
+"""Minecraft head avatars proxied through our own origin.
+
+/avatar/<nickname>/<size> serves heads from an on-disk cache so pages never
+wait on mc-heads.net. Source images are stored content-addressed (many
+players share the default Steve head), resized variants are derived from
+them with Pillow, and stale heads are refreshed in the background while the
+cached copy keeps being served.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Sizes the site and the bot request; anything else would be another variant on disk
+AVATAR_SIZES = (32, 64, 100, 128)
+# Upstream heads are fetched once at this size and scaled down locally
+AVATAR_SOURCE_SIZE = 256
+AVATAR_REFRESH_AFTER = 24 * 3600
+# After a failed fetch, serve the default head without retrying for this long
+AVATAR_RETRY_AFTER = 300
+# Recently failed nicknames remembered at most
+AVATAR_MAX_FAILED = 1024
+# names/ entries not requested (and so not refreshed) for this long are pruned,
+# and at most AVATAR_MAX_NAMES of the most recently fetched ones are kept
+AVATAR_NAME_TTL = 30 * 24 * 3600
+AVATAR_MAX_NAMES = 20000
+AVATAR_DEFAULT_NICKNAME = 'steve'
+NICKNAME_PATTERN = re.compile(r'^[A-Za-z0-9_]{1,16}$')
+
+
+class McHeadsFetcher:
+    """Fetch head PNGs from mc-heads.net"""
+
+    def __init__(self, base_url='https://mc-heads.net/avatar', timeout=5):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def __call__(self, nickname):
+        url = f'{self.base_url}/{nickname}/{AVATAR_SOURCE_SIZE}'
+        request = urllib.request.Request(url, headers={'User-Agent': 'EliteSquad-AvatarProxy'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                if response.status == 200:
+                    return response.read()
+        except (urllib.error.URLError, OSError) as e:
+            logger.warning('Avatar fetch for %s failed: %s', nickname, e)
+        return None
+
+
+class StubFetcher:
+    """Offline fetcher: a flat head colored by the nickname hash. Used by tests."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, nickname):
+        self.calls.append(nickname)
+        digest = hashlib.md5(nickname.lower().encode()).digest()
+        image = Image.new('RGB', (AVATAR_SOURCE_SIZE, AVATAR_SOURCE_SIZE), tuple(digest[:3]))
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+
+def resize_png(png, size):
+    """Scale a head to size x size; nearest-neighbour keeps the pixel-art edges"""
+    with Image.open(io.BytesIO(png)) as image:
+        image = image.convert('RGBA').resize((size, size), Image.NEAREST)
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG', optimize=True)
+        return buffer.getvalue()
+
+
+class AvatarStore:
+    """Disk cache of heads.
+
+    Layout under root:
+      blobs/<sha256>.png          source heads, content-addressed
+      blobs/<sha256>-<size>.png   resized variants
+      names/<nickname>.json       {"digest": ..., "fetched_at": ...}
+
+    Any valid nickname can be requested, so prune() bounds names/ and drops
+    blobs no entry references any more.
+    """
+
+    def __init__(self, root=None, fetcher=None, refresh_after=AVATAR_REFRESH_AFTER, refresh_workers=2):
+        self.root = root or os.environ.get('AVATAR_CACHE_DIR') or os.path.abspath('instance/avatars')
+        if fetcher is None:
+            # AVATAR_FETCHER=stub keeps development and CI machines offline
+            fetcher = StubFetcher() if os.environ.get('AVATAR_FETCHER') == 'stub' else McHeadsFetcher()
+        self.fetcher = fetcher
+        self.refresh_after = refresh_after
+        self.refresh_workers = refresh_workers
+        self._refresh_pool = None
+        self._refreshing = set()
+        self._failed = OrderedDict()  # nickname -> time of the last failed fetch, oldest first
+        self._lock = threading.Lock()
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    @staticmethod
+    def _write(path, data):
+        """Atomic write so concurrent workers never serve a partial file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _read_entry(self, nickname):
+        try:
+            with open(self._path('names', f'{nickname}.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _fetch(self, nickname):
+        """Fetch from upstream and record the head; returns the entry or None"""
+        failed_at = self._failed.get(nickname)
+        if failed_at is not None and time.time() - failed_at < AVATAR_RETRY_AFTER:
+            return None
+        png = self.fetcher(nickname)
+        with self._lock:
+            self._failed.pop(nickname, None)
+            if not png:
+                self._failed[nickname] = time.time()
+                while len(self._failed) > AVATAR_MAX_FAILED:
+                    self._failed.popitem(last=False)
+        if not png:
+            return None
+        digest = hashlib.sha256(png).hexdigest()
+        blob = self._path('blobs', f'{digest}.png')
+        if not os.path.exists(blob):
+            self._write(blob, png)
+        entry = {'digest': digest, 'fetched_at': time.time()}
+        self._write(self._path('names', f'{nickname}.json'), json.dumps(entry).encode())
+        return entry
+
+    def _refresh(self, nickname):
+        try:
+            self._fetch(nickname)
+        except Exception as e:
+            logger.warning('Avatar refresh for %s failed: %s', nickname, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(nickname)
+
+    def schedule_refresh(self, nickname):
+        with self._lock:
+            if nickname in self._refreshing:
+                return
+            self._refreshing.add(nickname)
+            if self._refresh_pool is None:
+                self._refresh_pool = ThreadPoolExecutor(max_workers=self.refresh_workers,
+                                                        thread_name_prefix='avatar-refresh')
+            pool = self._refresh_pool
+        pool.submit(self._refresh, nickname)
+
+    def get(self, nickname, size, _retry=False):
+        """(png, etag) for a head, falling back to the default head.
+
+        Returns None only when neither the player nor the default head could
+        be fetched.
+        """
+        key = nickname.lower()
+        entry = self._read_entry(key)
+        if entry is None:
+            entry = self._fetch(key)
+            if entry is None and key != AVATAR_DEFAULT_NICKNAME:
+                return self.get(AVATAR_DEFAULT_NICKNAME, size)
+            if entry is None:
+                return None
+        elif time.time() - entry['fetched_at'] > self.refresh_after:
+            # Serve the cached head now, replace it for later requests
+            self.schedule_refresh(key)
+
+        digest = entry['digest']
+        variant = self._path('blobs', f'{digest}-{size}.png')
+        try:
+            with open(variant, 'rb') as f:
+                png = f.read()
+        except OSError:
+            try:
+                with open(self._path('blobs', f'{digest}.png'), 'rb') as f:
+                    png = f.read()
+            except FileNotFoundError:
+                # Pruned after the entry was read; drop the entry and start over
+                self._remove(self._path('names', f'{key}.json'))
+                if _retry:
+                    return None
+                return self.get(nickname, size, _retry=True)
+            png = resize_png(png, size)
+            self._write(variant, png)
+        return png, f'{digest[:20]}-{size}'
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def prune(self, now=None):
+        """Expire and cap names/ entries, then delete unreferenced blobs. Returns files removed."""
+        now = now or time.time()
+        entries = []
+        names_dir = self._path('names')
+        if os.path.isdir(names_dir):
+            for filename in os.listdir(names_dir):
+                if filename.endswith('.json'):
+                    entry = self._read_entry(filename[:-5])
+                    entries.append((entry['fetched_at'] if entry else 0, filename, entry))
+        entries.sort(reverse=True)
+
+        removed = 0
+        referenced = set()
+        for index, (fetched_at, filename, entry) in enumerate(entries):
+            if entry and index < AVATAR_MAX_NAMES and now - fetched_at < AVATAR_NAME_TTL:
+                referenced.add(entry['digest'])
+            elif self._remove(os.path.join(names_dir, filename)):
+                removed += 1
+
+        blobs_dir = self._path('blobs')
+        if os.path.isdir(blobs_dir):
+            for filename in os.listdir(blobs_dir):
+                digest = filename.split('.')[0].split('-')[0]
+                if digest not in referenced and self._remove(os.path.join(blobs_dir, filename)):
+                    removed += 1
+        return removed
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._refresh_pool = self._refresh_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+avatar_store = AvatarStore()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Asset build script: minifies, splits, fingerprints and precompresses static files into static/dist
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import assets
+
+def build_assets():
+    """Rebuild static/dist and its manifest"""
+    manifest = assets.build()
+
+    total = 0
+    for name, filename in sorted(manifest.items()):
+        size = os.path.getsize(os.path.join(assets.DIST_DIR, filename))
+        gzipped = os.path.getsize(os.path.join(assets.DIST_DIR, f'{filename}.gz'))
+        total += size
+        print(f"📦 {name} -> {filename} ({size / 1024:.1f} KB, gzip {gzipped / 1024:.1f} KB)")
+
+    print(f"✅ Built {len(manifest)} assets, {total / 1024:.1f} KB total")
+    if not assets.BROTLI_AVAILABLE:
+        print("ℹ️ brotli is not installed, only .gz siblings were written")
+
+if __name__ == "__main__":
+    build_assets()
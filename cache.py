@@ -82,4 +82,74 @@ def cached(expire=3600, key_func=None):
             Cache.set(cache_key, result, expire)
             return result
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+class LeaderboardPageCache:
+    """Материализованные страницы лидерборда.
+
+    Страница хранится вместе с границами значений сортировки, поэтому при
+    изменении статистики сбрасываются только страницы, чей диапазон задет.
+    Кэш живёт в памяти процесса: сброс видит только воркер, сделавший запись,
+    остальные отдают свою копию до истечения expire. Поэтому expire должен
+    быть коротким (см. Player.LEADERBOARD_PAGE_TTL).
+    """
+    PREFIX = 'leaderboard:page:'
+
+    @classmethod
+    def key(cls, sort_key, limit, offset):
+        return f'{cls.PREFIX}{sort_key}:{limit}:{offset}'
+
+    @classmethod
+    def get(cls, sort_key, limit, offset):
+        """Получить строки страницы или None"""
+        page = Cache.get(cls.key(sort_key, limit, offset))
+        return page['rows'] if page is not None else None
+
+    @classmethod
+    def set(cls, sort_key, limit, offset, rows, values=None, expire=300):
+        """Сохранить страницу; без values она сбрасывается при любой записи по sort_key"""
+        return Cache.set(cls.key(sort_key, limit, offset), {
+            'rows': rows,
+            'ids': {row['id'] for row in rows},
+            'bounds': (min(values), max(values)) if values else None,
+            'full': len(rows) >= limit
+        }, expire)
+
+    @classmethod
+    def _drop(cls, predicate, sort_key=None):
+        prefix = f'{cls.PREFIX}{sort_key}:' if sort_key else cls.PREFIX
+        keys = [key for key, item in list(_memory_cache.items())
+                if key.startswith(prefix) and predicate(item['data'])]
+        for key in keys:
+            _memory_cache.pop(key, None)
+        return len(keys)
+
+    @classmethod
+    def invalidate_range(cls, sort_key, old_value, new_value):
+        """Сбросить страницы, задетые сменой значения old_value -> new_value.
+
+        None означает отсутствие игрока (создание или удаление): тогда
+        сдвигаются все страницы ниже значения. Неполные страницы (хвост
+        лидерборда) сбрасываются всегда.
+        """
+        values = [value for value in (old_value, new_value) if value is not None]
+        if not values:
+            return 0
+        high = max(values)
+        low = min(values) if len(values) == 2 else float('-inf')
+
+        def affected(page):
+            bounds = page['bounds']
+            return not page['full'] or bounds is None or (bounds[0] <= high and bounds[1] >= low)
+
+        return cls._drop(affected, sort_key)
+
+    @classmethod
+    def invalidate_sort(cls, sort_key):
+        """Сбросить все страницы одной сортировки"""
+        return cls._drop(lambda page: True, sort_key)
+
+    @classmethod
+    def invalidate_player(cls, player_id):
+        """Сбросить страницы, на которых показан игрок"""
+        return cls._drop(lambda page: player_id in page['ids'])
@@ -20,12 +20,7 @@ def check_database():
             print(f"📊 Player table has {len(columns)} columns")
             
             # Check for key columns
-            required_columns = [
-                'kitpvp_kills', 'kitpvp_deaths', 'kitpvp_games',
-                'skywars_wins', 'skywars_kills', 
-                'sumo_games_played', 'sumo_wins', 'sumo_kills',
-                'karma', 'coins', 'reputation'
-            ]
+            required_columns = ['karma', 'coins', 'reputation']
             
             missing_columns = []
             for col in required_columns:
@@ -43,7 +38,8 @@ def check_database():
             print(f"👥 Players in database: {player_count}")
             
             # Check other tables
-            tables = ['quest', 'achievement', 'ascend_data', 'target_list', 'candidate']
+            tables = ['quest', 'achievement', 'ascend_data', 'target_list', 'candidate',
+                      'kit_pv_p_stats', 'sky_wars_stats', 'sumo_stats']
             for table in tables:
                 try:
                     count = db.session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
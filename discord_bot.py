@@ -7,6 +7,8 @@ import os
 from dotenv import load_dotenv
 import json
 import io
+import re
+import time
 import base64
 
 # Проверяем доступность Pillow для создания изображений
@@ -22,11 +24,14 @@ except ImportError:
     print("⚠️ Pillow не установлен. Функции создания изображений будут недоступны.")
     print("Установите Pillow командой: pip install Pillow")
 
+from ascend_card import card_renderer, card_key, card_from_ascend
+
 # Load environment variables
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CLIENT_ID = os.getenv("CLIENT_ID")
 WEBSITE_URL = os.getenv("WEBSITE_URL", "http://localhost:5000")
+BOT_API_TOKEN = os.getenv("BOT_API_TOKEN")  # общий секрет с сайтом для служебных эндпоинтов
 
 if not BOT_TOKEN:
     raise ValueError("❌ BOT_TOKEN не задан в .env файле")
@@ -41,20 +46,155 @@ intents.message_content = True
 intents.guilds = True
 intents.members = True
 
-bot = commands.Bot(command_prefix=['!', '/'], intents=intents, help_command=None)
+class EliteBot(commands.Bot):
+    async def close(self):
+        await close_http_session()
+        card_renderer.shutdown()
+        await super().close()
+
+bot = EliteBot(command_prefix=['!', '/'], intents=intents, help_command=None)
+
+# Общий HTTP-клиент: один пул keep-alive соединений к сайту на всё время работы бота
+HTTP_POOL_LIMIT = 50          # всего соединений в пуле
+HTTP_PER_HOST_LIMIT = 10      # одновременных запросов к одному хосту
+HTTP_KEEPALIVE_TIMEOUT = 60   # секунд держать простаивающее соединение
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+HTTP_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.5      # секунд, удваивается с каждой попыткой
+HTTP_RETRY_STATUSES = {429, 502, 503, 504}
+
+http_session = None
+
+async def open_http_session():
+    """Создать общий ClientSession, если его ещё нет или он закрыт"""
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_PER_HOST_LIMIT,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        headers = {'X-Bot-Token': BOT_API_TOKEN} if BOT_API_TOKEN else None
+        http_session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT, headers=headers)
+    return http_session
+
+async def close_http_session():
+    global http_session
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+    http_session = None
+
+# Кэш GET ответов сайта по URL: TTL в секундах для каждого эндпоинта
+RESPONSE_CACHE_TTLS = (
+    (re.compile(r'^/api/search$'), 60),
+    (re.compile(r'^/api/player/\d+/ascend-data$'), 30),
+    (re.compile(r'^/api/shop$'), 300),
+    (re.compile(r'^/api/leaderboard$'), 60),
+    (re.compile(r'^/api/stats$'), 60),
+)
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+
+_response_cache = {}    # url -> (expires_at, data)
+_inflight_requests = {}  # url -> asyncio.Future с ответом запроса в полёте
+
+def response_ttl(url):
+    path = url[len(WEBSITE_URL):] if url.startswith(WEBSITE_URL) else url
+    path = path.split('?', 1)[0]
+    for pattern, ttl in RESPONSE_CACHE_TTLS:
+        if pattern.match(path):
+            return ttl
+    return 0
+
+def _store_response(url, data, ttl):
+    now = time.monotonic()
+    if len(_response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+        for key in [key for key, (expires, _) in _response_cache.items() if expires <= now]:
+            del _response_cache[key]
+        if len(_response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+            _response_cache.pop(next(iter(_response_cache)))
+    _response_cache[url] = (now + ttl, data)
+
+async def fetch_json(url, description):
+    """GET запрос с кэшем по URL.
+
+    Одинаковые запросы, пришедшие пока первый ещё выполняется, ждут его
+    результат вместо отдельного обращения к сайту.
+    """
+    ttl = response_ttl(url)
+    if not ttl:
+        return await request_json(url, description)
+
+    cached = _response_cache.get(url)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    inflight = _inflight_requests.get(url)
+    if inflight is not None:
+        # shield: отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(inflight)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight_requests[url] = future
+    try:
+        data = await request_json(url, description)
+        if data is not None:
+            _store_response(url, data, ttl)
+        future.set_result(data)
+        return data
+    except BaseException:
+        future.cancel()
+        raise
+    finally:
+        _inflight_requests.pop(url, None)
+
+async def request_json(url, description):
+    """GET запрос через общий пул с повтором и экспоненциальной задержкой"""
+    session = await open_http_session()
+    for attempt in range(1, HTTP_RETRIES + 1):
+        try:
+            async with session.get(url) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+                print(f"Ошибка {description}: HTTP {resp.status}")
+                if resp.status not in HTTP_RETRY_STATUSES:
+                    return None
+        except asyncio.TimeoutError:
+            print(f"Ошибка {description}: таймаут запроса")
+        except aiohttp.ClientError as e:
+            print(f"Ошибка {description}: {e}")
+        if attempt < HTTP_RETRIES:
+            await asyncio.sleep(HTTP_RETRY_BACKOFF * 2 ** (attempt - 1))
+    return None
 
-async def fetch_json(session, url, description):
+async def stream_json_lines(url, description):
+    """Построчно читать NDJSON ответ без загрузки его целиком"""
+    session = await open_http_session()
     try:
-        async with session.get(url, timeout=10) as resp:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=None, sock_read=30)) as resp:
             if resp.status != 200:
                 print(f"Ошибка {description}: HTTP {resp.status}")
-                return None
-            return await resp.json()
+                return
+            async for line in resp.content:
+                if line.strip():
+                    yield json.loads(line)
     except asyncio.TimeoutError:
         print(f"Ошибка {description}: таймаут запроса")
     except aiohttp.ClientError as e:
         print(f"Ошибка {description}: {e}")
-    return None
+
+async def post_json(url, payload):
+    """POST запрос через общий пул; без повторов, так как запрос не идемпотентен.
+
+    Возвращает (status, data), data = None если ответ не JSON.
+    """
+    session = await open_http_session()
+    async with session.post(url, json=payload) as resp:
+        try:
+            data = await resp.json()
+        except aiohttp.ContentTypeError:
+            data = None
+        return resp.status, data
 
 def get_tier_color(tier):
     colors = {
@@ -97,12 +237,11 @@ class ASCENDView(discord.ui.View):
         
         # Re-run ascend command with new gamemode
         try:
-            async with aiohttp.ClientSession() as session:
-                ascend_data = await fetch_json(session, f"{WEBSITE_URL}/api/player/{self.player_id}/ascend-data?gamemode={new_gamemode}", "получения ASCEND данных")
-                if ascend_data and ascend_data.get('success'):
-                    # Update the view
-                    self.gamemode = new_gamemode
-                    await interaction.edit_original_response(content=f"✅ Режим изменен на {new_gamemode}", view=self)
+            ascend_data = await fetch_json(f"{WEBSITE_URL}/api/player/{self.player_id}/ascend-data?gamemode={new_gamemode}", "получения ASCEND данных")
+            if ascend_data and ascend_data.get('success'):
+                # Update the view
+                self.gamemode = new_gamemode
+                await interaction.edit_original_response(content=f"✅ Режим изменен на {new_gamemode}", view=self)
         except Exception as e:
             await interaction.edit_original_response(content="❌ Ошибка при смене режима")
 
@@ -253,12 +392,13 @@ async def on_ready():
     print(f'{bot.user} подключен к Discord!')
     if bot.user:
         print(f'Bot ID: {bot.user.id}')
+    await open_http_session()
+    await refresh_discord_links()
     await bot.change_presence(activity=discord.Game(name="Elite Squad ASCEND | /help"))
 
-    # Start background tasks
-    leaderboard_update.start()
-    karma_monitor.start()
-    auto_role_update.start()  # Запуск автоматического обновления ролей
+    # Сайт присылает события сам; on_ready может срабатывать повторно при переподключении
+    if not bot_event_consumer.is_running():
+        bot_event_consumer.start()
 
     # Sync slash commands
     try:
@@ -267,64 +407,102 @@ async def on_ready():
     except Exception as e:
         print(f"Ошибка синхронизации команд: {e}")
 
-@tasks.loop(hours=1)
 async def leaderboard_update():
     """Update bot status with current leaderboard info"""
     try:
-        async with aiohttp.ClientSession() as session:
-            stats = await fetch_json(session, f"{WEBSITE_URL}/api/stats", "получения статистики")
-            if stats and stats.get('total_players'):
-                activity = discord.Game(name=f"Elite Squad | {stats['total_players']} игроков")
-                await bot.change_presence(activity=activity)
+        stats = await fetch_json(f"{WEBSITE_URL}/api/stats", "получения статистики")
+        if stats and stats.get('total_players'):
+            activity = discord.Game(name=f"Elite Squad | {stats['total_players']} игроков")
+            await bot.change_presence(activity=activity)
     except Exception as e:
         print(f"Ошибка обновления статуса: {e}")
 
-@tasks.loop(minutes=30)
-async def karma_monitor():
-    """Monitor players with low karma and send warnings"""
+# Игроки ниже порога кармы по данным сайта; None — полный список ещё не загружен
+KARMA_WARNING_THRESHOLD = 20
+KARMA_SINCE_OVERLAP = timedelta(seconds=60)
+low_karma_ids = None
+karma_checked_at = None
+
+async def fetch_karma_players(since=None):
+    """Все страницы /api/players/karma: без since — игроки ниже порога, с since — изменившиеся после него"""
+    players, cursor, checked_at = [], None, None
+    while True:
+        url = f"{WEBSITE_URL}/api/players/karma?below={KARMA_WARNING_THRESHOLD}&limit=500"
+        if since:
+            url += f"&since={since.isoformat()}"
+        if cursor:
+            url += f"&cursor={cursor}"
+        data = await request_json(url, "получения игроков с низкой кармой")
+        if not data or not data.get('success'):
+            return None, None
+        players.extend(data['players'])
+        # Время первой страницы: изменения во время обхода попадут в следующий запрос
+        checked_at = checked_at or datetime.fromisoformat(data['checked_at'])
+        cursor = data.get('next_cursor')
+        if not cursor:
+            return players, checked_at
+
+async def sync_low_karma():
+    """Обновить множество игроков с низкой кармой, вернуть тех, кто опустился ниже порога впервые.
+
+    После первой полной загрузки запрашиваются только строки, изменившиеся
+    с прошлой проверки (с запасом KARMA_SINCE_OVERLAP на незакоммиченные записи).
+    """
+    global low_karma_ids, karma_checked_at
+    if low_karma_ids is None:
+        players, checked_at = await fetch_karma_players()
+        if players is None:
+            return None
+        low_karma_ids = {player['id'] for player in players}
+        karma_checked_at = checked_at
+        return []
+
+    players, checked_at = await fetch_karma_players(karma_checked_at - KARMA_SINCE_OVERLAP)
+    if players is None:
+        return None
+    crossed = []
+    for player in players:
+        if not player['at_risk']:
+            low_karma_ids.discard(player['id'])
+        elif player['id'] not in low_karma_ids:
+            low_karma_ids.add(player['id'])
+            crossed.append(player)
+    karma_checked_at = checked_at
+    return crossed
+
+async def karma_monitor(low_karma_players):
+    """Send warnings about players whose karma dropped below the threshold"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Get players with low karma (< 20)
-            players = await fetch_json(session, f"{WEBSITE_URL}/api/leaderboard?sort=reputation&limit=100", "получения игроков")
-            if players and players.get('players'):
-                low_karma_players = [p for p in players['players'] if p.get('reputation', 0) < 20]
-
-                if low_karma_players:
-                    # Find main guild and general channel
-                    for guild in bot.guilds:
-                        general = discord.utils.get(guild.text_channels, name='general') or \
-                                 discord.utils.get(guild.text_channels, name='main') or \
-                                 discord.utils.get(guild.text_channels, name='chat') or \
-                                 (guild.text_channels[0] if guild.text_channels else None)
-                        if general and hasattr(general, 'send'):
-                            embed = discord.Embed(
-                                title="⚠️ Мониторинг кармы",
-                                description=f"Найдено {len(low_karma_players)} игроков с низкой кармой",
-                                color=0xff6b6b,
-                                timestamp=datetime.utcnow()
-                            )
-
-                            karma_list = []
-                            for player in low_karma_players[:5]:
-                                karma_list.append(f"**{player['nickname']}** - Карма: {player.get('reputation', 0)}")
-
-                            embed.add_field(name="Игроки с низкой кармой:", value="\n".join(karma_list), inline=False)
-                            embed.add_field(name="Последствия низкой кармы:",
-                                          value="• Ограничения в чате\n• Снижение дропа ресурсов\n• Ограничение участия в турнирах",
-                                          inline=False)
-
-                            await general.send(embed=embed)
-                        break
-    except Exception as e:
-        print(f"Ошибка мониторинга кармы: {e}")
+        if not low_karma_players:
+            return
 
-@leaderboard_update.before_loop
-async def before_leaderboard_update():
-    await bot.wait_until_ready()
+        # Find main guild and general channel
+        for guild in bot.guilds:
+            general = discord.utils.get(guild.text_channels, name='general') or \
+                     discord.utils.get(guild.text_channels, name='main') or \
+                     discord.utils.get(guild.text_channels, name='chat') or \
+                     (guild.text_channels[0] if guild.text_channels else None)
+            if general and hasattr(general, 'send'):
+                embed = discord.Embed(
+                    title="⚠️ Мониторинг кармы",
+                    description=f"Найдено {len(low_karma_players)} игроков с низкой кармой",
+                    color=0xff6b6b,
+                    timestamp=datetime.utcnow()
+                )
 
-@karma_monitor.before_loop
-async def before_karma_monitor():
-    await bot.wait_until_ready()
+                karma_list = []
+                for player in low_karma_players[:5]:
+                    karma_list.append(f"**{player['nickname']}** - Карма: {player.get('karma', 0)}")
+
+                embed.add_field(name="Игроки с низкой кармой:", value="\n".join(karma_list), inline=False)
+                embed.add_field(name="Последствия низкой кармы:",
+                              value="• Ограничения в чате\n• Снижение дропа ресурсов\n• Ограничение участия в турнирах",
+                              inline=False)
+
+                await general.send(embed=embed)
+            break
+    except Exception as e:
+        print(f"Ошибка мониторинга кармы: {e}")
 
 # Bot Commands
 @bot.tree.command(name="ascend", description="Показать ASCEND карточку игрока с изображением")
@@ -332,21 +510,20 @@ async def ascend_card(interaction: discord.Interaction, nickname: str, gamemode:
     try:
         await interaction.response.defer()
 
-        async with aiohttp.ClientSession() as session:
-            data = await fetch_json(session, f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
-            if not data or not data.get('players'):
-                await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
-                return
+        data = await fetch_json(f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
+        if not data or not data.get('players'):
+            await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
+            return
 
-            player = data['players'][0]
-            player_id = player['id']
+        player = data['players'][0]
+        player_id = player['id']
 
-            ascend_data = await fetch_json(session, f"{WEBSITE_URL}/api/player/{player_id}/ascend-data?gamemode={gamemode}", "получения ASCEND данных")
-            if not ascend_data or not ascend_data.get('success'):
-                await interaction.followup.send("❌ ASCEND данные недоступны", ephemeral=True)
-                return
+        ascend_data = await fetch_json(f"{WEBSITE_URL}/api/player/{player_id}/ascend-data?gamemode={gamemode}", "получения ASCEND данных")
+        if not ascend_data or not ascend_data.get('success'):
+            await interaction.followup.send("❌ ASCEND данные недоступны", ephemeral=True)
+            return
 
-            ascend = ascend_data['ascend']
+        ascend = ascend_data['ascend']
 
         embed = discord.Embed(
             title="🎮 ASCEND Performance Card",
@@ -379,10 +556,22 @@ async def ascend_card(interaction: discord.Interaction, nickname: str, gamemode:
         if ascend.get('comment'):
             embed.add_field(name="💬 Оценка эксперта", value=f"*{ascend['comment'][:1000]}*", inline=False)
 
-        embed.set_thumbnail(url=f"https://mc-heads.net/avatar/{player['nickname']}/100")
+        embed.set_thumbnail(url=f"{WEBSITE_URL}/avatar/{player['nickname']}/100")
         embed.set_footer(text=f"Оценщик: {ascend.get('evaluator_name', 'Elite Squad')} | Elite Squad ASCEND")
 
         view = ASCENDView(player_id, player['nickname'], gamemode)
+
+        if visual and PIL_AVAILABLE:
+            # Рендер в пуле процессов, чтобы не блокировать event loop
+            png = await card_renderer.render_async(
+                card_key(player_id, gamemode, ascend.get('updated_at')),
+                card_from_ascend(player['nickname'], ascend)
+            )
+            embed.set_image(url="attachment://ascend.png")
+            await interaction.followup.send(embed=embed, view=view,
+                                            file=discord.File(io.BytesIO(png), filename="ascend.png"))
+            return
+
         await interaction.followup.send(embed=embed, view=view)
 
     except Exception as e:
@@ -404,6 +593,7 @@ async def help_command(interaction: discord.Interaction):
         `/ascend <nickname> [gamemode] [visual]` - ASCEND карточка
         `/player <nickname>` - Статистика игрока
         `/stats` - Статистика сервера
+        `/top [sort]` - Топ-10 с изменением позиций
         """,
         inline=False
     )
@@ -449,6 +639,7 @@ async def help_command(interaction: discord.Interaction):
         value="""
         `/check_stats <nickname>` - Проверить роли игрока
         `/update_roles <nickname>` - Обновить роли (админ)
+        `/link <nickname> <member>` - Привязать Discord к игроку (админ)
         """,
         inline=False
     )
@@ -496,13 +687,12 @@ async def karma_info(interaction: discord.Interaction, nickname: str = ""):
             await interaction.followup.send(embed=embed)
             return
 
-        async with aiohttp.ClientSession() as session:
-            data = await fetch_json(session, f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
-            if not data or not data.get('players'):
-                await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
-                return
+        data = await fetch_json(f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
+        if not data or not data.get('players'):
+            await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
+            return
 
-            player = data['players'][0]
+        player = data['players'][0]
 
         karma = player.get('reputation', 0)
 
@@ -541,7 +731,7 @@ async def karma_info(interaction: discord.Interaction, nickname: str = ""):
                 inline=False
             )
 
-        embed.set_thumbnail(url=f"https://mc-heads.net/avatar/{player['nickname']}/100")
+        embed.set_thumbnail(url=f"{WEBSITE_URL}/avatar/{player['nickname']}/100")
         embed.set_footer(text="Карма обновляется в реальном времени")
 
         await interaction.followup.send(embed=embed)
@@ -550,17 +740,53 @@ async def karma_info(interaction: discord.Interaction, nickname: str = ""):
         print(f"Ошибка в команде karma: {e}")
         await interaction.followup.send("❌ Произошла ошибка при получении данных кармы", ephemeral=True)
 
+@bot.tree.command(name="top", description="Топ игроков с изменением позиций за сутки")
+async def top_command(interaction: discord.Interaction, sort: str = "experience"):
+    try:
+        await interaction.response.defer()
+
+        leaderboard = await fetch_json(f"{WEBSITE_URL}/api/leaderboard?sort={sort}&limit=10&include_delta=1", "получения лидерборда")
+        if not leaderboard or not leaderboard.get('players'):
+            await interaction.followup.send("❌ Лидерборд временно недоступен", ephemeral=True)
+            return
+
+        lines = []
+        for player in leaderboard['players']:
+            delta = player.get('rank_delta')
+            if delta is None:
+                change = "🆕" if 'rank_delta' in player else ""
+            elif delta > 0:
+                change = f"▲{delta}"
+            elif delta < 0:
+                change = f"▼{-delta}"
+            else:
+                change = "—"
+            lines.append(f"**#{player['rank']}** {player['nickname']} · {player.get(sort, 0):,} {change}")
+
+        embed = discord.Embed(
+            title=f"🏆 Топ-10 по {sort}",
+            description="\n".join(lines),
+            color=0xffd700,
+            timestamp=datetime.utcnow()
+        )
+        embed.set_footer(text="Изменения позиций с прошлых суток")
+
+        await interaction.followup.send(embed=embed)
+
+    except Exception as e:
+        print(f"Ошибка в команде top: {e}")
+        await interaction.followup.send("❌ Произошла ошибка при получении лидерборда", ephemeral=True)
+
 @bot.tree.command(name="shop", description="Просмотреть магазин товаров")
 async def shop_command(interaction: discord.Interaction, category: str = "all"):
     try:
         await interaction.response.defer()
 
-        async with aiohttp.ClientSession() as session:
-            # Get shop items
-            shop_data = await fetch_json(session, f"{WEBSITE_URL}/api/shop", "получения товаров магазина")
-            if not shop_data or not shop_data.get('items'):
-                await interaction.followup.send("❌ Магазин временно недоступен", ephemeral=True)
-                return
+        # Get shop items
+        shop_data = await fetch_json(f"{WEBSITE_URL}/api/shop", "получения товаров магазина")
+        if not shop_data or not shop_data.get('items'):
+            await interaction.followup.send("❌ Магазин временно недоступен", ephemeral=True)
+            return
 
         items = shop_data['items']
         if category != "all":
@@ -612,17 +838,16 @@ async def inventory_command(interaction: discord.Interaction, nickname: str):
     try:
         await interaction.response.defer()
 
-        async with aiohttp.ClientSession() as session:
-            data = await fetch_json(session, f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
-            if not data or not data.get('players'):
-                await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
-                return
+        data = await fetch_json(f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
+        if not data or not data.get('players'):
+            await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
+            return
 
-            player = data['players'][0]
-            player_id = player['id']
+        player = data['players'][0]
+        player_id = player['id']
 
-            # Get inventory data
-            inventory_data = await fetch_json(session, f"{WEBSITE_URL}/api/player/{player_id}/inventory", "получения инвентаря")
+        # Get inventory data
+        inventory_data = await fetch_json(f"{WEBSITE_URL}/api/player/{player_id}/inventory", "получения инвентаря")
 
         embed = discord.Embed(
             title=f"🎒 Инвентарь {player['nickname']}",
@@ -650,7 +875,7 @@ async def inventory_command(interaction: discord.Interaction, nickname: str):
                         inline=True
                     )
 
-        embed.set_thumbnail(url=f"https://mc-heads.net/avatar/{player['nickname']}/100")
+        embed.set_thumbnail(url=f"{WEBSITE_URL}/avatar/{player['nickname']}/100")
         embed.set_footer(text="Обновлено в реальном времени")
 
         await interaction.followup.send(embed=embed)
@@ -669,33 +894,32 @@ async def buy_command(interaction: discord.Interaction, item_name: str, player_n
         if not player_nickname:
             player_nickname = interaction.user.display_name
         
-        async with aiohttp.ClientSession() as session:
-            # Найти игрока
-            player_data = await fetch_json(session, f"{WEBSITE_URL}/api/search?q={player_nickname}", "поиска игрока")
-            if not player_data or not player_data.get('players'):
-                await interaction.followup.send(f"❌ Игрок `{player_nickname}` не найден", ephemeral=True)
-                return
-            
-            player = player_data['players'][0]
-            player_id = player['id']
-            
-            # Попытка покупки
-            purchase_response = await session.post(
-                f"{WEBSITE_URL}/api/shop/purchase",
-                json={
-                    'player_id': player_id,
-                    'item_name': item_name,
-                    'discord_user_id': str(interaction.user.id)
-                }
-            )
-            
-            if purchase_response.status != 200:
-                error_data = await purchase_response.json()
-                await interaction.followup.send(f"❌ {error_data.get('message', 'Ошибка покупки')}", ephemeral=True)
-                return
-            
-            result = await purchase_response.json()
-            
+        # Найти игрока
+        player_data = await fetch_json(f"{WEBSITE_URL}/api/search?q={player_nickname}", "поиска игрока")
+        if not player_data or not player_data.get('players'):
+            await interaction.followup.send(f"❌ Игрок `{player_nickname}` не найден", ephemeral=True)
+            return
+        
+        player = player_data['players'][0]
+        player_id = player['id']
+        
+        # Попытка покупки
+        status, result = await post_json(
+            f"{WEBSITE_URL}/api/shop/purchase",
+            {
+                'player_id': player_id,
+                'item_name': item_name,
+                'discord_user_id': str(interaction.user.id)
+            }
+        )
+        
+        if status != 200:
+            error_data = result or {}
+            await interaction.followup.send(f"❌ {error_data.get('message', 'Ошибка покупки')}", ephemeral=True)
+            return
+        
+        result = result or {}
+        
         # Успешная покупка
         embed = discord.Embed(
             title="✅ Покупка успешна!",
@@ -708,7 +932,7 @@ async def buy_command(interaction: discord.Interaction, item_name: str, player_n
         embed.add_field(name="💜 Потрачено кармы", value=f"{result.get('reputation_spent', 0)}", inline=True)
         embed.add_field(name="💡 Статус", value=result.get('message', 'Товар добавлен в инвентарь'), inline=False)
         
-        embed.set_thumbnail(url=f"https://mc-heads.net/avatar/{player['nickname']}/100")
+        embed.set_thumbnail(url=f"{WEBSITE_URL}/avatar/{player['nickname']}/100")
         embed.set_footer(text="Проверьте свой инвентарь на сайте или через /inventory")
         
         await interaction.followup.send(embed=embed)
@@ -766,6 +990,10 @@ CLAN_ROLES = {
     'Hattori': {'min_kdr': 0.57, 'min_kills': 100000, 'min_beds': 50000, 'discord_role_name': '《FR》🇯🇵HATTORI 将軍🐱‍👤'}
 }
 
+# Пороги клановых ролей в порядке проверки, сортируются один раз при загрузке
+CLAN_ROLE_THRESHOLDS = sorted(CLAN_ROLES.items(), key=lambda x: x[1]['min_kdr'], reverse=True)
+CLAN_ROLE_NAMES = frozenset(requirements['discord_role_name'] for requirements in CLAN_ROLES.values())
+
 # Престижные роли
 PRESTIGE_ROLES = {
     'ClanCore': {'condition': 'clan_member_since', 'value': '2021-08-08', 'discord_role_name': '«💦» Истинная Единица'},
@@ -784,10 +1012,7 @@ def determine_clan_role(player_stats):
     kills = player_stats.get('kills', 0)
     beds = player_stats.get('beds_broken', 0)
     
-    # Сортируем роли по приоритету (от высшей к низшей)
-    sorted_roles = sorted(CLAN_ROLES.items(), key=lambda x: x[1]['min_kdr'], reverse=True)
-    
-    for role_name, requirements in sorted_roles:
+    for role_name, requirements in CLAN_ROLE_THRESHOLDS:
         if (kdr >= requirements['min_kdr'] and 
             kills >= requirements['min_kills'] and 
             beds >= requirements['min_beds']):
@@ -862,22 +1087,274 @@ async def remove_discord_role(guild, member, role_name):
     except Exception as e:
         return f"❌ Ошибка при удалении роли: {e}"
 
+class RoleSyncEngine:
+    """Синхронизация клановых ролей по статистике.
+
+    Для каждого игрока считается желаемый набор управляемых ролей, он
+    сравнивается с текущими ролями участника, и изменения применяются одним
+    запросом на участника через очередь с ограниченным числом воркеров.
+    Лимиты Discord соблюдает discord.py, воркеры лишь не создают лишний поток
+    запросов.
+    """
+    WORKERS = 4
+    # Престижные роли, которые выдаются автоматически и никогда не снимаются
+    AUTO_PRESTIGE_ROLE_NAMES = frozenset(
+        PRESTIGE_ROLES[name]['discord_role_name'] for name in ('Murderous',)
+    )
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+
+    @staticmethod
+    def desired_roles(player_stats):
+        """Имена управляемых ролей, которые должны быть у игрока"""
+        roles = {role['discord_role_name'] for role in check_prestige_roles(player_stats)}
+        clan_role = determine_clan_role(player_stats)
+        if clan_role:
+            roles.add(clan_role['discord_role_name'])
+        return roles
+
+    def plan_member(self, member, player_stats, roles_by_name):
+        """Diff для одного участника: (роли к выдаче, роли к снятию)"""
+        desired_names = self.desired_roles(player_stats)
+        desired = {roles_by_name[name] for name in desired_names if name in roles_by_name}
+        current = set(member.roles)
+        to_add = desired - current
+        # Без заслуженной клановой роли выданные вручную не снимаем
+        to_remove = set()
+        if desired_names & CLAN_ROLE_NAMES:
+            to_remove = {role for role in current if role.name in CLAN_ROLE_NAMES} - desired
+        return to_add, to_remove
+
+    def plan(self, guild, players):
+        """Список изменений (member, to_add, to_remove) для гильдии"""
+        roles_by_name = {role.name: role for role in guild.roles}
+        changes = []
+        seen = set()
+        for player in players:
+            member = find_player_member(guild, player['player_id'], player['nickname'])
+            if not member or member.id in seen:
+                continue
+            seen.add(member.id)
+            to_add, to_remove = self.plan_member(member, player, roles_by_name)
+            if to_add or to_remove:
+                changes.append((member, to_add, to_remove))
+        return changes
+
+    @staticmethod
+    async def apply_change(member, to_add, to_remove, reason="Elite Squad: синхронизация ролей"):
+        """Применить diff одним запросом: новый полный список ролей участника"""
+        roles = [role for role in member.roles if role not in to_remove and not role.is_default()]
+        roles.extend(role for role in to_add if role not in roles)
+        await member.edit(roles=roles, reason=reason)
+
+    async def apply(self, changes):
+        """Применить изменения через очередь воркеров; вернуть число обновлённых участников"""
+        queue = asyncio.Queue()
+        for change in changes:
+            queue.put_nowait(change)
+        updated = 0
+
+        async def worker():
+            nonlocal updated
+            while True:
+                try:
+                    member, to_add, to_remove = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    await self.apply_change(member, to_add, to_remove)
+                    updated += 1
+                except discord.Forbidden:
+                    print(f"❌ Нет прав на изменение ролей {member}")
+                except discord.HTTPException as e:
+                    print(f"❌ Ошибка обновления ролей {member}: {e}")
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(changes)))))
+        return updated
+
+    async def sync_guild(self, guild, players):
+        return await self.apply(self.plan(guild, players))
+
+
+role_sync = RoleSyncEngine()
+
+async def fetch_role_sync_players():
+    """Статистика привязанных игроков и топа лидерборда для синхронизации ролей"""
+    players = {}
+    leaderboard = await fetch_json(f"{WEBSITE_URL}/api/leaderboard?sort=experience&limit=50", "получения лидерборда")
+    for player in (leaderboard or {}).get('players', []):
+        players[player['id']] = dict(player, player_id=player['id'])
+
+    # Все привязанные игроки одним потоковым запросом
+    linked = [player async for player in stream_json_lines(
+        f"{WEBSITE_URL}/api/players/bulk?linked=1", "получения привязанных игроков")]
+    if linked:
+        store_discord_links({'discord_user_id': player['discord_user_id'], 'player_id': player['id']}
+                            for player in linked)
+    for player in linked:
+        players[player['id']] = dict(player, player_id=player['id'])
+    return list(players.values())
+
 # === НОВЫЕ КОМАНДЫ ===
 
+class MemberIndex:
+    """Индекс участников гильдий по casefold display_name и username.
+
+    Строится один раз на гильдию и поддерживается событиями участников,
+    так что поиск по нику не перебирает guild.members.
+    """
+
+    def __init__(self):
+        self._names = {}  # guild_id -> {имя: {member_id}}
+        self._keys = {}   # (guild_id, member_id) -> имена, под которыми участник записан
+
+    @staticmethod
+    def _member_keys(member):
+        return {member.display_name.casefold(), member.name.casefold()}
+
+    def build(self, guild):
+        self.forget_guild(guild)
+        self._names[guild.id] = {}
+        for member in guild.members:
+            self.add(member)
+
+    def add(self, member):
+        names = self._names.get(member.guild.id)
+        if names is None:
+            return
+        keys = self._member_keys(member)
+        self._keys[(member.guild.id, member.id)] = keys
+        for key in keys:
+            names.setdefault(key, set()).add(member.id)
+
+    def remove(self, member):
+        names = self._names.get(member.guild.id, {})
+        for key in self._keys.pop((member.guild.id, member.id), ()):
+            ids = names.get(key)
+            if ids:
+                ids.discard(member.id)
+                if not ids:
+                    del names[key]
+
+    def update(self, member):
+        self.remove(member)
+        self.add(member)
+
+    def forget_guild(self, guild):
+        self._names.pop(guild.id, None)
+        for key in [key for key in self._keys if key[0] == guild.id]:
+            del self._keys[key]
+
+    def find(self, guild, name):
+        if guild.id not in self._names:
+            self.build(guild)
+        for member_id in sorted(self._names[guild.id].get(name.casefold(), ())):
+            member = guild.get_member(member_id)
+            if member:
+                return member
+        return None
+
+
+member_index = MemberIndex()
+discord_links = {}         # player_id -> discord user id
+linked_discord_users = {}  # discord user id -> player_id
+
+def store_discord_links(links):
+    """Заменить известные привязки списком {'discord_user_id', 'player_id'}"""
+    discord_links.clear()
+    linked_discord_users.clear()
+    for link in links:
+        user_id = int(link['discord_user_id'])
+        discord_links[link['player_id']] = user_id
+        linked_discord_users[user_id] = link['player_id']
+
+async def refresh_discord_links():
+    """Загрузить явные привязки Discord аккаунтов к игрокам"""
+    data = await fetch_json(f"{WEBSITE_URL}/api/discord/links", "получения привязок Discord")
+    if not data or not data.get('success'):
+        return False
+    store_discord_links(data.get('links', []))
+    return True
+
+def find_player_member(guild, player_id, nickname):
+    """Найти участника гильдии для игрока: сначала по привязке, затем по нику"""
+    user_id = discord_links.get(player_id)
+    if user_id:
+        # Привязанный игрок не сопоставляется по нику с чужим аккаунтом
+        return guild.get_member(user_id)
+
+    member = member_index.find(guild, nickname)
+    if member and linked_discord_users.get(member.id, player_id) != player_id:
+        return None
+    return member
+
+@bot.event
+async def on_member_join(member):
+    member_index.add(member)
+
+@bot.event
+async def on_member_update(before, after):
+    if before.display_name != after.display_name or before.name != after.name:
+        member_index.update(after)
+
+@bot.event
+async def on_user_update(before, after):
+    if before.name == after.name and before.display_name == after.display_name:
+        return
+    for guild in after.mutual_guilds:
+        member = guild.get_member(after.id)
+        if member:
+            member_index.update(member)
+
+@bot.event
+async def on_member_remove(member):
+    member_index.remove(member)
+
+@bot.event
+async def on_guild_remove(guild):
+    member_index.forget_guild(guild)
+
+@bot.tree.command(name="link", description="Привязать Discord аккаунт к игроку (только для администраторов)")
+async def link_command(interaction: discord.Interaction, nickname: str, member: discord.Member):
+    """Явная привязка участника Discord к игроку сайта"""
+    try:
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ У вас нет прав для использования этой команды", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        status, result = await post_json(f"{WEBSITE_URL}/api/discord/link", {
+            'discord_user_id': str(member.id),
+            'nickname': nickname,
+            'linked_by': f"discord:{interaction.user.id}"
+        })
+        if status != 200 or not result or not result.get('success'):
+            error = (result or {}).get('error', f'HTTP {status}')
+            await interaction.followup.send(f"❌ Не удалось привязать: {error}", ephemeral=True)
+            return
+
+        await refresh_discord_links()
+        await interaction.followup.send(f"✅ {member.mention} привязан к игроку **{result['link']['nickname']}**", ephemeral=True)
+
+    except Exception as e:
+        print(f"Ошибка в команде link: {e}")
+        await interaction.followup.send("❌ Произошла ошибка при привязке аккаунта", ephemeral=True)
+
 @bot.tree.command(name="check_stats", description="Проверить статистику игрока и соответствующие роли")
 async def check_stats_command(interaction: discord.Interaction, nickname: str):
     """Команда для проверки статистики игрока и определения ролей"""
     try:
         await interaction.response.defer()
 
-        async with aiohttp.ClientSession() as session:
-            # Поиск игрока
-            data = await fetch_json(session, f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
-            if not data or not data.get('players'):
-                await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
-                return
+        # Поиск игрока
+        data = await fetch_json(f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
+        if not data or not data.get('players'):
+            await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
+            return
 
-            player = data['players'][0]
+        player = data['players'][0]
 
         # Определение клановой роли
         clan_role = determine_clan_role(player)
@@ -944,7 +1421,7 @@ async def check_stats_command(interaction: discord.Interaction, nickname: str):
                 inline=False
             )
 
-        embed.set_thumbnail(url=f"https://mc-heads.net/avatar/{player['nickname']}/100")
+        embed.set_thumbnail(url=f"{WEBSITE_URL}/avatar/{player['nickname']}/100")
         embed.set_footer(text="Elite Squad - Система ролей")
 
         await interaction.followup.send(embed=embed)
@@ -964,21 +1441,16 @@ async def update_roles_command(interaction: discord.Interaction, nickname: str,
 
         await interaction.response.defer()
 
-        async with aiohttp.ClientSession() as session:
-            # Поиск игрока
-            data = await fetch_json(session, f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
-            if not data or not data.get('players'):
-                await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
-                return
+        # Поиск игрока
+        data = await fetch_json(f"{WEBSITE_URL}/api/search?q={nickname}", "поиска игрока")
+        if not data or not data.get('players'):
+            await interaction.followup.send(f"❌ Игрок `{nickname}` не найден", ephemeral=True)
+            return
 
-            player = data['players'][0]
+        player = data['players'][0]
 
-        # Поиск участника Discord по нику
-        member = None
-        for guild_member in interaction.guild.members:
-            if guild_member.display_name.lower() == nickname.lower() or guild_member.name.lower() == nickname.lower():
-                member = guild_member
-                break
+        # Поиск участника Discord: по привязке, затем по нику
+        member = find_player_member(interaction.guild, player['id'], nickname)
 
         if not member and not force:
             await interaction.followup.send(f"❌ Участник Discord с ником `{nickname}` не найден на сервере\nИспользуйте `force=True` для игнорирования", ephemeral=True)
@@ -990,23 +1462,21 @@ async def update_roles_command(interaction: discord.Interaction, nickname: str,
 
         result_messages = []
 
-        # Обновление клановой роли
-        if clan_role and member:
-            # Удаление старых клановых ролей
-            old_clan_roles = [role for role in member.roles if any(clan_name in role.name for clan_name in CLAN_ROLES.keys())]
-            for old_role in old_clan_roles:
-                result = await remove_discord_role(interaction.guild, member, old_role.name)
-                result_messages.append(result)
-
-            # Выдача новой роли
-            result = await assign_discord_role(interaction.guild, member, clan_role['discord_role_name'])
-            result_messages.append(result)
-
-        # Выдача престижных ролей
-        if prestige_roles and member:
-            for prestige_role in prestige_roles:
-                result = await assign_discord_role(interaction.guild, member, prestige_role['discord_role_name'])
-                result_messages.append(result)
+        # Обновление ролей одним запросом по diff с текущими ролями
+        if member:
+            roles_by_name = {role.name: role for role in interaction.guild.roles}
+            to_add, to_remove = role_sync.plan_member(member, player, roles_by_name)
+            missing = role_sync.desired_roles(player) - set(roles_by_name)
+            if to_add or to_remove:
+                try:
+                    await role_sync.apply_change(member, to_add, to_remove)
+                    result_messages.extend(f"✅ Роль {role.name} удалена!" for role in to_remove)
+                    result_messages.extend(f"✅ Роль {role.name} выдана!" for role in to_add)
+                except discord.HTTPException as e:
+                    result_messages.append(f"❌ Ошибка при обновлении ролей: {e}")
+            elif not missing:
+                result_messages.append("ℹ️ Роли уже актуальны")
+            result_messages.extend(f"❌ Роль {name} не найдена на сервере" for name in sorted(missing))
 
         # Создание отчета
         embed = discord.Embed(
@@ -1043,7 +1513,7 @@ async def update_roles_command(interaction: discord.Interaction, nickname: str,
                 inline=False
             )
 
-        embed.set_thumbnail(url=f"https://mc-heads.net/avatar/{player['nickname']}/100")
+        embed.set_thumbnail(url=f"{WEBSITE_URL}/avatar/{player['nickname']}/100")
         embed.set_footer(text="Elite Squad - Автоматическое обновление ролей")
 
         await interaction.followup.send(embed=embed)
@@ -1052,62 +1522,122 @@ async def update_roles_command(interaction: discord.Interaction, nickname: str,
         print(f"Ошибка в команде update_roles: {e}")
         await interaction.followup.send("❌ Произошла ошибка при обновлении ролей", ephemeral=True)
 
-# Добавляем периодическую задачу для автоматического обновления ролей
-@tasks.loop(hours=6)  # Каждые 6 часов
-async def auto_role_update():
-    """Автоматическое обновление ролей топ игроков"""
+async def auto_role_update(player_ids=None):
+    """Обновление ролей: всех привязанных и топ игроков или только указанных"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Получаем топ-50 игроков
-            leaderboard = await fetch_json(session, f"{WEBSITE_URL}/api/leaderboard?sort=experience&limit=50", "получения лидерборда")
-            if not leaderboard or not leaderboard.get('players'):
-                return
+        if player_ids:
+            data = await request_json(f"{WEBSITE_URL}/api/players/bulk?ids={','.join(map(str, player_ids))}",
+                                      "получения статистики игроков")
+            players = [dict(player, player_id=player['id']) for player in (data or {}).get('players', [])]
+        else:
+            players = await fetch_role_sync_players()
+        if not players:
+            return
 
-            print("🔄 Начинаем автоматическое обновление ролей...")
-            updated_count = 0
-
-            for guild in bot.guilds:
-                for player in leaderboard['players']:
-                    # Поиск участника Discord
-                    member = None
-                    for guild_member in guild.members:
-                        if (guild_member.display_name.lower() == player['nickname'].lower() or 
-                            guild_member.name.lower() == player['nickname'].lower()):
-                            member = guild_member
-                            break
-
-                    if not member:
-                        continue
-
-                    # Определение ролей
-                    clan_role = determine_clan_role(player)
-                    if not clan_role:
-                        continue
-
-                    # Проверка, есть ли уже правильная роль
-                    has_correct_role = any(clan_role['discord_role_name'] == role.name for role in member.roles)
-                    if has_correct_role:
-                        continue
-
-                    # Удаление старых клановых ролей
-                    old_clan_roles = [role for role in member.roles if any(clan_name in role.name for clan_name in CLAN_ROLES.keys())]
-                    for old_role in old_clan_roles:
-                        await remove_discord_role(guild, member, old_role.name)
-
-                    # Выдача новой роли
-                    result = await assign_discord_role(guild, member, clan_role['discord_role_name'])
-                    if "✅" in result:
-                        updated_count += 1
-                        print(f"✅ Обновлена роль для {player['nickname']}: {clan_role['discord_role_name']}")
-
-            print(f"🎉 Автоматическое обновление завершено! Обновлено ролей: {updated_count}")
+        print("🔄 Начинаем автоматическое обновление ролей...")
+        updated_count = 0
+
+        for guild in bot.guilds:
+            updated_count += await role_sync.sync_guild(guild, players)
+
+        print(f"🎉 Автоматическое обновление завершено! Обновлено участников: {updated_count}")
 
     except Exception as e:
         print(f"Ошибка в автоматическом обновлении ролей: {e}")
 
-@auto_role_update.before_loop
-async def before_auto_role_update():
+# События с сайта: короткий опрос очереди раз в BOT_EVENTS_INTERVAL секунд.
+# Long-poll держал бы синхронный воркер gunicorn на всё время ожидания
+BOT_EVENTS_INTERVAL = 5
+# id обработанных событий, подтверждаются следующим запросом
+bot_events_ack = []
+
+def invalidate_responses(path_prefix):
+    """Сбросить кэшированные ответы сайта, путь которых начинается с path_prefix"""
+    prefix = f"{WEBSITE_URL}{path_prefix}"
+    for url in [url for url in _response_cache if url.startswith(prefix)]:
+        del _response_cache[url]
+
+async def poll_bot_events():
+    """Забрать новые события, подтвердив уже обработанные"""
+    session = await open_http_session()
+    url = f"{WEBSITE_URL}/api/bot/events?ack={','.join(map(str, bot_events_ack))}"
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
+        if resp.status != 200:
+            raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status)
+        return await resp.json()
+
+async def send_admin_embed(payload):
+    channel = bot.get_channel(int(payload['channel_id'])) if str(payload.get('channel_id', '')).isdigit() else None
+    if channel is None:
+        print(f"Канал {payload.get('channel_id')} для embed не найден")
+        return
+    try:
+        color = int(str(payload.get('color') or '#3498db').lstrip('#'), 16)
+    except ValueError:
+        color = 0x3498db
+    embed = discord.Embed(title=payload.get('title'), description=payload.get('description'), color=color)
+    if payload.get('footer'):
+        embed.set_footer(text=payload['footer'])
+    if payload.get('image_url'):
+        embed.set_image(url=payload['image_url'])
+    await channel.send(embed=embed)
+
+async def handle_bot_events(events):
+    """Обработать пачку событий, объединяя однотипные"""
+    by_type = {}
+    for event in events:
+        by_type.setdefault(event['type'], []).append(event['payload'])
+
+    for payload in by_type.get('ascend_evaluated', []):
+        invalidate_responses(f"/api/player/{payload['player_id']}/ascend-data")
+
+    if 'stats_changed' in by_type:
+        invalidate_responses("/api/leaderboard")
+        player_ids = sorted({payload['player_id'] for payload in by_type['stats_changed']})
+        await auto_role_update(player_ids)
+
+    if 'karma_low' in by_type:
+        baseline = low_karma_ids is None
+        crossed = await sync_low_karma()
+        # Без ответа сайта или без исходного списка предупреждаем по данным самих событий
+        await karma_monitor(by_type['karma_low'] if crossed is None or baseline else crossed)
+
+    if 'rank_changes' in by_type:
+        invalidate_responses("/api/leaderboard")
+        invalidate_responses("/api/stats")
+        await leaderboard_update()
+
+    for payload in by_type.get('admin_embed', []):
+        await send_admin_embed(payload)
+
+@tasks.loop(seconds=BOT_EVENTS_INTERVAL)
+async def bot_event_consumer():
+    """Забирает события сайта раз в BOT_EVENTS_INTERVAL секунд"""
+    global bot_events_ack
+    try:
+        data = await poll_bot_events()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Ошибка получения событий сайта: {e}")
+        await asyncio.sleep(HTTP_RETRY_BACKOFF * 2 ** HTTP_RETRIES)
+        return
+
+    events = data.get('events', [])
+    if events:
+        try:
+            await handle_bot_events(events)
+        except Exception as e:
+            print(f"Ошибка обработки событий сайта: {e}")
+    # Подтверждаем и при ошибке обработки, чтобы сбойное событие не повторялось бесконечно
+    bot_events_ack = [event['id'] for event in events]
+
+@bot_event_consumer.before_loop
+async def before_bot_event_consumer():
     await bot.wait_until_ready()
+    # Сверка состояния при запуске: события, пропущенные пока бот был выключен, ждут в очереди,
+    # но привязки и статус лучше обновить целиком
+    await leaderboard_update()
+    await auto_role_update()
+    await sync_low_karma()
 
 def run_bot():
     try:
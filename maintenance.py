@@ -47,10 +47,106 @@ def reindex_tables():
     except Exception as e:
         logging.error(f"Ошибка при переиндексации: {e}")
 
+def sweep_expired_boosters():
+    """Деактивирует истёкшие бустеры одним UPDATE на таблицу"""
+    try:
+        with app.app_context():
+            from models import PlayerBooster, PlayerActiveBooster
+            swept = PlayerBooster.cleanup_expired() + PlayerActiveBooster.cleanup_expired()
+            db.session.commit()
+            logging.info(f"Деактивировано истёкших бустеров: {swept}")
+    except Exception as e:
+        logging.error(f"Ошибка при очистке бустеров: {e}")
+
+def compact_ascend_history():
+    """Сворачивает старую историю ASCEND в помесячные сводки"""
+    try:
+        with app.app_context():
+            from models import ASCENDHistory
+            summaries, removed = ASCENDHistory.compact()
+            db.session.commit()
+            logging.info(f"История ASCEND: {removed} записей свёрнуто в {summaries} сводок")
+    except Exception as e:
+        logging.error(f"Ошибка при сжатии истории ASCEND: {e}")
+
+def refresh_stat_rollups():
+    """Досчитывает периодические рейтинги из новых событий статистики"""
+    try:
+        with app.app_context():
+            from models import StatRollup
+            folded = StatRollup.refresh()
+            db.session.commit()
+            logging.info(f"Свёрнуто событий статистики: {folded}")
+    except Exception as e:
+        logging.error(f"Ошибка при обновлении периодических рейтингов: {e}")
+
+def prune_stat_events():
+    """Удаляет старые уже свёрнутые события статистики"""
+    try:
+        with app.app_context():
+            from models import StatRollup
+            removed = StatRollup.prune_events()
+            db.session.commit()
+            logging.info(f"Удалено старых событий статистики: {removed}")
+    except Exception as e:
+        logging.error(f"Ошибка при очистке событий статистики: {e}")
+
+def downsample_stat_snapshots():
+    """Прореживает историю статистики игроков по уровням хранения"""
+    try:
+        with app.app_context():
+            from models import PlayerStatSnapshot
+            removed = PlayerStatSnapshot.downsample()
+            db.session.commit()
+            logging.info(f"Удалено снимков статистики при прореживании: {removed}")
+    except Exception as e:
+        logging.error(f"Ошибка при прореживании истории статистики: {e}")
+
+def snapshot_leaderboards():
+    """Сохраняет снимок топа для показа изменений позиций"""
+    try:
+        with app.app_context():
+            from models import LeaderboardSnapshot, BotEvent
+            snapshots = LeaderboardSnapshot.take()
+            BotEvent.emit_rank_changes(snapshots)
+            removed = LeaderboardSnapshot.prune()
+            db.session.commit()
+            logging.info(f"Снимок лидерборда сохранён, удалено старых: {removed}")
+    except Exception as e:
+        logging.error(f"Ошибка при сохранении снимка лидерборда: {e}")
+
+def prune_bot_events():
+    """Удаляет события для бота, которые никто не забрал"""
+    try:
+        with app.app_context():
+            from models import BotEvent
+            removed = BotEvent.prune()
+            db.session.commit()
+            logging.info(f"Удалено необработанных событий бота: {removed}")
+    except Exception as e:
+        logging.error(f"Ошибка при очистке событий бота: {e}")
+
+def prune_avatar_cache():
+    """Удаляет давно не запрошенные аватары и сиротские файлы из дискового кэша"""
+    try:
+        from avatars import avatar_store
+        removed = avatar_store.prune()
+        logging.info(f"Удалено файлов кэша аватаров: {removed}")
+    except Exception as e:
+        logging.error(f"Ошибка при очистке кэша аватаров: {e}")
+
 # Планировщик задач
 schedule.every().hour.do(update_table_statistics)
 schedule.every(6).hours.do(vacuum_analyze)
 schedule.every().day.at("03:00").do(reindex_tables)
+schedule.every(10).minutes.do(sweep_expired_boosters)
+schedule.every().day.at("03:30").do(compact_ascend_history)
+schedule.every(5).minutes.do(refresh_stat_rollups)
+schedule.every().day.at("04:00").do(prune_stat_events)
+schedule.every().hour.do(downsample_stat_snapshots)
+schedule.every().hour.do(snapshot_leaderboards)
+schedule.every().day.at("04:30").do(prune_bot_events)
+schedule.every().day.at("05:00").do(prune_avatar_cache)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
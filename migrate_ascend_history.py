@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+ASCEND history migration script: moves JSON score blobs into typed columns and compacts old entries
+"""
+
+import json
+import os
+import sys
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text, inspect
+from models import ASCENDHistory
+
+SCORE_COLUMNS = [f'{prefix}_skill{n}_score' for prefix in ('old', 'new') for n in range(1, 5)]
+
+def migrate_ascend_history():
+    """Add typed score columns, backfill them from JSON and apply the retention policy"""
+
+    with app.app_context():
+        try:
+            columns = [column['name'] for column in inspect(db.engine).get_columns('ascend_history')]
+
+            for column in SCORE_COLUMNS:
+                if column not in columns:
+                    db.session.execute(text(f"ALTER TABLE ascend_history ADD COLUMN {column} INTEGER"))
+                    print(f"➕ Added column {column}")
+
+            if 'is_summary' not in columns:
+                db.session.execute(text("ALTER TABLE ascend_history ADD COLUMN is_summary BOOLEAN DEFAULT FALSE NOT NULL"))
+                print("➕ Added column is_summary")
+            if 'entry_count' not in columns:
+                db.session.execute(text("ALTER TABLE ascend_history ADD COLUMN entry_count INTEGER DEFAULT 1 NOT NULL"))
+                print("➕ Added column entry_count")
+
+            if 'new_scores' in columns:
+                rows = db.session.execute(text("SELECT id, old_scores, new_scores FROM ascend_history")).fetchall()
+                for history_id, old_raw, new_raw in rows:
+                    values = {'id': history_id}
+                    for prefix, raw in (('old', old_raw), ('new', new_raw)):
+                        try:
+                            scores = json.loads(raw) if raw else {}
+                        except (TypeError, ValueError):
+                            scores = {}
+                        # New scores are NOT NULL, fall back to the ASCEND starting score
+                        default = 25 if prefix == 'new' else None
+                        for n in range(1, 5):
+                            values[f'{prefix}_skill{n}_score'] = scores.get(f'skill{n}', default)
+
+                    db.session.execute(text(
+                        "UPDATE ascend_history SET " +
+                        ", ".join(f"{column} = :{column}" for column in SCORE_COLUMNS) +
+                        " WHERE id = :id"
+                    ), values)
+
+                db.session.execute(text("ALTER TABLE ascend_history DROP COLUMN old_scores"))
+                db.session.execute(text("ALTER TABLE ascend_history DROP COLUMN new_scores"))
+                print(f"🔁 Backfilled {len(rows)} history rows and dropped JSON columns")
+
+            db.session.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_ascend_history_player_gamemode_created "
+                "ON ascend_history (player_id, gamemode, created_at)"
+            ))
+
+            summaries, removed = ASCENDHistory.compact()
+            db.session.commit()
+
+            print(f"✅ ASCEND history migration completed!")
+            print(f"🗜️ Entries compacted: {removed} into {summaries} monthly summaries")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ ASCEND history migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_ascend_history()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+ASCEND score migration script: adds the stored avg_score column and leaderboard indexes
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text, inspect
+from models import ASCENDData
+
+def migrate_ascend_scores():
+    """Add avg_score, backfill stored tiers and rebuild global ranks"""
+
+    with app.app_context():
+        try:
+            columns = [column['name'] for column in inspect(db.engine).get_columns('ascend_data')]
+
+            if 'avg_score' not in columns:
+                db.session.execute(text("ALTER TABLE ascend_data ADD COLUMN avg_score FLOAT DEFAULT 25.0 NOT NULL"))
+                print("➕ Added column avg_score")
+
+            db.session.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_ascend_gamemode_avg ON ascend_data (gamemode, avg_score)"
+            ))
+            db.session.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_ascend_player_gamemode ON ascend_data (player_id, gamemode)"
+            ))
+
+            # Reads no longer recompute tiers, so store them once for every row
+            rows = ASCENDData.query.all()
+            for ascend_data in rows:
+                ascend_data.update_tiers_from_scores()
+            db.session.flush()
+
+            updated_ranks = ASCENDData.recompute_global_ranks()
+            db.session.commit()
+
+            print(f"✅ ASCEND score migration completed!")
+            print(f"📊 Rows backfilled: {len(rows)}")
+            print(f"🏆 Ranks updated: {updated_ranks}")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ ASCEND score migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_ascend_scores()
@@ -30,48 +30,6 @@ def migrate_database():
 
             # Define all missing columns that need to be added
             new_columns = [
-                # KitPVP Stats
-                ("kitpvp_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("kitpvp_deaths", "INTEGER DEFAULT 0 NOT NULL"),
-                ("kitpvp_games", "INTEGER DEFAULT 0 NOT NULL"),
-                
-                # SkyWars Stats
-                ("skywars_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_solo_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_team_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_mega_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_mini_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_ranked_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_solo_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_team_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_mega_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_mini_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("skywars_ranked_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                
-                # Sumo Stats
-                ("sumo_games_played", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_monthly_games", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_daily_games", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_deaths", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_monthly_deaths", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_daily_deaths", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_monthly_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_daily_wins", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_losses", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_monthly_losses", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_daily_losses", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_monthly_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_daily_kills", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_winstreak", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_monthly_winstreak", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_daily_winstreak", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_best_winstreak", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_monthly_best_winstreak", "INTEGER DEFAULT 0 NOT NULL"),
-                ("sumo_daily_best_winstreak", "INTEGER DEFAULT 0 NOT NULL"),
-                
                 # Enhanced statistics
                 ("iron_collected", "INTEGER DEFAULT 0 NOT NULL"),
                 ("gold_collected", "INTEGER DEFAULT 0 NOT NULL"),
@@ -128,13 +86,11 @@ def migrate_database():
                 ("leaderboard_gradient_end", "VARCHAR(7) DEFAULT '#f7931e'"),
                 ("leaderboard_gradient_animated", "BOOLEAN DEFAULT FALSE NOT NULL"),
                 
-                # Inventory system
-                ("inventory_data", "TEXT"),
-                
                 # Economy system fields
                 ("coins", "INTEGER DEFAULT 0 NOT NULL"),
                 ("reputation", "INTEGER DEFAULT 0 NOT NULL"),
                 ("karma", "INTEGER DEFAULT 0 NOT NULL"),
+                ("karma_changed_at", "DATETIME"),
                 
                 # Custom role system
                 ("custom_role", "VARCHAR(100)"),
@@ -161,10 +117,10 @@ def migrate_database():
 
             # Create indexes for performance
             indexes = [
-                "CREATE INDEX IF NOT EXISTS idx_player_karma ON player(karma)",
-                "CREATE INDEX IF NOT EXISTS idx_player_kitpvp_kills ON player(kitpvp_kills)",
-                "CREATE INDEX IF NOT EXISTS idx_player_skywars_wins ON player(skywars_wins)",
-                "CREATE INDEX IF NOT EXISTS idx_player_sumo_wins ON player(sumo_wins)",
+                # idx_player_karma duplicated the single-column karma index
+                "DROP INDEX IF EXISTS idx_player_karma",
+                "CREATE INDEX IF NOT EXISTS idx_player_karma_id ON player(karma, id)",
+                "CREATE INDEX IF NOT EXISTS idx_player_karma_changed ON player(karma_changed_at, id)",
             ]
 
             for index_sql in indexes:
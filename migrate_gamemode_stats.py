@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Gamemode stats migration script: moves kitpvp_*, skywars_* and sumo_* columns from player into the per-mode tables
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text, inspect
+from models import GameModeManager, Player
+
+def add_missing_columns(model):
+    """Add per-mode columns that older databases do not have yet"""
+    table = model.__tablename__
+    existing = [column['name'] for column in inspect(db.engine).get_columns(table)]
+
+    for column in model.__table__.columns:
+        if column.name in existing:
+            continue
+        column_type = column.type.compile(dialect=db.engine.dialect)
+        default = column.default.arg if column.default is not None and not column.default.is_callable else None
+        if isinstance(default, str):
+            default = f"'{default}'"
+        clause = f" DEFAULT {default} NOT NULL" if default is not None else ""
+        db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}{clause}"))
+        print(f"➕ {table}.{column.name}")
+
+def migrate_gamemode_stats():
+    """Copy wide Player gamemode columns into per-mode tables and drop them"""
+
+    with app.app_context():
+        try:
+            db.create_all()
+            player_columns = [column['name'] for column in inspect(db.engine).get_columns('player')]
+
+            for gamemode, mapping in GameModeManager.LEGACY_PLAYER_COLUMNS.items():
+                add_missing_columns(GameModeManager.GAMEMODE_MODELS[gamemode])
+
+                legacy = [name for name in mapping if name in player_columns]
+                if not legacy:
+                    print(f"ℹ️ {gamemode}: columns already moved")
+                    continue
+
+                rows = db.session.execute(text(
+                    f"SELECT id, {', '.join(legacy)} FROM player WHERE " +
+                    " OR ".join(f"{name} > 0" for name in legacy)
+                )).mappings().all()
+
+                for row in rows:
+                    GameModeManager.update_from_legacy_fields(row['id'], gamemode, {name: row[name] for name in legacy})
+                db.session.flush()
+
+                for name in legacy:
+                    db.session.execute(text(f"ALTER TABLE player DROP COLUMN {name}"))
+
+                print(f"🔁 {gamemode}: moved {len(rows)} players, dropped {len(legacy)} player columns")
+
+            # Composite indexes backing the keyset-paginated leaderboards
+            for model in [Player] + list(GameModeManager.GAMEMODE_MODELS.values()):
+                for index in model.__table__.indexes:
+                    index.create(bind=db.session.connection(), checkfirst=True)
+
+            db.session.commit()
+            GameModeManager.clear_statistics_cache()
+            print("✅ Gamemode stats migration completed!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Gamemode stats migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_gamemode_stats()
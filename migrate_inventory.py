@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Inventory migration script: folds Player.inventory_data JSON into inventory_item rows
+"""
+
+import json
+import os
+import sys
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text, inspect
+from models import InventoryItem, ShopItem
+
+
+def merge_duplicate_rows():
+    """Collapse several rows of the same item into one counter row"""
+    duplicates = db.session.execute(text("""
+        SELECT player_id, item_id, MIN(id) AS keep_id,
+               SUM(CASE WHEN status = 'unused' THEN quantity ELSE 0 END) AS total
+        FROM inventory_item
+        GROUP BY player_id, item_id
+        HAVING COUNT(*) > 1
+    """)).fetchall()
+
+    for row in duplicates:
+        db.session.execute(text("""
+            UPDATE inventory_item
+            SET quantity = :total, status = CASE WHEN :total > 0 THEN 'unused' ELSE 'used' END
+            WHERE id = :keep_id
+        """), {'total': row.total, 'keep_id': row.keep_id})
+        db.session.execute(text("""
+            DELETE FROM inventory_item
+            WHERE player_id = :player_id AND item_id = :item_id AND id != :keep_id
+        """), {'player_id': row.player_id, 'item_id': row.item_id, 'keep_id': row.keep_id})
+
+    print(f"🔗 Объединено дубликатов: {len(duplicates)}")
+
+
+def fold_inventory_json():
+    """Move Player.inventory_data blobs into inventory_item"""
+    columns = [column['name'] for column in inspect(db.engine).get_columns('player')]
+    if 'inventory_data' not in columns:
+        print("ℹ️ Колонка inventory_data отсутствует, переносить нечего")
+        return
+
+    items_by_name = {item.name: item.id for item in ShopItem.query.all()}
+    item_ids = set(items_by_name.values())
+
+    rows = db.session.execute(text(
+        "SELECT id, inventory_data FROM player WHERE inventory_data IS NOT NULL AND inventory_data != ''"
+    )).fetchall()
+
+    folded = 0
+    skipped = 0
+    for player_id, raw in rows:
+        try:
+            inventory = json.loads(raw)
+        except (TypeError, ValueError):
+            skipped += 1
+            continue
+
+        for item_type, entries in (inventory or {}).items():
+            for key, quantity in (entries or {}).items():
+                item_id = int(key) if str(key).isdigit() and int(key) in item_ids else items_by_name.get(key)
+                if not item_id or not quantity or quantity <= 0:
+                    print(f"⚠️ Пропущен предмет {item_type}/{key} игрока {player_id}")
+                    skipped += 1
+                    continue
+                InventoryItem.add(player_id, item_id, quantity)
+                folded += 1
+
+    db.session.execute(text("UPDATE player SET inventory_data = NULL WHERE inventory_data IS NOT NULL"))
+    print(f"📦 Перенесено записей из JSON: {folded}, пропущено: {skipped}")
+
+
+def migrate_inventory():
+    """Normalize inventory storage"""
+    with app.app_context():
+        try:
+            db.create_all()
+            merge_duplicate_rows()
+            db.session.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_inventory_player_item "
+                "ON inventory_item (player_id, item_id)"
+            ))
+            fold_inventory_json()
+            db.session.commit()
+            print("✅ Миграция инвентаря завершена!")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Ошибка миграции инвентаря: {e}")
+
+
+if __name__ == "__main__":
+    migrate_inventory()
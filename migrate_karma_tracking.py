@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Karma tracking migration script: adds player.karma_changed_at and the keyset indexes behind /api/players/karma
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db
+from sqlalchemy import text, inspect
+from models import Player
+
+KARMA_INDEXES = ('idx_player_karma_id', 'idx_player_karma_changed')
+
+def migrate_karma_tracking():
+    """Add karma_changed_at and its indexes on SQLite and PostgreSQL alike"""
+
+    with app.app_context():
+        try:
+            columns = [column['name'] for column in inspect(db.engine).get_columns('player')]
+
+            if 'karma_changed_at' not in columns:
+                column_type = Player.__table__.c.karma_changed_at.type.compile(dialect=db.engine.dialect)
+                db.session.execute(text(f"ALTER TABLE player ADD COLUMN karma_changed_at {column_type}"))
+                print("➕ Added column karma_changed_at")
+
+            # idx_player_karma duplicated the single-column karma index
+            db.session.execute(text("DROP INDEX IF EXISTS idx_player_karma"))
+            for index in Player.__table__.indexes:
+                if index.name in KARMA_INDEXES:
+                    index.create(bind=db.session.connection(), checkfirst=True)
+
+            db.session.commit()
+            print("✅ Karma tracking migration completed!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Karma tracking migration failed: {e}")
+
+if __name__ == "__main__":
+    migrate_karma_tracking()
@@ -16,6 +16,22 @@ def migrate_postgresql():
             # Create all missing tables
             db.create_all()
             print("✅ All tables created/updated")
+
+            # create_all() never alters existing tables; these bring them up to
+            # the models in series order. Karma tracking only adds a column and
+            # indexes, so running it ahead of the others is harmless
+            from migrate_karma_tracking import migrate_karma_tracking
+            migrate_karma_tracking()
+            from migrate_shop_purchase import migrate_shop_purchase
+            migrate_shop_purchase()
+            from migrate_inventory import migrate_inventory
+            migrate_inventory()
+            from migrate_ascend_scores import migrate_ascend_scores
+            migrate_ascend_scores()
+            from migrate_ascend_history import migrate_ascend_history
+            migrate_ascend_history()
+            from migrate_gamemode_stats import migrate_gamemode_stats
+            migrate_gamemode_stats()
             
             # Initialize default themes with Minecraft-style names
             init_minecraft_themes()
@@ -1,30 +1,72 @@
+#!/usr/bin/env python3
+"""
+Shop purchase migration script: adds the paid price and is_permanent columns and the purchase indexes
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import app, db
-from sqlalchemy import text
+from sqlalchemy import text, inspect, literal, select, func, update
+from models import ShopPurchase, ShopItem
+
+PURCHASE_COLUMNS = ('price_paid_coins', 'price_paid_reputation', 'is_permanent')
+PERMANENT_CATEGORIES = ('title', 'theme', 'cursor', 'avatar')
+
+def column_definition(column):
+    """Type, default and nullability of a model column, rendered for the engine's dialect"""
+    dialect = db.engine.dialect
+    definition = column.type.compile(dialect=dialect)
+    if column.default is not None and not column.default.is_callable:
+        default = literal(column.default.arg, column.type).compile(
+            dialect=dialect, compile_kwargs={'literal_binds': True}
+        )
+        definition += f" DEFAULT {default}"
+        if not column.nullable:
+            definition += " NOT NULL"
+    return definition
 
 def migrate_shop_purchase():
-    """Добавить новые поля в таблицу shop_purchase"""
-    
+    """Добавить новые поля и индексы в таблицу shop_purchase на SQLite и PostgreSQL"""
+
     with app.app_context():
         try:
-            # Проверяем, существуют ли уже новые поля
-            result = db.session.execute(text("PRAGMA table_info(shop_purchase)"))
-            columns = [row[1] for row in result.fetchall()]
-            
-            if 'price_paid_coins' not in columns:
-                db.session.execute(text("ALTER TABLE shop_purchase ADD COLUMN price_paid_coins INTEGER DEFAULT 0 NOT NULL"))
-                print("Добавлено поле price_paid_coins")
-            
-            if 'price_paid_reputation' not in columns:
-                db.session.execute(text("ALTER TABLE shop_purchase ADD COLUMN price_paid_reputation INTEGER DEFAULT 0 NOT NULL"))
-                print("Добавлено поле price_paid_reputation")
-            
+            table = ShopPurchase.__table__
+            columns = [column['name'] for column in inspect(db.engine).get_columns(table.name)]
+
+            for name in PURCHASE_COLUMNS:
+                if name not in columns:
+                    db.session.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {name} {column_definition(table.c[name])}"
+                    ))
+                    print(f"➕ Добавлено поле {name}")
+
+            if 'is_permanent' not in columns:
+                # Помечаем только первую покупку неразменных товаров,
+                # чтобы старые дубликаты не мешали уникальному индексу
+                first_purchases = select(func.min(ShopPurchase.id)).join(
+                    ShopItem, ShopItem.id == ShopPurchase.item_id
+                ).where(
+                    ShopItem.category.in_(PERMANENT_CATEGORIES)
+                ).group_by(ShopPurchase.player_id, ShopPurchase.item_id)
+                db.session.execute(
+                    update(table).where(table.c.id.in_(first_purchases)).values(is_permanent=True)
+                )
+
+            # The partial unique index gets its dialect's WHERE clause from the model
+            for index in table.indexes:
+                index.create(bind=db.session.connection(), checkfirst=True)
+            print("🔑 Созданы индексы для покупок")
+
             db.session.commit()
-            print("Миграция ShopPurchase завершена успешно!")
-            
+            print("✅ Миграция ShopPurchase завершена успешно!")
+
         except Exception as e:
-            print(f"Ошибка миграции: {e}")
             db.session.rollback()
+            print(f"❌ Ошибка миграции ShopPurchase: {e}")
 
 if __name__ == '__main__':
     migrate_shop_purchase()
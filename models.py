@@ -1,13 +1,20 @@
 from app import db
-from datetime import datetime
-from sqlalchemy import func, case, text, Index
-from sqlalchemy.orm import joinedload, selectinload
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, text, Index, event, inspect as sa_inspect
+from sqlalchemy.orm import joinedload, selectinload, Session
 from functools import lru_cache
 import json
+import re
 
 class ASCENDHistory(db.Model):
     """Model for storing ASCEND evaluation history"""
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('idx_ascend_history_player_gamemode_created', 'player_id', 'gamemode', 'created_at'),
+        {'extend_existing': True}
+    )
+
+    # Full detail is kept this long, older entries are folded into monthly summaries
+    DETAIL_RETENTION_DAYS = 90
 
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
@@ -18,39 +25,157 @@ class ASCENDHistory(db.Model):
     new_overall_tier = db.Column(db.String(3), nullable=False)
 
     # Score changes
-    old_scores = db.Column(db.Text, nullable=True)  # JSON
-    new_scores = db.Column(db.Text, nullable=False)  # JSON
+    old_skill1_score = db.Column(db.Integer, nullable=True)
+    old_skill2_score = db.Column(db.Integer, nullable=True)
+    old_skill3_score = db.Column(db.Integer, nullable=True)
+    old_skill4_score = db.Column(db.Integer, nullable=True)
+    new_skill1_score = db.Column(db.Integer, nullable=False)
+    new_skill2_score = db.Column(db.Integer, nullable=False)
+    new_skill3_score = db.Column(db.Integer, nullable=False)
+    new_skill4_score = db.Column(db.Integer, nullable=False)
 
     # Change details
     change_type = db.Column(db.String(20), default='update', nullable=False)  # update, upgrade, downgrade
     evaluator_name = db.Column(db.String(100), nullable=False)
     comment = db.Column(db.Text, nullable=True)
 
+    # Monthly summaries replace all entries of a month once it is past retention
+    is_summary = db.Column(db.Boolean, default=False, nullable=False)
+    entry_count = db.Column(db.Integer, default=1, nullable=False)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
     player = db.relationship('Player', backref='ascend_history')
 
+    TIER_VALUES = {'D': 1, 'C': 2, 'C+': 3, 'B': 4, 'B+': 5, 'A': 6, 'A+': 7, 'S': 8, 'S+': 9}
+
+    @classmethod
+    def change_type_for(cls, old_tier, new_tier):
+        """Classify a tier change as update, upgrade or downgrade"""
+        if old_tier == new_tier:
+            return 'update'
+        if cls.TIER_VALUES.get(new_tier, 1) > cls.TIER_VALUES.get(old_tier, 1):
+            return 'upgrade'
+        return 'downgrade'
+
+    @classmethod
+    def from_change(cls, ascend_data, old_tier=None, old_scores=None, **kwargs):
+        """Build a history entry for ascend_data; old_scores is a list of four scores"""
+        old_scores = old_scores or [None] * 4
+        return cls(
+            player_id=ascend_data.player_id,
+            gamemode=ascend_data.gamemode,
+            old_overall_tier=old_tier,
+            new_overall_tier=ascend_data.overall_tier,
+            old_skill1_score=old_scores[0],
+            old_skill2_score=old_scores[1],
+            old_skill3_score=old_scores[2],
+            old_skill4_score=old_scores[3],
+            new_skill1_score=ascend_data.skill1_score,
+            new_skill2_score=ascend_data.skill2_score,
+            new_skill3_score=ascend_data.skill3_score,
+            new_skill4_score=ascend_data.skill4_score,
+            change_type=cls.change_type_for(old_tier or ascend_data.overall_tier, ascend_data.overall_tier),
+            evaluator_name=ascend_data.evaluator_name,
+            comment=ascend_data.comment,
+            **kwargs
+        )
+
+    @classmethod
+    def retention_cutoff(cls, now=None):
+        """Start of the oldest month that still keeps full detail"""
+        boundary = (now or datetime.utcnow()) - timedelta(days=cls.DETAIL_RETENTION_DAYS)
+        return boundary.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def compact(cls, now=None, batch_size=1000):
+        """Collapse entries older than the retention window into one row per player, gamemode and month.
+
+        A summary keeps the scores before the first change and after the last
+        one, so the timeline still shows what moved during that month.
+        Returns (summaries_written, rows_removed). The caller commits.
+        """
+        cutoff = cls.retention_cutoff(now)
+        rows = cls.query.filter(cls.created_at < cutoff).order_by(
+            cls.player_id, cls.gamemode, cls.created_at, cls.id
+        ).yield_per(batch_size)
+
+        groups = []
+        current_key = None
+        for row in rows:
+            key = (row.player_id, row.gamemode, row.created_at.year, row.created_at.month)
+            if key != current_key:
+                groups.append([])
+                current_key = key
+            groups[-1].append(row)
+
+        summaries = []
+        removed_ids = []
+        for entries in groups:
+            if len(entries) == 1 and entries[0].is_summary:
+                continue
+
+            first, last = entries[0], entries[-1]
+            month_start = first.created_at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            summaries.append(cls(
+                player_id=first.player_id,
+                gamemode=first.gamemode,
+                old_overall_tier=first.old_overall_tier,
+                new_overall_tier=last.new_overall_tier,
+                old_skill1_score=first.old_skill1_score,
+                old_skill2_score=first.old_skill2_score,
+                old_skill3_score=first.old_skill3_score,
+                old_skill4_score=first.old_skill4_score,
+                new_skill1_score=last.new_skill1_score,
+                new_skill2_score=last.new_skill2_score,
+                new_skill3_score=last.new_skill3_score,
+                new_skill4_score=last.new_skill4_score,
+                change_type=cls.change_type_for(first.old_overall_tier or last.new_overall_tier, last.new_overall_tier),
+                evaluator_name=last.evaluator_name,
+                comment=last.comment,
+                is_summary=True,
+                entry_count=sum(entry.entry_count or 1 for entry in entries),
+                created_at=month_start
+            ))
+            removed_ids.extend(entry.id for entry in entries)
+
+        for start in range(0, len(removed_ids), batch_size):
+            cls.query.filter(cls.id.in_(removed_ids[start:start + batch_size])).delete(synchronize_session=False)
+        db.session.add_all(summaries)
+        db.session.flush()
+
+        return len(summaries), len(removed_ids)
+
+    def _scores(self, prefix):
+        scores = {f'skill{n}': getattr(self, f'{prefix}_skill{n}_score') for n in range(1, 5)}
+        return scores if any(score is not None for score in scores.values()) else None
+
     def to_dict(self):
         """Convert to dictionary for API responses"""
-        import json
         return {
             'id': self.id,
             'player_id': self.player_id,
             'gamemode': self.gamemode,
             'old_overall_tier': self.old_overall_tier,
             'new_overall_tier': self.new_overall_tier,
-            'old_scores': json.loads(self.old_scores) if self.old_scores else None,
-            'new_scores': json.loads(self.new_scores) if self.new_scores else None,
+            'old_scores': self._scores('old'),
+            'new_scores': self._scores('new'),
             'change_type': self.change_type,
             'evaluator_name': self.evaluator_name,
             'comment': self.comment,
+            'is_summary': self.is_summary,
+            'entry_count': self.entry_count,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
 class ASCENDData(db.Model):
     """Model for storing ASCEND performance card data"""
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('idx_ascend_gamemode_avg', 'gamemode', 'avg_score'),
+        Index('idx_ascend_player_gamemode', 'player_id', 'gamemode'),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
@@ -98,6 +223,9 @@ class ASCENDData(db.Model):
     # Global ranking
     global_rank = db.Column(db.Integer, nullable=True)
 
+    # Average of the four skill scores, kept in sync at write time
+    avg_score = db.Column(db.Float, default=25.0, nullable=False)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -128,8 +256,6 @@ class ASCENDData(db.Model):
 
     def save_to_history(self):
         """Save current state to history before making changes"""
-        import json
-
         # Get old data if exists for the same gamemode
         old_data = ASCENDData.query.filter_by(
             player_id=self.player_id,
@@ -137,52 +263,146 @@ class ASCENDData(db.Model):
         ).filter(ASCENDData.id != self.id).first()
 
         if old_data:
-            # Determine change type
-            change_type = 'update'
-            if old_data.overall_tier != self.overall_tier:
-                tier_values = {'D': 1, 'C': 2, 'C+': 3, 'B': 4, 'B+': 5, 'A': 6, 'A+': 7, 'S': 8, 'S+': 9}
-                if tier_values.get(self.overall_tier, 1) > tier_values.get(old_data.overall_tier, 1):
-                    change_type = 'upgrade'
-                else:
-                    change_type = 'downgrade'
-
             # Create history entry
-            history = ASCENDHistory(
-                player_id=self.player_id,
-                gamemode=self.gamemode,
-                old_overall_tier=old_data.overall_tier,
-                new_overall_tier=self.overall_tier,
-                old_scores=json.dumps({
-                    'skill1': old_data.skill1_score,
-                    'skill2': old_data.skill2_score,
-                    'skill3': old_data.skill3_score,
-                    'skill4': old_data.skill4_score
-                }),
-                new_scores=json.dumps({
-                    'skill1': self.skill1_score,
-                    'skill2': self.skill2_score,
-                    'skill3': self.skill3_score,
-                    'skill4': self.skill4_score
-                }),
-                change_type=change_type,
-                evaluator_name=self.evaluator_name,
-                comment=self.comment
+            history = ASCENDHistory.from_change(
+                self,
+                old_tier=old_data.overall_tier,
+                old_scores=[old_data.skill1_score, old_data.skill2_score,
+                            old_data.skill3_score, old_data.skill4_score]
             )
             db.session.add(history)
 
     def update_global_rank(self):
         """Update global rank based on overall performance within the same gamemode"""
-        # Calculate average score
-        avg_score = (self.skill1_score + self.skill2_score + self.skill3_score + self.skill4_score) / 4
+        db.session.flush()
+        self.recompute_global_ranks([self.gamemode])
+
+    @staticmethod
+    def _supports_window_functions():
+        """SQLite only has RANK() OVER (...) since 3.25"""
+        dialect = db.session.get_bind().dialect
+        if dialect.name != 'sqlite':
+            return True
+        return dialect.dbapi.sqlite_version_info >= (3, 25, 0)
 
-        # Count players with higher scores in same gamemode only
-        higher_count = db.session.query(ASCENDData).filter(
-            ASCENDData.gamemode == self.gamemode,
-            ASCENDData.player_id != self.player_id,  # Exclude current player
-            (ASCENDData.skill1_score + ASCENDData.skill2_score + ASCENDData.skill3_score + ASCENDData.skill4_score) / 4 > avg_score
-        ).count()
+    @classmethod
+    def recompute_global_ranks(cls, gamemodes=None):
+        """Recompute global_rank for whole gamemodes and write only changed rows.
+
+        Ranks come from one RANK() OVER (PARTITION BY gamemode ORDER BY
+        avg_score DESC) query, or from a sort in Python where window functions are not
+        available. Ties share a rank, matching the previous "players with a
+        higher score + 1" rule. Returns the number of rows updated.
+        """
+        from sqlalchemy import update
+
+        if cls._supports_window_functions():
+            query = db.session.query(
+                cls.id,
+                cls.global_rank,
+                func.rank().over(partition_by=cls.gamemode, order_by=cls.avg_score.desc()).label('new_rank')
+            )
+            if gamemodes:
+                query = query.filter(cls.gamemode.in_(gamemodes))
+            ranked = [(row.id, row.global_rank, row.new_rank) for row in query.all()]
+        else:
+            query = db.session.query(cls.id, cls.gamemode, cls.global_rank, cls.avg_score.label('total'))
+            if gamemodes:
+                query = query.filter(cls.gamemode.in_(gamemodes))
+            rows = sorted(query.all(), key=lambda row: (row.gamemode, -row.total))
+
+            ranked = []
+            previous = None
+            for position, row in enumerate(rows):
+                if previous is None or row.gamemode != previous.gamemode:
+                    start, rank = position, 1
+                elif row.total != previous.total:
+                    rank = position - start + 1
+                ranked.append((row.id, row.global_rank, rank))
+                previous = row
+
+        changes = [{'id': row_id, 'global_rank': new_rank}
+                   for row_id, old_rank, new_rank in ranked if old_rank != new_rank]
+        if changes:
+            db.session.execute(update(cls), changes)
+            # Bulk UPDATE by primary key does not touch loaded objects
+            for obj in list(db.session.identity_map.values()):
+                if isinstance(obj, cls) and (not gamemodes or obj.gamemode in gamemodes):
+                    db.session.expire(obj, ['global_rank'])
+        return len(changes)
+
+    @classmethod
+    def bulk_import(cls, records, evaluator_name='Elite Squad AI (Import)'):
+        """Upsert a whole evaluation session at once.
+
+        records are validated dicts with player_id, gamemode, scores
+        ({skill number: score}) and an optional comment/evaluator_name.
+        Existing rows are loaded in one query, history rows are added in one
+        batch and ranks are recomputed once per touched gamemode. The caller
+        commits. Returns a summary dict.
+        """
+        if not records:
+            return {'created': 0, 'updated': 0, 'history': 0, 'ranks_updated': 0}
+
+        player_ids = {record['player_id'] for record in records}
+        gamemodes = {record['gamemode'] for record in records}
+
+        existing = {
+            (row.player_id, row.gamemode): row
+            for row in cls.query.filter(cls.player_id.in_(player_ids), cls.gamemode.in_(gamemodes)).all()
+        }
+        modes = {mode.name: mode for mode in GameMode.query.filter(GameMode.name.in_(gamemodes)).all()}
+
+        created = updated = 0
+        history_rows = []
+        now = datetime.utcnow()
+
+        for record in records:
+            key = (record['player_id'], record['gamemode'])
+            ascend_data = existing.get(key)
+
+            if ascend_data is None:
+                mode = modes.get(record['gamemode'])
+                ascend_data = cls(
+                    player_id=record['player_id'],
+                    gamemode=record['gamemode'],
+                    skill1_name=mode.skill1_name if mode else 'PVP',
+                    skill2_name=mode.skill2_name if mode else 'Clutching',
+                    skill3_name=mode.skill3_name if mode else 'Block Placement',
+                    skill4_name=mode.skill4_name if mode else 'Gamesense',
+                    skill1_score=25, skill2_score=25, skill3_score=25, skill4_score=25
+                )
+                db.session.add(ascend_data)
+                existing[key] = ascend_data
+                old_tier, old_scores = None, None
+                created += 1
+            else:
+                old_tier = ascend_data.overall_tier
+                old_scores = [getattr(ascend_data, f'skill{n}_score') for n in range(1, 5)]
+                updated += 1
+
+            for number, score in record['scores'].items():
+                setattr(ascend_data, f'skill{number}_score', score)
+            ascend_data.update_tiers_from_scores()
+            ascend_data.previous_tier = old_tier
+            ascend_data.comment = record.get('comment') or ascend_data.comment
+            ascend_data.evaluator_name = record.get('evaluator_name') or evaluator_name
+            ascend_data.updated_at = now
+
+            history_rows.append(ASCENDHistory.from_change(
+                ascend_data, old_tier=old_tier, old_scores=old_scores, created_at=now
+            ))
+
+        db.session.add_all(history_rows)
+        db.session.flush()
+        ranks_updated = cls.recompute_global_ranks(sorted(gamemodes))
 
-        self.global_rank = higher_count + 1
+        return {
+            'created': created,
+            'updated': updated,
+            'history': len(history_rows),
+            'ranks_updated': ranks_updated
+        }
 
     def calculate_tier_from_score(self, score):
         """Calculate tier based on score"""
@@ -205,16 +425,20 @@ class ASCENDData(db.Model):
         else:
             return 'D'
 
+    def calculate_average_score(self):
+        """Average of the four skill scores"""
+        return (self.skill1_score + self.skill2_score + self.skill3_score + self.skill4_score) / 4
+
     def update_tiers_from_scores(self):
-        """Update all tiers based on their scores"""
+        """Update all tiers and the stored average based on their scores"""
         self.skill1_tier = self.calculate_tier_from_score(self.skill1_score)
         self.skill2_tier = self.calculate_tier_from_score(self.skill2_score)
         self.skill3_tier = self.calculate_tier_from_score(self.skill3_score)
         self.skill4_tier = self.calculate_tier_from_score(self.skill4_score)
 
         # Calculate overall tier from average score
-        average_score = (self.skill1_score + self.skill2_score + self.skill3_score + self.skill4_score) / 4
-        self.overall_tier = self.calculate_tier_from_score(average_score)
+        self.avg_score = self.calculate_average_score()
+        self.overall_tier = self.calculate_tier_from_score(self.avg_score)
 
         # Update legacy fields for backwards compatibility
         self.pvp_tier = self.skill1_tier
@@ -228,10 +452,7 @@ class ASCENDData(db.Model):
         self.gamesense_score = self.skill4_score
 
     def to_dict(self):
-        """Convert to dictionary for API responses"""
-        # Ensure tiers are up to date
-        self.update_tiers_from_scores()
-
+        """Convert to dictionary for API responses (read-only, tiers are stored at write time)"""
         return {
             'id': self.id,
             'player_id': self.player_id,
@@ -249,6 +470,7 @@ class ASCENDData(db.Model):
             'skill4_tier': self.skill4_tier,
             'skill4_score': self.skill4_score,
             'overall_tier': self.overall_tier,
+            'avg_score': self.avg_score,
             'global_rank': self.global_rank,
             'comment': self.comment,
             'evaluator_name': self.evaluator_name,
@@ -925,48 +1147,6 @@ class Player(db.Model):
     wins = db.Column(db.Integer, default=0, nullable=False, index=True)
     experience = db.Column(db.Integer, default=0, nullable=False, index=True)
 
-    # KitPVP Stats
-    kitpvp_kills = db.Column(db.Integer, default=0, nullable=False)
-    kitpvp_deaths = db.Column(db.Integer, default=0, nullable=False)
-    kitpvp_games = db.Column(db.Integer, default=0, nullable=False)
-
-    # SkyWars Stats
-    skywars_wins = db.Column(db.Integer, default=0, nullable=False)
-    skywars_solo_wins = db.Column(db.Integer, default=0, nullable=False)
-    skywars_team_wins = db.Column(db.Integer, default=0, nullable=False)
-    skywars_mega_wins = db.Column(db.Integer, default=0, nullable=False)
-    skywars_mini_wins = db.Column(db.Integer, default=0, nullable=False)
-    skywars_ranked_wins = db.Column(db.Integer, default=0, nullable=False)
-    skywars_kills = db.Column(db.Integer, default=0, nullable=False)
-    skywars_solo_kills = db.Column(db.Integer, default=0, nullable=False)
-    skywars_team_kills = db.Column(db.Integer, default=0, nullable=False)
-    skywars_mega_kills = db.Column(db.Integer, default=0, nullable=False)
-    skywars_mini_kills = db.Column(db.Integer, default=0, nullable=False)
-    skywars_ranked_kills = db.Column(db.Integer, default=0, nullable=False)
-
-    # Sumo Stats
-    sumo_games_played = db.Column(db.Integer, default=0, nullable=False)
-    sumo_monthly_games = db.Column(db.Integer, default=0, nullable=False)
-    sumo_daily_games = db.Column(db.Integer, default=0, nullable=False)
-    sumo_deaths = db.Column(db.Integer, default=0, nullable=False)
-    sumo_monthly_deaths = db.Column(db.Integer, default=0, nullable=False)
-    sumo_daily_deaths = db.Column(db.Integer, default=0, nullable=False)
-    sumo_wins = db.Column(db.Integer, default=0, nullable=False)
-    sumo_monthly_wins = db.Column(db.Integer, default=0, nullable=False)
-    sumo_daily_wins = db.Column(db.Integer, default=0, nullable=False)
-    sumo_losses = db.Column(db.Integer, default=0, nullable=False)
-    sumo_monthly_losses = db.Column(db.Integer, default=0, nullable=False)
-    sumo_daily_losses = db.Column(db.Integer, default=0, nullable=False)
-    sumo_kills = db.Column(db.Integer, default=0, nullable=False)
-    sumo_monthly_kills = db.Column(db.Integer, default=0, nullable=False)
-    sumo_daily_kills = db.Column(db.Integer, default=0, nullable=False)
-    sumo_winstreak = db.Column(db.Integer, default=0, nullable=False)
-    sumo_monthly_winstreak = db.Column(db.Integer, default=0, nullable=False)
-    sumo_daily_winstreak = db.Column(db.Integer, default=0, nullable=False)
-    sumo_best_winstreak = db.Column(db.Integer, default=0, nullable=False)
-    sumo_monthly_best_winstreak = db.Column(db.Integer, default=0, nullable=False)
-    sumo_daily_best_winstreak = db.Column(db.Integer, default=0, nullable=False)
-
     # New fields for enhanced statistics
     iron_collected = db.Column(db.Integer, default=0, nullable=False)
     gold_collected = db.Column(db.Integer, default=0, nullable=False)
@@ -1024,9 +1204,6 @@ class Player(db.Model):
     leaderboard_gradient_end = db.Column(db.String(7), default='#f7931e', nullable=True)
     leaderboard_gradient_animated = db.Column(db.Boolean, default=False, nullable=False)
 
-    # Inventory system
-    inventory_data = db.Column(db.Text, nullable=True)  # JSON data for player inventory
-
     # Relationships for quest system
     player_quests = db.relationship('PlayerQuest', backref='player', lazy=True, cascade='all, delete-orphan')
     player_achievements = db.relationship('PlayerAchievement', backref='player', lazy=True, cascade='all, delete-orphan')
@@ -1037,13 +1214,16 @@ class Player(db.Model):
 
     # Karma system fields (NEW)
     karma = db.Column(db.Integer, default=0, nullable=False, index=True)
+    karma_changed_at = db.Column(db.DateTime, nullable=True)  # set by track_karma_changes
 
     # Индексы для оптимизации PostgreSQL
     __table_args__ = (
         Index('idx_player_stats', 'experience', 'wins', 'kills'),
+        Index('idx_player_experience_id', 'experience', 'id'),
         Index('idx_player_updated', 'last_updated'),
         Index('idx_player_level_calc', 'experience', 'wins', 'games_played'),
-        Index('idx_player_karma', 'karma'),
+        Index('idx_player_karma_id', 'karma', 'id'),
+        Index('idx_player_karma_changed', 'karma_changed_at', 'id'),
         Index('idx_player_nickname_search', 'nickname'),
         Index('idx_player_kd_calc', 'kills', 'deaths'),
         Index('idx_player_winrate_calc', 'wins', 'games_played'),
@@ -1251,13 +1431,22 @@ class Player(db.Model):
         """Get the role to display - admin role replaces regular role"""
         # Priority 1: Admin role replaces regular role
         admin_role = self.active_admin_role
-        if admin_role and admin_role.role:
-            return admin_role.role.name
+        return self.role_for(
+            admin_role.role.name if admin_role and admin_role.role else None,
+            self.custom_role_purchased, self.custom_role, self.role
+        )
+
+    @staticmethod
+    def role_for(admin_role_name, custom_role_purchased, custom_role, role):
+        """Resolve the displayed role from raw column values"""
+        # Priority 1: Admin role replaces regular role
+        if admin_role_name:
+            return admin_role_name
         # Priority 2: Custom role if purchased
-        elif self.custom_role_purchased and self.custom_role:
-            return self.custom_role
+        elif custom_role_purchased and custom_role:
+            return custom_role
         # Priority 3: Regular role
-        return self.role
+        return role
 
     @property
     def effective_role_data(self):
@@ -1419,54 +1608,7 @@ class Player(db.Model):
                 'win_rate': self.win_rate,
                 'level': self.level
             }
-        elif gamemode == 'kitpvp':
-            kd = round(self.kitpvp_kills / self.kitpvp_deaths, 2) if self.kitpvp_deaths > 0 else self.kitpvp_kills
-            return {
-                'kills': self.kitpvp_kills,
-                'deaths': self.kitpvp_deaths,
-                'games': self.kitpvp_games,
-                'kd_ratio': kd
-            }
-        elif gamemode == 'skywars':
-            return {
-                'wins': self.skywars_wins,
-                'solo_wins': self.skywars_solo_wins,
-                'team_wins': self.skywars_team_wins,
-                'mega_wins': self.skywars_mega_wins,
-                'mini_wins': self.skywars_mini_wins,
-                'ranked_wins': self.skywars_ranked_wins,
-                'kills': self.skywars_kills,
-                'solo_kills': self.skywars_solo_kills,
-                'team_kills': self.skywars_team_kills,
-                'mega_kills': self.skywars_mega_kills,
-                'mini_kills': self.skywars_mini_kills,
-                'ranked_kills': self.skywars_ranked_kills
-            }
-        elif gamemode == 'sumo':
-            return {
-                'games_played': self.sumo_games_played,
-                'monthly_games': self.sumo_monthly_games,
-                'daily_games': self.sumo_daily_games,
-                'deaths': self.sumo_deaths,
-                'monthly_deaths': self.sumo_monthly_deaths,
-                'daily_deaths': self.sumo_daily_deaths,
-                'wins': self.sumo_wins,
-                'monthly_wins': self.sumo_monthly_wins,
-                'daily_wins': self.sumo_daily_wins,
-                'losses': self.sumo_losses,
-                'monthly_losses': self.sumo_monthly_losses,
-                'daily_losses': self.sumo_daily_losses,
-                'kills': self.sumo_kills,
-                'monthly_kills': self.sumo_monthly_kills,
-                'daily_kills': self.sumo_daily_kills,
-                'winstreak': self.sumo_winstreak,
-                'monthly_winstreak': self.sumo_monthly_winstreak,
-                'daily_winstreak': self.sumo_daily_winstreak,
-                'best_winstreak': self.sumo_best_winstreak,
-                'monthly_best_winstreak': self.sumo_monthly_best_winstreak,
-                'daily_best_winstreak': self.sumo_daily_best_winstreak
-            }
-        return {}
+        return GameModeManager.get_stats_dict(self.id, gamemode)
 
     @property
     def custom_role_features_available(self):
@@ -1542,50 +1684,27 @@ class Player(db.Model):
         self.social_networks = json.dumps(networks_list) if networks_list else None
 
     def get_inventory(self):
-        """Get parsed inventory data"""
-        if not self.inventory_data:
-            return {}
-        try:
-            import json
-            return json.loads(self.inventory_data)
-        except:
-            return {}
-
-    def set_inventory(self, inventory_dict):
-        """Set inventory data"""
-        import json
-        self.inventory_data = json.dumps(inventory_dict) if inventory_dict else None
+        """Get inventory as {category: {item_id: quantity}}"""
+        return InventoryItem.get_player_inventory(self.id)
 
     def add_inventory_item(self, item_type, item_id, quantity=1):
-        """Add item to player inventory"""
-        inventory = self.get_inventory()
-        if item_type not in inventory:
-            inventory[item_type] = {}
-
-        if item_id in inventory[item_type]:
-            inventory[item_type][item_id] += quantity
-        else:
-            inventory[item_type][item_id] = quantity
-
-        self.set_inventory(inventory)
+        """Add item to player inventory (item_type is the shop item category)"""
+        InventoryItem.add(self.id, item_id, quantity)
 
     def remove_inventory_item(self, item_type, item_id, quantity=1):
         """Remove item from player inventory"""
-        inventory = self.get_inventory()
-        if item_type in inventory and item_id in inventory[item_type]:
-            inventory[item_type][item_id] -= quantity
-            if inventory[item_type][item_id] <= 0:
-                del inventory[item_type][item_id]
-            if not inventory[item_type]:
-                del inventory[item_type]
-            self.set_inventory(inventory)
-            return True
-        return False
+        return InventoryItem.remove(self.id, item_id, quantity)
 
     def get_inventory_item_count(self, item_type, item_id):
         """Get count of specific item in inventory"""
-        inventory = self.get_inventory()
-        return inventory.get(item_type, {}).get(item_id, 0)
+        return InventoryItem.get_quantity(self.id, item_id)
+
+    @property
+    def inventory_items(self):
+        """Inventory rows with their shop items, for the inventory page"""
+        return InventoryItem.query.options(
+            joinedload(InventoryItem.item)
+        ).filter_by(player_id=self.id).order_by(InventoryItem.created_at.desc()).all()
 
     def get_shop_purchases(self):
         """Get all shop purchases made by player"""
@@ -1629,6 +1748,12 @@ class Player(db.Model):
     @property
     def level(self):
         """Calculate player level based on Hypixel experience system"""
+        return self.level_for_experience(self.experience)
+
+    @staticmethod
+    def level_for_experience(experience):
+        """Calculate level from raw experience, for column-only query results"""
+        experience = experience or 0
         # Hypixel level thresholds
         level_thresholds = [
             0, 10000, 22500, 37500, 55000, 75000, 97500, 122500, 150000, 180000,
@@ -1644,12 +1769,12 @@ class Player(db.Model):
         ]
 
         for level, threshold in enumerate(level_thresholds, 1):
-            if self.experience < threshold:
+            if experience < threshold:
                 return max(1, level - 1)
 
         # For levels 100+, each level requires 2500 more XP than the previous
-        if self.experience >= 13117500:
-            additional_levels = (self.experience - 13117500) // 2500
+        if experience >= 13117500:
+            additional_levels = (experience - 13117500) // 2500
             return min(1000, 100 + additional_levels)
 
         return 100
@@ -1724,31 +1849,39 @@ class Player(db.Model):
     @property
     def minecraft_skin_url(self):
         """Get Minecraft skin URL based on skin type and settings"""
+        return self.skin_url_for(self.nickname, self.custom_avatar_url, self.skin_type,
+                                 self.skin_url, self.is_premium)
+
+    @staticmethod
+    def skin_url_for(nickname, custom_avatar_url, skin_type, skin_url, is_premium):
+        """Resolve the skin URL from raw column values"""
         # Use custom avatar if set
-        if self.custom_avatar_url:
-            return self.custom_avatar_url
-
-        if self.skin_type == 'custom' and self.skin_url:
-            return self.skin_url
-        elif self.skin_type == 'steve':
-            return 'https://mc-heads.net/avatar/steve/128'
-        elif self.skin_type == 'alex':
-            return 'https://mc-heads.net/avatar/alex/128'
-        elif self.skin_type == 'auto':
+        if custom_avatar_url:
+            return custom_avatar_url
+
+        if skin_type == 'custom' and skin_url:
+            # Heads saved from NameMC before the avatar proxy existed
+            match = re.match(r'https://crafatar\.com/avatars/([A-Za-z0-9_]{1,16})\?', skin_url)
+            return f'/avatar/{match.group(1)}/128' if match else skin_url
+        elif skin_type == 'steve':
+            return '/avatar/steve/128'
+        elif skin_type == 'alex':
+            return '/avatar/alex/128'
+        elif skin_type == 'auto':
             # Auto mode: try to get skin by nickname first, then fallback
-            if self.nickname:
-                return f'https://mc-heads.net/avatar/{self.nickname}/128'
+            if nickname:
+                return f'/avatar/{nickname}/128'
             else:
-                return 'https://mc-heads.net/avatar/steve/128'
-        elif self.is_premium and self.nickname:
+                return '/avatar/steve/128'
+        elif is_premium and nickname:
             # Try to get premium skin by nickname
-            return f'https://mc-heads.net/avatar/{self.nickname}/128'
+            return f'/avatar/{nickname}/128'
         else:
             # Default to steve/alex randomly based on nickname hash
             import hashlib
-            hash_val = int(hashlib.md5(self.nickname.encode()).hexdigest(), 16)
+            hash_val = int(hashlib.md5(nickname.encode()).hexdigest(), 16)
             default_skin = 'alex' if hash_val % 2 else 'steve'
-            return f'https://mc-heads.net/avatar/{default_skin}/128'
+            return f'/avatar/{default_skin}/128'
 
     def set_custom_skin(self, namemc_url):
         """Set custom skin from NameMC URL"""
@@ -1760,8 +1893,8 @@ class Player(db.Model):
                 match = re.search(r'namemc\.com/profile/([^/]+)', namemc_url)
                 if match:
                     username = match.group(1)
-                    # Use Crafatar to get skin
-                    self.skin_url = f'https://crafatar.com/avatars/{username}?size=128'
+                    # Served through the local avatar proxy
+                    self.skin_url = f'/avatar/{username}/128'
                     self.skin_type = 'custom'
                     return True
             except:
@@ -1812,6 +1945,232 @@ class Player(db.Model):
             app.logger.error(f"Error getting leaderboard: {e}")
             return []
 
+    # Columns each leaderboard sort depends on; single-column sorts are
+    # invalidated by value range, computed ones as a whole
+    LEADERBOARD_SORT_SOURCES = {
+        'experience': ('experience',),
+        'kills': ('kills',),
+        'final_kills': ('final_kills',),
+        'beds_broken': ('beds_broken',),
+        'wins': ('wins',),
+        'karma': ('karma',),
+        'kd_ratio': ('kills', 'deaths'),
+        'win_rate': ('wins', 'games_played'),
+    }
+    LEADERBOARD_ROW_COLUMNS = ('nickname', 'role', 'custom_role', 'custom_role_purchased',
+                               'custom_avatar_url', 'skin_type', 'skin_url', 'is_premium',
+                               'experience', 'kills', 'deaths', 'final_kills', 'beds_broken',
+                               'wins', 'games_played', 'karma')
+    # Page invalidation only reaches the worker process that flushed the
+    # change; other workers keep serving their copy until it expires, so
+    # this TTL bounds how stale a page can be.
+    LEADERBOARD_PAGE_TTL = 30
+
+    @classmethod
+    def get_leaderboard_page(cls, sort_by='experience', limit=50, offset=0):
+        """Leaderboard page as plain row dicts, served from the page cache"""
+        from cache import LeaderboardPageCache
+
+        if sort_by not in cls.LEADERBOARD_SORT_SOURCES:
+            sort_by = 'experience'
+        limit = min(max(1, limit), 100)
+        offset = max(0, offset)
+
+        rows = LeaderboardPageCache.get(sort_by, limit, offset)
+        if rows is not None:
+            return rows
+
+        players = cls.get_leaderboard(sort_by=sort_by, limit=limit, offset=offset)
+        rows = cls.leaderboard_rows(players)
+        sources = cls.LEADERBOARD_SORT_SOURCES[sort_by]
+        values = [row[sort_by] or 0 for row in rows] if len(sources) == 1 else None
+        if rows:
+            LeaderboardPageCache.set(sort_by, limit, offset, rows, values, cls.LEADERBOARD_PAGE_TTL)
+        return rows
+
+    @classmethod
+    def leaderboard_rows(cls, players):
+        """Serialize players for the leaderboard with one query per decoration"""
+        ids = [player.id for player in players]
+        if not ids:
+            return []
+
+        gradients = {}
+        for setting in PlayerGradientSetting.query.filter(
+            PlayerGradientSetting.player_id.in_(ids),
+            PlayerGradientSetting.element_type.in_(('nickname', 'stats', 'title', 'role')),
+            PlayerGradientSetting.is_enabled == True
+        ).order_by(PlayerGradientSetting.id):
+            gradients.setdefault((setting.player_id, setting.element_type), setting.css_gradient)
+
+        titles = {}
+        for player_title in PlayerTitle.query.options(joinedload(PlayerTitle.title)).filter(
+            PlayerTitle.player_id.in_(ids),
+            PlayerTitle.is_active == True
+        ).order_by(PlayerTitle.id):
+            if player_title.title:
+                titles.setdefault(player_title.player_id, player_title.title.display_name)
+
+        admin_roles = {}
+        for player_id, role_name in db.session.query(PlayerAdminRole.player_id, AdminCustomRole.name).join(
+            AdminCustomRole, AdminCustomRole.id == PlayerAdminRole.role_id
+        ).filter(
+            PlayerAdminRole.player_id.in_(ids),
+            PlayerAdminRole.is_active == True
+        ).order_by(PlayerAdminRole.id):
+            admin_roles.setdefault(player_id, role_name)
+
+        badges = {}
+        for player_id, badge in db.session.query(PlayerBadge.player_id, Badge).join(
+            Badge, Badge.id == PlayerBadge.badge_id
+        ).filter(
+            PlayerBadge.player_id.in_(ids),
+            PlayerBadge.is_visible == True,
+            Badge.is_active == True
+        ).order_by(PlayerBadge.display_order, PlayerBadge.id):
+            badges.setdefault(player_id, []).append({
+                'display_name': badge.display_name,
+                'description': badge.description,
+                'emoji': badge.emoji,
+                'rarity': badge.rarity
+            })
+
+        return [{
+            'id': player.id,
+            'nickname': player.nickname,
+            'role': player.role,
+            'display_role': cls.role_for(admin_roles.get(player.id), player.custom_role_purchased,
+                                         player.custom_role, player.role),
+            'level': player.level,
+            'experience': player.experience,
+            'kills': player.kills,
+            'deaths': player.deaths,
+            'final_kills': player.final_kills,
+            'beds_broken': player.beds_broken,
+            'wins': player.wins,
+            'games_played': player.games_played,
+            'karma': player.karma,
+            'kd_ratio': player.kd_ratio,
+            'win_rate': player.win_rate,
+            'minecraft_skin_url': player.minecraft_skin_url,
+            'active_custom_title': titles.get(player.id),
+            'nickname_gradient': gradients.get((player.id, 'nickname')),
+            'stats_gradient': gradients.get((player.id, 'stats')),
+            'title_gradient': gradients.get((player.id, 'title')),
+            'role_gradient': gradients.get((player.id, 'role')),
+            'visible_badges': badges.get(player.id, [])
+        } for player in players]
+
+    @classmethod
+    def invalidate_leaderboard_pages(cls, session):
+        """Drop the cached leaderboard pages a pending flush will change"""
+        from cache import LeaderboardPageCache
+
+        decorations = (PlayerGradientSetting, PlayerTitle, PlayerAdminRole, PlayerBadge)
+
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, cls):
+                present = obj in session.new
+                for sort_key, sources in cls.LEADERBOARD_SORT_SOURCES.items():
+                    if len(sources) > 1:
+                        LeaderboardPageCache.invalidate_sort(sort_key)
+                        continue
+                    value = getattr(obj, sort_key) or 0
+                    LeaderboardPageCache.invalidate_range(sort_key, None if present else value,
+                                                          value if present else None)
+            elif isinstance(obj, decorations) and obj.player_id:
+                LeaderboardPageCache.invalidate_player(obj.player_id)
+
+        for obj in list(session.dirty):
+            if isinstance(obj, decorations):
+                LeaderboardPageCache.invalidate_player(obj.player_id)
+                continue
+            if not isinstance(obj, cls) or not session.is_modified(obj):
+                continue
+
+            state = sa_inspect(obj)
+            for sort_key, sources in cls.LEADERBOARD_SORT_SOURCES.items():
+                histories = [state.attrs[column].history for column in sources]
+                if not any(history.has_changes() for history in histories):
+                    continue
+                history = histories[0]
+                if len(sources) > 1 or not history.deleted:
+                    # Previous value unknown (or computed sort): drop the whole sort
+                    LeaderboardPageCache.invalidate_sort(sort_key)
+                else:
+                    LeaderboardPageCache.invalidate_range(sort_key, history.deleted[0] or 0,
+                                                          getattr(obj, sort_key) or 0)
+            # Stat changes within a page's range are handled above; rows also
+            # show counters the page isn't sorted by, nickname, role and skin
+            if any(state.attrs[column].history.has_changes() for column in cls.LEADERBOARD_ROW_COLUMNS):
+                LeaderboardPageCache.invalidate_player(obj.id)
+
+    @classmethod
+    def track_karma_changes(cls, session):
+        """Stamp karma_changed_at on new players and on players whose karma a pending flush changes.
+
+        A new player is a change too: it starts below the warning threshold,
+        and ?since= consumers only learn about it through this stamp.
+        """
+        now = datetime.utcnow()
+        for obj in list(session.new):
+            if isinstance(obj, cls):
+                obj.karma_changed_at = now
+        for obj in list(session.dirty):
+            if isinstance(obj, cls) and sa_inspect(obj).attrs['karma'].history.has_changes():
+                obj.karma_changed_at = now
+
+    @classmethod
+    def get_karma_page(cls, below, limit=100, cursor=None, since=None):
+        """Keyset-paginated players by karma.
+
+        Without since: exactly the players with karma < below, ordered by
+        (karma, id); cursor is "karma:player_id".
+        With since: every player whose karma changed after that moment, on
+        either side of the threshold, ordered by (karma_changed_at, id) with
+        an 'at_risk' flag; cursor is "changed_at_iso:player_id".
+        Returns {'players': [...], 'next_cursor': str or None}; raises
+        ValueError for a malformed cursor.
+        """
+        query = db.session.query(cls.id, cls.nickname, cls.karma, cls.karma_changed_at)
+        if since is None:
+            sort_column = cls.karma
+            query = query.filter(cls.karma < below)
+        else:
+            sort_column = cls.karma_changed_at
+            query = query.filter(cls.karma_changed_at > since)
+
+        if cursor:
+            try:
+                last_value, last_id = cursor.rsplit(':', 1)
+                last_id = int(last_id)
+                last_value = int(last_value) if since is None else datetime.fromisoformat(last_value)
+            except ValueError:
+                raise ValueError('Invalid cursor')
+            query = query.filter(db.or_(
+                sort_column > last_value,
+                db.and_(sort_column == last_value, cls.id > last_id)
+            ))
+
+        rows = query.order_by(sort_column.asc(), cls.id.asc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        players = [{
+            'id': player_id,
+            'nickname': nickname,
+            'karma': karma,
+            'karma_changed_at': changed_at.isoformat() if changed_at else None,
+            'at_risk': karma < below
+        } for player_id, nickname, karma, changed_at in rows]
+
+        next_cursor = None
+        if has_more and players:
+            last = players[-1]
+            last_value = last['karma'] if since is None else last['karma_changed_at']
+            next_cursor = f"{last_value}:{last['id']}"
+        return {'players': players, 'next_cursor': next_cursor}
+
     @classmethod
     def search_players(cls, query, limit=50, offset=0):
         """Search players by nickname with error handling"""
@@ -1905,16 +2264,16 @@ class Player(db.Model):
             func.sum(cls.wins).label('total_wins'),
             func.sum(cls.beds_broken).label('total_beds_broken'),
             # KitPVP stats
-            func.sum(cls.kitpvp_kills).label('total_kitpvp_kills'),
-            func.sum(cls.kitpvp_deaths).label('total_kitpvp_deaths'),
-            func.sum(cls.kitpvp_games).label('total_kitpvp_games'),
+            db.session.query(func.sum(KitPvPStats.kills)).scalar_subquery().label('total_kitpvp_kills'),
+            db.session.query(func.sum(KitPvPStats.deaths)).scalar_subquery().label('total_kitpvp_deaths'),
+            db.session.query(func.sum(KitPvPStats.games_played)).scalar_subquery().label('total_kitpvp_games'),
             # SkyWars stats
-            func.sum(cls.skywars_wins).label('total_skywars_wins'),
-            func.sum(cls.skywars_kills).label('total_skywars_kills'),
+            db.session.query(func.sum(SkyWarsStats.wins)).scalar_subquery().label('total_skywars_wins'),
+            db.session.query(func.sum(SkyWarsStats.kills)).scalar_subquery().label('total_skywars_kills'),
             # Sumo stats
-            func.sum(cls.sumo_games_played).label('total_sumo_games'),
-            func.sum(cls.sumo_wins).label('total_sumo_wins'),
-            func.sum(cls.sumo_kills).label('total_sumo_kills'),
+            db.session.query(func.sum(SumoStats.games_played)).scalar_subquery().label('total_sumo_games'),
+            db.session.query(func.sum(SumoStats.wins)).scalar_subquery().label('total_sumo_wins'),
+            db.session.query(func.sum(SumoStats.kills)).scalar_subquery().label('total_sumo_kills'),
             # Economy
             func.sum(cls.coins).label('total_coins'),
             func.sum(cls.reputation).label('total_reputation'),
@@ -1971,9 +2330,9 @@ class Player(db.Model):
             'most_karma_player': most_karma_player.nickname if most_karma_player else None,
             'karma_percentage': karma_percentage,
             # Gamemode leaders
-            'top_kitpvp_player': cls.query.filter(cls.kitpvp_kills > 0).order_by(cls.kitpvp_kills.desc()).first(),
-            'top_skywars_player': cls.query.filter(cls.skywars_wins > 0).order_by(cls.skywars_wins.desc()).first(),
-            'top_sumo_player': cls.query.filter(cls.sumo_wins > 0).order_by(cls.sumo_wins.desc()).first()
+            'top_kitpvp_player': GameModeManager.get_top_player('kitpvp', 'kills'),
+            'top_skywars_player': GameModeManager.get_top_player('skywars', 'wins'),
+            'top_sumo_player': GameModeManager.get_top_player('sumo', 'wins')
         }
 
         # Cache result for 5 minutes
@@ -2082,6 +2441,9 @@ class BedwarsStats(db.Model):
 
 class KitPvPStats(db.Model):
     """KitPvP statistics for individual players"""
+    __table_args__ = (
+        Index('idx_kitpvp_stats_kills_player', 'kills', 'player_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False, index=True)
@@ -2089,6 +2451,7 @@ class KitPvPStats(db.Model):
     # Core KitPvP stats
     kills = db.Column(db.Integer, default=0, nullable=False, index=True)
     deaths = db.Column(db.Integer, default=0, nullable=False)
+    games_played = db.Column(db.Integer, default=0, nullable=False)
     assists = db.Column(db.Integer, default=0, nullable=False)
     killstreak = db.Column(db.Integer, default=0, nullable=False)
     best_killstreak = db.Column(db.Integer, default=0, nullable=False)
@@ -2127,11 +2490,22 @@ class KitPvPStats(db.Model):
             'player_id': self.player_id,
             'kills': self.kills,
             'deaths': self.deaths,
-            'kd_ratio': self.kd_ratio
+            'games': self.games_played,
+            'games_played': self.games_played,
+            'assists': self.assists,
+            'killstreak': self.killstreak,
+            'best_killstreak': self.best_killstreak,
+            'kd_ratio': self.kd_ratio,
+            'level': self.level,
+            'experience': self.experience,
+            'rating': self.rating
         }
 
 class SkyWarsStats(db.Model):
     """SkyWars statistics for individual players"""
+    __table_args__ = (
+        Index('idx_skywars_stats_wins_player', 'wins', 'player_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False, index=True)
@@ -2144,6 +2518,18 @@ class SkyWarsStats(db.Model):
     wins = db.Column(db.Integer, default=0, nullable=False, index=True)
     winstreak = db.Column(db.Integer, default=0, nullable=False)
 
+    # Per-queue breakdown
+    solo_wins = db.Column(db.Integer, default=0, nullable=False)
+    team_wins = db.Column(db.Integer, default=0, nullable=False)
+    mega_wins = db.Column(db.Integer, default=0, nullable=False)
+    mini_wins = db.Column(db.Integer, default=0, nullable=False)
+    ranked_wins = db.Column(db.Integer, default=0, nullable=False)
+    solo_kills = db.Column(db.Integer, default=0, nullable=False)
+    team_kills = db.Column(db.Integer, default=0, nullable=False)
+    mega_kills = db.Column(db.Integer, default=0, nullable=False)
+    mini_kills = db.Column(db.Integer, default=0, nullable=False)
+    ranked_kills = db.Column(db.Integer, default=0, nullable=False)
+
     # SkyWars specific
     chests_opened = db.Column(db.Integer, default=0, nullable=False)
     items_enchanted = db.Column(db.Integer, default=0, nullable=False)
@@ -2196,6 +2582,16 @@ class SkyWarsStats(db.Model):
             'level': self.level,
             'experience': self.experience,
             'rating': self.rating,
+            'solo_wins': self.solo_wins,
+            'team_wins': self.team_wins,
+            'mega_wins': self.mega_wins,
+            'mini_wins': self.mini_wins,
+            'ranked_wins': self.ranked_wins,
+            'solo_kills': self.solo_kills,
+            'team_kills': self.team_kills,
+            'mega_kills': self.mega_kills,
+            'mini_kills': self.mini_kills,
+            'ranked_kills': self.ranked_kills,
             'chests_opened': self.chests_opened,
             'items_enchanted': self.items_enchanted,
             'arrows_shot': self.arrows_shot,
@@ -2267,17 +2663,38 @@ class BridgeFightStats(db.Model):
 
 class SumoStats(db.Model):
     """Sumo statistics for individual players"""
+    __table_args__ = (
+        Index('idx_sumo_stats_wins_player', 'wins', 'player_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False, index=True)
 
     # Core Sumo stats
-    games_played = db.Column(db.Integer, default=0, nullable=False)
+    games_played = db.Column(db.Integer, default=0, nullable=False, index=True)
     wins = db.Column(db.Integer, default=0, nullable=False, index=True)
     losses = db.Column(db.Integer, default=0, nullable=False)
+    kills = db.Column(db.Integer, default=0, nullable=False)
+    deaths = db.Column(db.Integer, default=0, nullable=False)
     winstreak = db.Column(db.Integer, default=0, nullable=False)
     best_winstreak = db.Column(db.Integer, default=0, nullable=False)
 
+    # Monthly and daily counters
+    monthly_games = db.Column(db.Integer, default=0, nullable=False)
+    daily_games = db.Column(db.Integer, default=0, nullable=False)
+    monthly_deaths = db.Column(db.Integer, default=0, nullable=False)
+    daily_deaths = db.Column(db.Integer, default=0, nullable=False)
+    monthly_wins = db.Column(db.Integer, default=0, nullable=False)
+    daily_wins = db.Column(db.Integer, default=0, nullable=False)
+    monthly_losses = db.Column(db.Integer, default=0, nullable=False)
+    daily_losses = db.Column(db.Integer, default=0, nullable=False)
+    monthly_kills = db.Column(db.Integer, default=0, nullable=False)
+    daily_kills = db.Column(db.Integer, default=0, nullable=False)
+    monthly_winstreak = db.Column(db.Integer, default=0, nullable=False)
+    daily_winstreak = db.Column(db.Integer, default=0, nullable=False)
+    monthly_best_winstreak = db.Column(db.Integer, default=0, nullable=False)
+    daily_best_winstreak = db.Column(db.Integer, default=0, nullable=False)
+
     # Sumo specific
     knockouts = db.Column(db.Integer, default=0, nullable=False)
     time_survived = db.Column(db.Integer, default=0, nullable=False)  # seconds
@@ -2312,10 +2729,26 @@ class SumoStats(db.Model):
         return {
             'player_id': self.player_id,
             'games_played': self.games_played,
+            'monthly_games': self.monthly_games,
+            'daily_games': self.daily_games,
+            'deaths': self.deaths,
+            'monthly_deaths': self.monthly_deaths,
+            'daily_deaths': self.daily_deaths,
             'wins': self.wins,
+            'monthly_wins': self.monthly_wins,
+            'daily_wins': self.daily_wins,
             'losses': self.losses,
+            'monthly_losses': self.monthly_losses,
+            'daily_losses': self.daily_losses,
+            'kills': self.kills,
+            'monthly_kills': self.monthly_kills,
+            'daily_kills': self.daily_kills,
             'winstreak': self.winstreak,
+            'monthly_winstreak': self.monthly_winstreak,
+            'daily_winstreak': self.daily_winstreak,
             'best_winstreak': self.best_winstreak,
+            'monthly_best_winstreak': self.monthly_best_winstreak,
+            'daily_best_winstreak': self.daily_best_winstreak,
             'win_rate': self.win_rate,
             'level': self.level,
             'experience': self.experience,
@@ -2392,6 +2825,18 @@ class FireballFightStats(db.Model):
             'accuracy': self.accuracy
         }
 
+def _stat_ratio(kills, deaths):
+    """Kill/death style ratio, matching the model properties"""
+    if deaths == 0:
+        return kills if kills > 0 else 0
+    return round(kills / deaths, 2)
+
+def _stat_percent(wins, games):
+    """Win rate percentage, matching the model properties"""
+    if games == 0:
+        return 0
+    return round((wins / games) * 100, 1)
+
 # Utility class for gamemode management
 class GameModeManager:
     """Utility class for managing different game modes and their statistics"""
@@ -2414,6 +2859,75 @@ class GameModeManager:
         'fireball_fight': 'Fireball Fight'
     }
 
+    # Column names these modes used to have on Player (and still use in admin forms)
+    LEGACY_PLAYER_COLUMNS = {
+        'kitpvp': {'kitpvp_kills': 'kills', 'kitpvp_deaths': 'deaths', 'kitpvp_games': 'games_played'},
+        'skywars': {f'skywars_{field}': field for field in (
+            'wins', 'solo_wins', 'team_wins', 'mega_wins', 'mini_wins', 'ranked_wins',
+            'kills', 'solo_kills', 'team_kills', 'mega_kills', 'mini_kills', 'ranked_kills'
+        )},
+        'sumo': {f'sumo_{field}': field for field in (
+            'games_played', 'monthly_games', 'daily_games',
+            'deaths', 'monthly_deaths', 'daily_deaths',
+            'wins', 'monthly_wins', 'daily_wins',
+            'losses', 'monthly_losses', 'daily_losses',
+            'kills', 'monthly_kills', 'daily_kills',
+            'winstreak', 'monthly_winstreak', 'daily_winstreak',
+            'best_winstreak', 'monthly_best_winstreak', 'daily_best_winstreak'
+        )}
+    }
+
+    # Declarative leaderboards: sort column, column that must be non-zero to be
+    # listed, projected columns and metrics derived from them. Bedwars still
+    # lives on Player. Adding a mode here is all get_leaderboard_page needs.
+    LEADERBOARDS = {
+        'bedwars': {
+            'sort': 'experience',
+            'active': 'experience',
+            'fields': ('experience', 'kills', 'final_kills', 'deaths', 'final_deaths',
+                       'beds_broken', 'wins', 'games_played'),
+            'derived': {
+                'level': lambda row: Player.level_for_experience(row['experience']),
+                'kd_ratio': lambda row: _stat_ratio(row['kills'], row['deaths']),
+                'fkd_ratio': lambda row: _stat_ratio(row['final_kills'], row['final_deaths']),
+                'win_rate': lambda row: _stat_percent(row['wins'], row['games_played'])
+            }
+        },
+        'kitpvp': {
+            'sort': 'kills',
+            'active': 'kills',
+            'fields': ('kills', 'deaths', 'games_played', 'experience', 'rating'),
+            'derived': {
+                'kd_ratio': lambda row: _stat_ratio(row['kills'], row['deaths']),
+                'level': lambda row: max(1, row['experience'] // 5000)
+            }
+        },
+        'skywars': {
+            'sort': 'wins',
+            'active': 'wins',
+            'fields': ('wins', 'solo_wins', 'team_wins', 'mega_wins', 'mini_wins', 'ranked_wins',
+                       'kills', 'solo_kills', 'team_kills', 'mega_kills', 'mini_kills', 'ranked_kills',
+                       'experience', 'rating'),
+            'derived': {
+                'level': lambda row: max(1, row['experience'] // 7500)
+            }
+        },
+        'sumo': {
+            'sort': 'wins',
+            'active': 'games_played',
+            'fields': tuple(LEGACY_PLAYER_COLUMNS['sumo'].values()) + ('experience', 'rating'),
+            'derived': {
+                'win_rate': lambda row: _stat_percent(row['wins'], row['games_played']),
+                'level': lambda row: max(1, row['experience'] // 4000)
+            }
+        }
+    }
+
+    LEADERBOARD_CACHE_TTL = 60
+    # Only first pages of these sizes are cached; caching every cursor or
+    # limit a client sends would let it grow the cache without bound
+    LEADERBOARD_CACHED_LIMITS = (10, 25, 50, 100)
+
     @classmethod
     def get_player_stats(cls, player_id, gamemode):
         """Get player statistics for specific gamemode"""
@@ -2440,7 +2954,53 @@ class GameModeManager:
         return stats
 
     @classmethod
-    def get_gamemode_leaderboard(cls, gamemode, sort_by='rating', limit=50):
+    def set_player_stats(cls, player_id, gamemode, **values):
+        """Write gamemode statistics for a player, creating the row if needed. The caller commits."""
+        if gamemode not in cls.GAMEMODE_MODELS:
+            return None
+
+        model = cls.GAMEMODE_MODELS[gamemode]
+        stats = model.query.filter_by(player_id=player_id).first()
+        if not stats:
+            stats = cls._blank_stats(model, player_id)
+            db.session.add(stats)
+
+        for key, value in values.items():
+            if key in model.__table__.columns and key not in ('id', 'player_id'):
+                setattr(stats, key, value)
+        stats.updated_at = datetime.utcnow()
+
+        return stats
+
+    @classmethod
+    def update_from_legacy_fields(cls, player_id, gamemode, fields):
+        """Write stats given with the old Player column names (kitpvp_kills, sumo_wins, ...)"""
+        mapping = cls.LEGACY_PLAYER_COLUMNS.get(gamemode, {})
+        return cls.set_player_stats(player_id, gamemode, **{
+            mapping[name]: value for name, value in fields.items() if name in mapping
+        })
+
+    @classmethod
+    def get_stats_dict(cls, player_id, gamemode):
+        """Statistics dict for a player, zeros if the player never played the mode"""
+        if gamemode not in cls.GAMEMODE_MODELS:
+            return {}
+
+        stats = cls.get_player_stats(player_id, gamemode)
+        return (stats or cls._blank_stats(cls.GAMEMODE_MODELS[gamemode], player_id)).to_dict()
+
+    @staticmethod
+    def _blank_stats(model, player_id):
+        """Unsaved stats row with column defaults applied"""
+        values = {
+            column.name: column.default.arg
+            for column in model.__table__.columns
+            if column.default is not None and not column.default.is_callable
+        }
+        return model(player_id=player_id, **values)
+
+    @classmethod
+    def get_gamemode_leaderboard(cls, gamemode, sort_by='rating', limit=50, active_column=None):
         """Get leaderboard for specific gamemode"""
         if gamemode not in cls.GAMEMODE_MODELS:
             return []
@@ -2464,7 +3024,125 @@ class GameModeManager:
 
         sort_column = sort_options.get(sort_by, model.rating.desc())
 
-        return model.query.join(Player).order_by(sort_column).limit(limit).all()
+        query = model.query.join(Player).options(joinedload(model.player))
+        if active_column:
+            query = query.filter(getattr(model, active_column) > 0)
+
+        return query.order_by(sort_column).limit(limit).all()
+
+    @classmethod
+    def stats_model(cls, gamemode):
+        """Model that actually holds a mode's counters (Bedwars still lives on Player)"""
+        return Player if gamemode == 'bedwars' else cls.GAMEMODE_MODELS.get(gamemode)
+
+    @classmethod
+    def _leaderboard_query(cls, gamemode):
+        """Projected query for a registered leaderboard: (query, sort column, player id column)"""
+        spec = cls.LEADERBOARDS[gamemode]
+        model = cls.stats_model(gamemode)
+        player_id = Player.id if model is Player else model.player_id
+
+        admin_role_name = db.session.query(AdminCustomRole.name).join(
+            PlayerAdminRole, PlayerAdminRole.role_id == AdminCustomRole.id
+        ).filter(
+            PlayerAdminRole.player_id == Player.id,
+            PlayerAdminRole.is_active == True
+        ).order_by(PlayerAdminRole.id).limit(1).scalar_subquery()
+
+        query = db.session.query(
+            Player.id, Player.nickname, Player.role, Player.custom_role, Player.custom_role_purchased,
+            Player.custom_avatar_url, Player.skin_type, Player.skin_url, Player.is_premium,
+            admin_role_name.label('admin_role_name'),
+            *[getattr(model, field).label(field) for field in spec['fields']]
+        )
+        if model is not Player:
+            query = query.select_from(model).join(Player, Player.id == model.player_id)
+
+        sort_column = getattr(model, spec['sort'])
+        query = query.filter(getattr(model, spec['active']) > 0)
+        return query, sort_column, player_id
+
+    @classmethod
+    def _serialize_leaderboard(cls, gamemode, rows, first_rank):
+        """Turn projected rows into API dicts in one pass"""
+        spec = cls.LEADERBOARDS[gamemode]
+        fields = spec['fields']
+        derived = spec['derived'].items()
+
+        entries = []
+        for rank, row in enumerate(rows, first_rank):
+            entry = {field: getattr(row, field) for field in fields}
+            entry.update({name: metric(entry) for name, metric in derived})
+            entry.update({
+                'rank': rank,
+                'id': row.id,
+                'nickname': row.nickname,
+                'role': Player.role_for(row.admin_role_name, row.custom_role_purchased, row.custom_role, row.role),
+                'skin_url': Player.skin_url_for(row.nickname, row.custom_avatar_url, row.skin_type,
+                                                row.skin_url, row.is_premium)
+            })
+            entries.append(entry)
+        return entries
+
+    @classmethod
+    def get_leaderboard_page(cls, gamemode, limit=50, cursor=None):
+        """Keyset-paginated leaderboard page for a registered gamemode.
+
+        cursor is the next_cursor of the previous page ("value:player_id");
+        ranks are counted from the database, never taken from the cursor.
+        First pages are cached. Returns {'players': [...], 'next_cursor': str
+        or None}; raises ValueError for a malformed cursor.
+        """
+        if gamemode not in cls.LEADERBOARDS:
+            return {'players': [], 'next_cursor': None}
+
+        from cache import Cache
+        limit = min(max(1, limit), 100)
+        cache_key = None
+        if not cursor and limit in cls.LEADERBOARD_CACHED_LIMITS:
+            cache_key = f'leaderboard:{gamemode}:{limit}'
+            page = Cache.get(cache_key)
+            if page is not None:
+                return page
+
+        query, sort_column, player_id = cls._leaderboard_query(gamemode)
+        first_rank = 1
+        if cursor:
+            try:
+                last_value, last_id = (int(part) for part in cursor.split(':'))
+            except ValueError:
+                raise ValueError('Invalid cursor')
+            query = query.filter(db.or_(
+                sort_column < last_value,
+                db.and_(sort_column == last_value, player_id > last_id)
+            ))
+            spec = cls.LEADERBOARDS[gamemode]
+            model = cls.stats_model(gamemode)
+            first_rank += db.session.query(func.count(player_id)).filter(
+                getattr(model, spec['active']) > 0,
+                db.or_(sort_column > last_value, db.and_(sort_column == last_value, player_id <= last_id))
+            ).scalar()
+
+        rows = query.order_by(sort_column.desc(), player_id.asc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        players = cls._serialize_leaderboard(gamemode, rows, first_rank)
+        next_cursor = None
+        if has_more and players:
+            last = players[-1]
+            next_cursor = f"{last[cls.LEADERBOARDS[gamemode]['sort']]}:{last['id']}"
+
+        page = {'players': players, 'next_cursor': next_cursor}
+        if cache_key:
+            Cache.set(cache_key, page, cls.LEADERBOARD_CACHE_TTL)
+        return page
+
+    @classmethod
+    def get_top_player(cls, gamemode, sort_by):
+        """Player leading a gamemode by sort_by, or None"""
+        leaders = cls.get_gamemode_leaderboard(gamemode, sort_by, limit=1, active_column=sort_by)
+        return leaders[0].player if leaders else None
 
     @classmethod
     def clear_statistics_cache(cls):
@@ -2576,6 +3254,527 @@ class GameModeManager:
         return player
 
 
+class StatEvent(db.Model):
+    """Append-only log of stat changes, bucketed by hour.
+
+    Rows are written automatically on flush for every tracked counter that
+    changes and are folded into StatRollup by StatRollup.refresh().
+    """
+    __table_args__ = (
+        Index('idx_stat_event_bucket', 'bucket'),
+        Index('idx_stat_event_player', 'player_id', 'bucket'),
+    )
+
+    # Counters that feed period leaderboards, per gamemode
+    TRACKED_STATS = {
+        'bedwars': ('experience', 'kills', 'final_kills', 'beds_broken', 'wins', 'games_played'),
+        'kitpvp': ('experience', 'kills', 'deaths', 'games_played'),
+        'skywars': ('experience', 'kills', 'wins', 'games_played'),
+        'bridgefight': ('experience', 'goals', 'wins', 'games_played'),
+        'sumo': ('experience', 'kills', 'wins', 'games_played'),
+        'fireball_fight': ('experience', 'kills', 'wins', 'games_played')
+    }
+
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    gamemode = db.Column(db.String(30), nullable=False)
+    stat = db.Column(db.String(30), nullable=False)
+    delta = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)  # start of the hour
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    player = db.relationship('Player')
+
+    @staticmethod
+    def hour_bucket(moment=None):
+        return (moment or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def tracked_models(cls):
+        """{model: (gamemode, fields)} for the models that hold tracked counters"""
+        return {
+            GameModeManager.stats_model(gamemode): (gamemode, fields)
+            for gamemode, fields in cls.TRACKED_STATS.items()
+        }
+
+    @classmethod
+    def collect(cls, session):
+        """Queue events for tracked counters changed on dirty objects.
+
+        New rows are a baseline (imports, first registration), not gains, so
+        only changes to already persisted rows are recorded.
+        """
+        tracked = cls.tracked_models()
+        bucket = cls.hour_bucket()
+
+        for obj in list(session.dirty):
+            spec = tracked.get(type(obj))
+            if not spec:
+                continue
+            gamemode, fields = spec
+            state = sa_inspect(obj)
+            player_id = obj.id if isinstance(obj, Player) else obj.player_id
+
+            for field in fields:
+                history = state.attrs[field].history
+                if not history.added or not history.deleted:
+                    continue
+                delta = (history.added[0] or 0) - (history.deleted[0] or 0)
+                if delta:
+                    session.add(cls(player_id=player_id, gamemode=gamemode, stat=field,
+                                    delta=delta, bucket=bucket))
+
+
+class PlayerStatSnapshot(db.Model):
+    """Time series of a player's key counters for progress charts.
+
+    A snapshot is taken on flush whenever one of SNAPSHOT_FIELDS changes.
+    downsample() keeps raw points for a week, the last point per hour for
+    90 days and the last point per day after that.
+    """
+    __table_args__ = (
+        Index('idx_stat_snapshot_player_taken', 'player_id', 'taken_at'),
+        Index('idx_stat_snapshot_resolution_taken', 'resolution', 'taken_at'),
+    )
+
+    SNAPSHOT_FIELDS = ('experience', 'kills', 'final_kills', 'wins', 'beds_broken', 'karma')
+    RAW_RETENTION_DAYS = 7
+    HOURLY_RETENTION_DAYS = 90
+
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    resolution = db.Column(db.String(4), default='raw', nullable=False)  # raw, hour, day
+    taken_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    experience = db.Column(db.Integer, default=0, nullable=False)
+    kills = db.Column(db.Integer, default=0, nullable=False)
+    final_kills = db.Column(db.Integer, default=0, nullable=False)
+    wins = db.Column(db.Integer, default=0, nullable=False)
+    beds_broken = db.Column(db.Integer, default=0, nullable=False)
+    karma = db.Column(db.Integer, default=0, nullable=False)
+
+    player = db.relationship('Player')
+
+    @classmethod
+    def collect(cls, session):
+        """Queue a snapshot for every new player and every player whose counters changed"""
+        now = datetime.utcnow()
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Player):
+                continue
+            state = sa_inspect(obj)
+            if not state.pending and not any(
+                state.attrs[field].history.has_changes() for field in cls.SNAPSHOT_FIELDS
+            ):
+                continue
+            session.add(cls(player=obj, taken_at=now, **{
+                field: getattr(obj, field) or 0 for field in cls.SNAPSHOT_FIELDS
+            }))
+
+    @classmethod
+    def _collapse(cls, resolution, new_resolution, cutoff, truncate, batch_size=1000):
+        """Keep the last snapshot per player and truncate(taken_at) bucket, drop the rest"""
+        rows = db.session.query(cls.id, cls.player_id, cls.taken_at).filter(
+            cls.resolution == resolution,
+            cls.taken_at < cutoff
+        ).order_by(cls.player_id, cls.taken_at, cls.id).all()
+
+        keep = {}
+        for row in rows:
+            keep[(row.player_id, truncate(row.taken_at))] = row.id
+        kept_ids = set(keep.values())
+        removed_ids = [row.id for row in rows if row.id not in kept_ids]
+
+        for start in range(0, len(removed_ids), batch_size):
+            cls.query.filter(cls.id.in_(removed_ids[start:start + batch_size])).delete(synchronize_session=False)
+        kept_ids = list(kept_ids)
+        for start in range(0, len(kept_ids), batch_size):
+            cls.query.filter(cls.id.in_(kept_ids[start:start + batch_size])).update(
+                {'resolution': new_resolution}, synchronize_session=False
+            )
+        return len(removed_ids)
+
+    @classmethod
+    def downsample(cls, now=None):
+        """Apply the retention tiers. Returns the number of snapshots removed. The caller commits."""
+        now = now or datetime.utcnow()
+        removed = cls._collapse(
+            'raw', 'hour', now - timedelta(days=cls.RAW_RETENTION_DAYS),
+            lambda moment: moment.replace(minute=0, second=0, microsecond=0)
+        )
+        removed += cls._collapse(
+            'hour', 'day', now - timedelta(days=cls.HOURLY_RETENTION_DAYS),
+            lambda moment: moment.date()
+        )
+        return removed
+
+    @classmethod
+    def get_series(cls, player_id, days=30):
+        """Chart-ready arrays: {'timestamps': [...], 'experience': [...], ...}"""
+        query = db.session.query(cls.taken_at, *[getattr(cls, field) for field in cls.SNAPSHOT_FIELDS]).filter(
+            cls.player_id == player_id
+        )
+        if days:
+            query = query.filter(cls.taken_at >= datetime.utcnow() - timedelta(days=days))
+        rows = query.order_by(cls.taken_at).all()
+
+        series = {'timestamps': [row.taken_at.isoformat() for row in rows]}
+        for index, field in enumerate(cls.SNAPSHOT_FIELDS, 1):
+            series[field] = [row[index] for row in rows]
+        return series
+
+
+class LeaderboardSnapshot(db.Model):
+    """Top-N player ids per sort key at a point in time, for rank-change deltas"""
+    __table_args__ = (
+        Index('idx_leaderboard_snapshot_key_taken', 'sort_key', 'taken_at'),
+    )
+
+    SORT_KEYS = ('experience', 'kills', 'final_kills', 'beds_broken', 'wins', 'karma')
+    TOP_N = 200
+    # Every snapshot is kept for two days, then one per day for a month
+    FULL_RETENTION_DAYS = 2
+    DAILY_RETENTION_DAYS = 30
+
+    id = db.Column(db.Integer, primary_key=True)
+    sort_key = db.Column(db.String(30), nullable=False)
+    taken_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    player_ids = db.Column(db.Text, nullable=False)  # JSON array, index 0 is rank 1
+
+    @classmethod
+    def take(cls, sort_keys=None, now=None):
+        """Store the current top-N for each sort key. The caller commits."""
+        now = now or datetime.utcnow()
+        snapshots = []
+        for sort_key in sort_keys or cls.SORT_KEYS:
+            column = getattr(Player, sort_key)
+            ids = [player_id for (player_id,) in db.session.query(Player.id).order_by(
+                column.desc(), Player.id
+            ).limit(cls.TOP_N)]
+            snapshots.append(cls(sort_key=sort_key, taken_at=now, player_ids=json.dumps(ids, separators=(',', ':'))))
+        db.session.add_all(snapshots)
+        db.session.flush()
+        return snapshots
+
+    @classmethod
+    def previous_ranks(cls, sort_key, now=None):
+        """{player_id: rank} from the latest snapshot at least a day old, or the oldest one we have"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=1)
+        row = db.session.query(cls.id, cls.player_ids).filter(
+            cls.sort_key == sort_key, cls.taken_at <= cutoff
+        ).order_by(cls.taken_at.desc()).first() or db.session.query(cls.id, cls.player_ids).filter(
+            cls.sort_key == sort_key
+        ).order_by(cls.taken_at).first()
+        if not row:
+            return {}
+
+        from cache import Cache
+        cache_key = f'leaderboard_snapshot:{row.id}'
+        ranks = Cache.get(cache_key)
+        if ranks is None:
+            ranks = {player_id: rank for rank, player_id in enumerate(json.loads(row.player_ids), 1)}
+            Cache.set(cache_key, ranks, 3600)
+        return ranks
+
+    @classmethod
+    def rank_deltas(cls, sort_key, player_ids, first_rank=1):
+        """{player_id: places gained since the previous snapshot}; None for new entries"""
+        previous = cls.previous_ranks(sort_key)
+        return {
+            player_id: (previous[player_id] - rank) if player_id in previous else None
+            for rank, player_id in enumerate(player_ids, first_rank)
+        }
+
+    @classmethod
+    def prune(cls, now=None):
+        """Apply the retention policy. Returns the number of snapshots removed. The caller commits."""
+        now = now or datetime.utcnow()
+        removed = cls.query.filter(
+            cls.taken_at < now - timedelta(days=cls.DAILY_RETENTION_DAYS)
+        ).delete(synchronize_session=False)
+
+        rows = db.session.query(cls.id, cls.sort_key, cls.taken_at).filter(
+            cls.taken_at < now - timedelta(days=cls.FULL_RETENTION_DAYS)
+        ).order_by(cls.sort_key, cls.taken_at.desc()).all()
+        seen = set()
+        extra_ids = []
+        for row in rows:
+            key = (row.sort_key, row.taken_at.date())
+            if key in seen:
+                extra_ids.append(row.id)
+            seen.add(key)
+        if extra_ids:
+            removed += cls.query.filter(cls.id.in_(extra_ids)).delete(synchronize_session=False)
+        return removed
+
+
+class BotEvent(db.Model):
+    """Outbound queue of events for the Discord bot.
+
+    The web app appends rows in the same transaction as the change that
+    caused them; the bot polls /api/bot/events and deletes what it has
+    handled by acknowledging those ids. There is deliberately no id cursor:
+    transactions commit out of id order, so a lower id can become visible
+    after a higher one was delivered.
+    """
+    __table_args__ = (
+        Index('idx_bot_event_created', 'created_at'),
+    )
+
+    TYPES = ('stats_changed', 'karma_low', 'rank_changes', 'ascend_evaluated', 'admin_embed')
+    # Counters the bot's clan and prestige roles are computed from
+    ROLE_STATS = ('kills', 'deaths', 'beds_broken')
+    KARMA_WARNING_THRESHOLD = 20
+    RANK_WATCH_TOP = 10
+    RETENTION_DAYS = 7
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(30), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON object
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @classmethod
+    def emit(cls, event_type, session=None, **payload):
+        """Queue an event; it is delivered once the surrounding transaction commits"""
+        if event_type not in cls.TYPES:
+            raise ValueError(f'Unknown bot event type: {event_type}')
+        event = cls(event_type=event_type, payload=json.dumps(payload, ensure_ascii=False, default=str))
+        (session or db.session).add(event)
+        return event
+
+    @classmethod
+    def collect(cls, session):
+        """Queue events for role-relevant stat changes, karma drops and ASCEND evaluations"""
+        for obj in list(session.dirty):
+            if not isinstance(obj, Player):
+                continue
+            state = sa_inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in cls.ROLE_STATS):
+                cls.emit('stats_changed', session, player_id=obj.id, nickname=obj.nickname)
+
+            karma = state.attrs['karma'].history
+            if karma.added and (karma.added[0] or 0) < cls.KARMA_WARNING_THRESHOLD:
+                new = karma.added[0] or 0
+                if karma.deleted:
+                    old = karma.deleted[0] or 0
+                else:
+                    # Set on an expired instance: the previous value was never loaded
+                    with session.no_autoflush:
+                        old = session.query(Player.karma).filter(Player.id == obj.id).scalar() or 0
+                if old >= cls.KARMA_WARNING_THRESHOLD:
+                    cls.emit('karma_low', session, player_id=obj.id, nickname=obj.nickname, karma=new)
+
+        for obj in list(session.new):
+            if isinstance(obj, ASCENDHistory) and not obj.is_summary:
+                cls.emit('ascend_evaluated', session, player_id=obj.player_id, gamemode=obj.gamemode,
+                         old_tier=obj.old_overall_tier, new_tier=obj.new_overall_tier)
+
+    @classmethod
+    def emit_rank_changes(cls, snapshots):
+        """Queue a rank_changes event for each snapshot whose top differs from the previous one"""
+        for snapshot in snapshots:
+            previous = db.session.query(LeaderboardSnapshot.player_ids).filter(
+                LeaderboardSnapshot.sort_key == snapshot.sort_key,
+                LeaderboardSnapshot.taken_at < snapshot.taken_at
+            ).order_by(LeaderboardSnapshot.taken_at.desc()).first()
+            top = json.loads(snapshot.player_ids)[:cls.RANK_WATCH_TOP]
+            if previous is None or json.loads(previous[0])[:cls.RANK_WATCH_TOP] != top:
+                cls.emit('rank_changes', sort_key=snapshot.sort_key, top=top)
+
+    @classmethod
+    def pending(cls, limit=100):
+        """Every event not acknowledged yet, oldest first"""
+        return cls.query.order_by(cls.id).limit(limit).all()
+
+    @classmethod
+    def acknowledge(cls, ids):
+        """Delete the events the bot has handled. The caller commits."""
+        if not ids:
+            return 0
+        return cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False)
+
+    @classmethod
+    def prune(cls, now=None):
+        """Drop events nobody consumed within RETENTION_DAYS. The caller commits."""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=cls.RETENTION_DAYS)
+        return cls.query.filter(cls.created_at < cutoff).delete(synchronize_session=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.event_type,
+            'payload': json.loads(self.payload or '{}'),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+@event.listens_for(Session, 'before_flush')
+def _record_stat_events(session, flush_context, instances):
+    StatEvent.collect(session)
+    PlayerStatSnapshot.collect(session)
+    BotEvent.collect(session)
+    Player.invalidate_leaderboard_pages(session)
+    Player.track_karma_changes(session)
+
+
+class StatRollupState(db.Model):
+    """Watermark of the last StatEvent folded into StatRollup"""
+
+    id = db.Column(db.Integer, primary_key=True)
+    last_event_id = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class StatRollup(db.Model):
+    """Pre-aggregated stat gains per player for a day, week, month or season"""
+    __table_args__ = (
+        db.UniqueConstraint('period', 'period_start', 'gamemode', 'stat', 'player_id', name='uq_stat_rollup_key'),
+        Index('idx_stat_rollup_board', 'period', 'period_start', 'gamemode', 'stat', 'value'),
+    )
+
+    PERIODS = ('day', 'week', 'month', 'season')
+    # Events are kept this long after being rolled up
+    EVENT_RETENTION_DAYS = 35
+    # Only events at least this old are folded. Ids are allocated before
+    # commit, so a transaction still in flight can commit a lower id than
+    # one already visible; the id watermark must not pass it.
+    FOLD_LAG_SECONDS = 120
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)
+    period_start = db.Column(db.DateTime, nullable=False)
+    gamemode = db.Column(db.String(30), nullable=False)
+    stat = db.Column(db.String(30), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    value = db.Column(db.Integer, default=0, nullable=False)
+
+    @staticmethod
+    def period_start_for(period, moment):
+        """Start of the day, ISO week, month or quarter-long season containing moment"""
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        if period == 'day':
+            return day
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        if period == 'month':
+            return day.replace(day=1)
+        if period == 'season':
+            return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+        raise ValueError(f'Unknown period: {period}')
+
+    @classmethod
+    def refresh(cls, batch_size=5000, now=None):
+        """Fold new StatEvents into the rollups. Returns the number of events folded. The caller commits."""
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=cls.FOLD_LAG_SECONDS)
+        state = StatRollupState.query.with_for_update().first()
+        if not state:
+            state = StatRollupState(last_event_id=0)
+            db.session.add(state)
+
+        last_id = db.session.query(func.max(StatEvent.id)).filter(
+            StatEvent.id > state.last_event_id,
+            StatEvent.created_at <= cutoff
+        ).scalar()
+        if not last_id:
+            return 0
+
+        folded = 0
+        low = state.last_event_id
+        while low < last_id:
+            high = min(low + batch_size, last_id)
+            rows = db.session.query(
+                StatEvent.player_id, StatEvent.gamemode, StatEvent.stat, StatEvent.bucket,
+                func.sum(StatEvent.delta).label('delta'), func.count(StatEvent.id).label('events')
+            ).filter(
+                StatEvent.id > low, StatEvent.id <= high
+            ).group_by(StatEvent.player_id, StatEvent.gamemode, StatEvent.stat, StatEvent.bucket).all()
+
+            totals = {}
+            for row in rows:
+                folded += row.events
+                for period in cls.PERIODS:
+                    key = (period, cls.period_start_for(period, row.bucket), row.gamemode, row.stat, row.player_id)
+                    totals[key] = totals.get(key, 0) + row.delta
+
+            for (period, period_start, gamemode, stat, player_id), delta in totals.items():
+                cls._increment(period, period_start, gamemode, stat, player_id, delta)
+            low = high
+
+        state.last_event_id = last_id
+        state.updated_at = datetime.utcnow()
+        db.session.flush()
+        return folded
+
+    @classmethod
+    def _increment(cls, period, period_start, gamemode, stat, player_id, delta):
+        """Add delta to one rollup row with a single upsert"""
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            updated = cls.query.filter_by(
+                period=period, period_start=period_start, gamemode=gamemode, stat=stat, player_id=player_id
+            ).update({'value': cls.value + delta}, synchronize_session=False)
+            if not updated:
+                db.session.add(cls(period=period, period_start=period_start, gamemode=gamemode,
+                                   stat=stat, player_id=player_id, value=delta))
+                db.session.flush()
+            return
+
+        stmt = insert(cls.__table__).values(
+            period=period, period_start=period_start, gamemode=gamemode,
+            stat=stat, player_id=player_id, value=delta
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['period', 'period_start', 'gamemode', 'stat', 'player_id'],
+            set_={'value': cls.__table__.c.value + stmt.excluded.value}
+        )
+        db.session.execute(stmt)
+
+    @classmethod
+    def prune_events(cls, now=None):
+        """Delete rolled-up events past retention. Returns the number removed. The caller commits."""
+        state = StatRollupState.query.first()
+        if not state:
+            return 0
+        cutoff = (now or datetime.utcnow()) - timedelta(days=cls.EVENT_RETENTION_DAYS)
+        return StatEvent.query.filter(
+            StatEvent.id <= state.last_event_id,
+            StatEvent.bucket < cutoff
+        ).delete(synchronize_session=False)
+
+    @classmethod
+    def get_leaderboard(cls, gamemode, stat, period='day', limit=50, at=None):
+        """Top gains for the current (or given) period, read straight from the rollups"""
+        if period not in cls.PERIODS:
+            raise ValueError(f'Unknown period: {period}')
+        if stat not in StatEvent.TRACKED_STATS.get(gamemode, ()):
+            raise ValueError(f'Untracked stat: {gamemode}/{stat}')
+
+        period_start = cls.period_start_for(period, at or datetime.utcnow())
+        rows = db.session.query(cls.player_id, cls.value, Player.nickname).join(
+            Player, Player.id == cls.player_id
+        ).filter(
+            cls.period == period,
+            cls.period_start == period_start,
+            cls.gamemode == gamemode,
+            cls.stat == stat,
+            cls.value > 0
+        ).order_by(cls.value.desc(), cls.player_id).limit(limit).all()
+
+        return {
+            'period': period,
+            'period_start': period_start.isoformat(),
+            'players': [
+                {'rank': rank, 'id': row.player_id, 'nickname': row.nickname, 'value': row.value}
+                for rank, row in enumerate(rows, 1)
+            ]
+        }
+
+
 class Quest(db.Model):
     """Quest system for gamification"""
 
@@ -2973,7 +4172,7 @@ class PlayerQuest(db.Model):
     @property
     def progress_percentage(self):
         """Calculate progress percentage"""
-        quest_obj = Quest.query.get(self.quest_id)
+        quest_obj = self.quest
         if not quest_obj or quest_obj.target_value == 0:
             return 100
         return min(100, round((self.current_progress / quest_obj.target_value) * 100))
@@ -2983,7 +4182,7 @@ class PlayerQuest(db.Model):
         # Calculate progress from baseline
         progress_from_baseline = max(0, player_stat_value - self.baseline_value)
         self.current_progress = progress_from_baseline
-        quest_obj = Quest.query.get(self.quest_id)
+        quest_obj = self.quest
 
         if not self.is_completed and quest_obj and self.current_progress >= quest_obj.target_value:
             self.is_completed = True
@@ -2994,35 +4193,67 @@ class PlayerQuest(db.Model):
     @classmethod
     def update_player_quest_progress(cls, player):
         """Update quest progress only for accepted quests"""
-        completed_quests = []
-
-        # Only update progress for accepted quests
-        accepted_quests = cls.query.filter_by(
-            player_id=player.id,
-            is_accepted=True,
-            is_completed=False
-        ).all()
-
-        for player_quest in accepted_quests:
-            quest = player_quest.quest
-
-            # Get current stat value
-            current_stat_value = getattr(player, quest.type, 0)
-
-            # Check completion based on progress from baseline
-            if player_quest.check_completion(current_stat_value):
-                completed_quests.append(quest)
-
-                # Award XP, coins, reputation and karma
-                player.experience += quest.reward_xp
-                player.coins += quest.reward_coins
-                player.reputation += quest.reward_reputation
-                player.karma += quest.reward_karma
+        completed_ids = cls.evaluate_progress_batch([player]).get(player.id, [])
+        if not completed_ids:
+            return []
+        return Quest.query.filter(Quest.id.in_(completed_ids)).all()
 
-        if completed_quests:
+    @classmethod
+    def evaluate_progress_batch(cls, players, chunk_size=500):
+        """Update accepted quest progress for many players at once.
+
+        Accepted quests are read together with their quest definitions in one
+        query per chunk of players, progress and completions are written with a
+        single bulk UPDATE and rewards are added to the given player objects.
+        Returns {player_id: [completed quest ids]}.
+        """
+        from sqlalchemy import update
+
+        players_by_id = {player.id: player for player in players if player.id}
+        player_ids = list(players_by_id)
+        completed = {}
+        progress_updates = []
+        now = datetime.utcnow()
+
+        for start in range(0, len(player_ids), chunk_size):
+            rows = db.session.query(
+                cls.id, cls.player_id, cls.baseline_value, cls.current_progress,
+                Quest.id.label('quest_id'), Quest.type, Quest.target_value,
+                Quest.reward_xp, Quest.reward_coins, Quest.reward_reputation, Quest.reward_karma
+            ).join(Quest, cls.quest_id == Quest.id).filter(
+                cls.player_id.in_(player_ids[start:start + chunk_size]),
+                cls.is_accepted == True,
+                cls.is_completed == False
+            ).all()
+
+            for row in rows:
+                player = players_by_id[row.player_id]
+                progress = max(0, (getattr(player, row.type, 0) or 0) - (row.baseline_value or 0))
+                is_completed = progress >= (row.target_value or 0)
+
+                if not is_completed and progress == row.current_progress:
+                    continue
+
+                mapping = {'id': row.id, 'current_progress': progress}
+                if is_completed:
+                    mapping.update(is_completed=True, completed_at=now)
+                    completed.setdefault(row.player_id, []).append(row.quest_id)
+
+                    # Award XP, coins, reputation and karma; boosters scale coins and reputation
+                    coins, reputation = PlayerActiveBooster.boost_rewards(
+                        player.id, row.reward_coins, row.reward_reputation
+                    )
+                    player.experience += row.reward_xp or 0
+                    player.coins += coins
+                    player.reputation += reputation
+                    player.karma += row.reward_karma or 0
+                progress_updates.append(mapping)
+
+        if progress_updates:
+            db.session.execute(update(cls), progress_updates)
             db.session.commit()
 
-        return completed_quests
+        return completed
 
 
 class ShopItem(db.Model):
@@ -3050,30 +4281,54 @@ class ShopItem(db.Model):
     def __repr__(self):
         return f'<ShopItem {self.display_name}>'
 
-    def can_purchase(self, player):
+    # Categories that can only be bought once per player
+    NON_CONSUMABLE_CATEGORIES = ('title', 'theme', 'cursor', 'avatar')
+
+    def get_item_data(self):
+        """Get parsed item effect data"""
+        if not self.item_data:
+            return {}
+        try:
+            return json.loads(self.item_data)
+        except (TypeError, ValueError):
+            return {}
+
+    def can_purchase(self, player, owned_item_ids=None):
         """Check if player can purchase this item"""
+        if owned_item_ids is None:
+            owned_item_ids = set()
+            if self.category in self.NON_CONSUMABLE_CATEGORIES:
+                existing = ShopPurchase.query.filter_by(
+                    player_id=player.id,
+                    item_id=self.id
+                ).first()
+                if existing:
+                    owned_item_ids.add(self.id)
+
+        return self.check_purchase_rules(self, player, owned_item_ids)
+
+    @staticmethod
+    def check_purchase_rules(item, player, owned_item_ids):
+        """Purchase checks for a ShopItem or a ShopCatalog entry, without queries"""
         # Check level requirement
-        if player.level < self.unlock_level:
-            return False, f"Требуется {self.unlock_level} уровень"
+        if player.level < item.unlock_level:
+            return False, f"Требуется {item.unlock_level} уровень"
 
         # Check if player has enough resources
-        if player.coins < self.price_coins:
+        if player.coins < item.price_coins:
             return False, "Недостаточно койнов"
 
-        if player.reputation < self.price_reputation:
+        if player.reputation < item.price_reputation:
             return False, "Недостаточно репутации"
 
         # Check if already purchased (for non-consumable items)
-        if self.category in ['title', 'theme', 'cursor', 'avatar']:
-            existing = ShopPurchase.query.filter_by(
-                player_id=player.id,
-                item_id=self.id
-            ).first()
-            if existing:
-                return False, "Уже приобретено"
+        if item.category in ShopItem.NON_CONSUMABLE_CATEGORIES and item.id in owned_item_ids:
+            return False, "Уже приобретено"
 
         return True, "OK"
 
+    BOOSTER_TYPES_BY_KIND = {'coin_multiplier': 'coins', 'reputation_multiplier': 'reputation'}
+
     def apply_item_effect(self, player):
         """Apply item effect to player"""
         try:
@@ -3150,36 +4405,15 @@ class ShopItem(db.Model):
 
 
             elif self.category == 'booster':
-                # Apply immediate booster effects
-                booster_type = data.get('booster_type', 'xp')
-                boost_duration = data.get('duration_minutes', 60) # Default duration 60 minutes
-
-                # Check if an active booster of the same type exists
-                existing_booster = PlayerBooster.get_active_booster(player.id, f'active_{booster_type}_booster')
-                if existing_booster:
-                    # Extend duration if booster exists
-                    existing_booster.expires_at += timedelta(minutes=boost_duration)
-                    # Update multiplier if needed (e.g., if buying a stronger booster)
-                    if booster_type == 'xp':
-                        existing_booster.multiplier = max(existing_booster.multiplier, data.get('multiplier', 1.5))
-                    elif booster_type == 'coins':
-                        existing_booster.multiplier = max(existing_booster.multiplier, data.get('multiplier', 1.5))
-                    elif booster_type == 'reputation':
-                        existing_booster.multiplier = max(existing_booster.multiplier, data.get('multiplier', 1.5))
-                    db.session.commit()
-                    return True, f"Длительность бустера '{booster_type}' продлена!"
-                else:
-                    # Create new booster
-                    new_booster = PlayerBooster(
-                        player_id=player.id,
-                        booster_type=f'active_{booster_type}_booster',
-                        multiplier=data.get('multiplier', 1.5),
-                        duration_minutes=boost_duration,
-                        expires_at=datetime.utcnow() + timedelta(minutes=boost_duration)
-                    )
-                    db.session.add(new_booster)
-                    db.session.commit()
-                    return True, f"Бустер '{booster_type}' активирован на {boost_duration} минут!"
+                # Older catalog entries describe the booster as {"type": "coin_multiplier", "duration_hours": 1}
+                booster_type = data.get('booster_type') or self.BOOSTER_TYPES_BY_KIND.get(data.get('type'), 'xp')
+                boost_duration = data.get('duration_minutes') or int(data.get('duration_hours', 1) * 60)
+
+                # add_booster extends a running booster of the same type and
+                # drops the cached multipliers so rewards see it right away
+                PlayerActiveBooster.add_booster(player.id, f'active_{booster_type}_booster',
+                                                data.get('multiplier', 1.5), boost_duration)
+                return True, f"Бустер '{booster_type}' активирован на {boost_duration} минут!"
 
 
             elif self.category == 'theme':
@@ -3275,27 +4509,10 @@ class ShopItem(db.Model):
 
             else:
                 # For items that go into inventory (e.g., consumables, cosmetics)
-                # We create an InventoryItem entry
-                existing_inventory_item = InventoryItem.query.filter_by(
-                    player_id=player.id,
-                    item_id=self.id,
-                    status='unused'
-                ).first()
-
-                if existing_inventory_item:
-                    existing_inventory_item.quantity += 1
-                    db.session.commit()
-                    return True, f"Количество '{self.display_name}' в инвентаре увеличено."
-                else:
-                    inventory_item = InventoryItem(
-                        player_id=player.id,
-                        item_id=self.id,
-                        quantity=1,
-                        status='unused'
-                    )
-                    db.session.add(inventory_item)
-                    db.session.commit()
-                    return True, f"'{self.display_name}' добавлен в ваш инвентарь."
+                # We add to the player's InventoryItem counter
+                InventoryItem.add(player.id, self.id, 1)
+                db.session.commit()
+                return True, f"'{self.display_name}' добавлен в ваш инвентарь."
 
 
         # Default case if no specific category matched or for generic rewards
@@ -3580,6 +4797,66 @@ class ShopItem(db.Model):
         pass
 
 
+class ShopCatalog:
+    """Versioned in-memory snapshot of active shop items.
+
+    The snapshot is rebuilt lazily after admin shop edits call invalidate();
+    the cache TTL only bounds how long other workers keep a stale copy.
+    """
+
+    CACHE_KEY = 'shop:catalog'
+    CACHE_TTL = 300
+
+    # Categories shown on the shop page (themes are free and not sold here)
+    PAGE_CATEGORIES = ['title', 'booster', 'custom_role', 'emoji_slot', 'gradient']
+
+    version = 0
+
+    @classmethod
+    def get(cls):
+        """Get the current catalog snapshot, rebuilding it if needed"""
+        from cache import Cache
+
+        catalog = Cache.get(cls.CACHE_KEY)
+        if catalog is not None and catalog['version'] == cls.version:
+            return catalog
+
+        from types import SimpleNamespace
+        columns = [column.key for column in ShopItem.__table__.columns]
+        items = [
+            SimpleNamespace(**{key: getattr(item, key) for key in columns})
+            for item in ShopItem.query.filter_by(is_active=True).order_by(ShopItem.id).all()
+        ]
+
+        by_category = {}
+        for item in items:
+            by_category.setdefault(item.category, []).append(item)
+
+        catalog = {
+            'version': cls.version,
+            'items': items,
+            'by_id': {item.id: item for item in items},
+            'by_category': by_category
+        }
+        Cache.set(cls.CACHE_KEY, catalog, cls.CACHE_TTL)
+        return catalog
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the snapshot after shop items change"""
+        from cache import Cache
+        cls.version += 1
+        Cache.delete(cls.CACHE_KEY)
+
+    @staticmethod
+    def get_owned_item_ids(player_id):
+        """Get ids of all items a player has purchased in one query"""
+        rows = db.session.query(ShopPurchase.item_id).filter(
+            ShopPurchase.player_id == player_id
+        ).distinct().all()
+        return {row.item_id for row in rows}
+
+
 class ShopPurchase(db.Model):
     """Purchase history for shop items"""
 
@@ -3589,14 +4866,81 @@ class ShopPurchase(db.Model):
     price_paid_coins = db.Column(db.Integer, default=0, nullable=False)
     price_paid_reputation = db.Column(db.Integer, default=0)
     purchased_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Non-consumable purchase, at most one per player and item
+    is_permanent = db.Column(db.Boolean, default=False, nullable=False)
 
     # Relationships
     player = db.relationship('Player', backref='shop_purchases_rel')
 
+    __table_args__ = (
+        Index('idx_shop_purchase_player_item', 'player_id', 'item_id'),
+        Index('uq_shop_purchase_permanent', 'player_id', 'item_id', unique=True,
+              sqlite_where=text('is_permanent = 1'), postgresql_where=text('is_permanent')),
+        {'extend_existing': True}
+    )
+
+    @classmethod
+    def purchase(cls, player, item, add_to_inventory=False):
+        """Debit the player and record the purchase in one transaction.
+
+        Coins and reputation are taken with a guarded conditional UPDATE, so
+        concurrent purchases cannot overspend, and repeated purchases of
+        non-consumable items are rejected by the unique index. The purchase
+        row and the optional inventory increment go out with the debit; the
+        caller applies item effects and commits. Returns
+        (success, message, purchase).
+        """
+        from sqlalchemy import update
+        from sqlalchemy.exc import IntegrityError
+
+        if player.level < item.unlock_level:
+            return False, f"Требуется {item.unlock_level} уровень", None
+
+        conditions = [Player.id == player.id]
+        if item.price_coins > 0:
+            conditions.append(Player.coins >= item.price_coins)
+        if item.price_reputation > 0:
+            conditions.append(Player.reputation >= item.price_reputation)
+
+        try:
+            if item.price_coins > 0 or item.price_reputation > 0:
+                result = db.session.execute(
+                    update(Player).where(*conditions).values(
+                        coins=Player.coins - item.price_coins,
+                        reputation=Player.reputation - item.price_reputation
+                    ).execution_options(synchronize_session=False)
+                )
+                # Reload balances on next access, the DB now holds the truth
+                db.session.expire(player, ['coins', 'reputation'])
+
+                if result.rowcount != 1:
+                    db.session.rollback()
+                    if player.coins < item.price_coins:
+                        return False, "Недостаточно койнов", None
+                    return False, "Недостаточно репутации", None
+
+            purchase = cls(
+                player_id=player.id,
+                item_id=item.id,
+                price_paid_coins=item.price_coins,
+                price_paid_reputation=item.price_reputation,
+                is_permanent=item.category in ShopItem.NON_CONSUMABLE_CATEGORIES
+            )
+            db.session.add(purchase)
+
+            if add_to_inventory:
+                InventoryItem.add(player.id, item.id, 1)
+
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return False, "Уже приобретено", None
+
+        return True, "OK", purchase
+
 
 class InventoryItem(db.Model):
-    """Player inventory items"""
-    __table_args__ = {'extend_existing': True}
+    """Player inventory items, one row per player and shop item"""
 
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
@@ -3610,27 +4954,106 @@ class InventoryItem(db.Model):
     player = db.relationship('Player', backref='inventory_items_rel')
     item = db.relationship('ShopItem', backref='inventory_instances')
 
+    __table_args__ = (
+        db.UniqueConstraint('player_id', 'item_id', name='uq_inventory_player_item'),
+        {'extend_existing': True}
+    )
+
     @property
     def can_use(self):
         """Check if item can be used"""
         return self.status == 'unused' and self.quantity > 0
 
+    @classmethod
+    def add(cls, player_id, item_id, quantity=1):
+        """Atomically add items to a player's inventory with a single upsert"""
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            updated = cls.query.filter_by(player_id=player_id, item_id=item_id).update(
+                {'quantity': cls.quantity + quantity, 'status': 'unused'},
+                synchronize_session=False
+            )
+            if not updated:
+                db.session.add(cls(player_id=player_id, item_id=item_id, quantity=quantity, status='unused'))
+                db.session.flush()
+            return
+
+        stmt = insert(cls.__table__).values(
+            player_id=player_id,
+            item_id=item_id,
+            quantity=quantity,
+            status='unused',
+            created_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['player_id', 'item_id'],
+            set_={
+                'quantity': cls.__table__.c.quantity + stmt.excluded.quantity,
+                'status': 'unused'
+            }
+        )
+        db.session.execute(stmt)
+
+    @classmethod
+    def remove(cls, player_id, item_id, quantity=1):
+        """Atomically take items out of an inventory, False if not enough"""
+        updated = cls.query.filter(
+            cls.player_id == player_id,
+            cls.item_id == item_id,
+            cls.quantity >= quantity
+        ).update({
+            'quantity': cls.quantity - quantity,
+            'status': case((cls.quantity <= quantity, 'used'), else_=cls.status),
+            'used_at': datetime.utcnow()
+        }, synchronize_session=False)
+        return updated == 1
+
+    @classmethod
+    def get_quantity(cls, player_id, item_id):
+        """Get how many of an item a player holds"""
+        return db.session.query(cls.quantity).filter_by(
+            player_id=player_id, item_id=item_id
+        ).scalar() or 0
+
+    @classmethod
+    def get_player_inventory(cls, player_id):
+        """Get {category: {item_id: quantity}} for a player in one query"""
+        rows = db.session.query(ShopItem.category, cls.item_id, cls.quantity).join(
+            ShopItem, ShopItem.id == cls.item_id
+        ).filter(cls.player_id == player_id, cls.quantity > 0).all()
+
+        inventory = {}
+        for row in rows:
+            inventory.setdefault(row.category, {})[str(row.item_id)] = row.quantity
+        return inventory
+
     def use_item(self):
         """Use the inventory item"""
         if not self.can_use:
             return False, "Предмет не может быть использован"
 
         try:
+            if not InventoryItem.remove(self.player_id, self.item_id, 1):
+                db.session.rollback()
+                return False, "Предмет не может быть использован"
+            db.session.expire(self, ['quantity', 'status', 'used_at'])
+
+            item_data = self.item.get_item_data()
+
             # Apply item effect based on type
             if self.item.category == 'coins': # Assuming item.category can be 'coins', 'experience', etc.
-                self.player.coins += self.item.item_data.get('effect_value', 0)
+                self.player.coins += item_data.get('effect_value', 0)
             elif self.item.category == 'experience':
-                self.player.experience += self.item.item_data.get('effect_value', 0)
+                self.player.experience += item_data.get('effect_value', 0)
             elif self.item.category == 'reputation':
-                self.player.reputation += self.item.item_data.get('effect_value', 0)
+                self.player.reputation += item_data.get('effect_value', 0)
             elif self.item.category == 'custom_title':
                 # Add custom title to player
-                title_id = self.item.item_data.get('title_id')
+                title_id = item_data.get('title_id')
                 if title_id:
                     title = CustomTitle.query.get(title_id)
                     if title:
@@ -3641,11 +5064,6 @@ class InventoryItem(db.Model):
                         )
                         db.session.add(player_title)
 
-            # Mark as used
-            self.status = 'used'
-            self.used_at = datetime.utcnow()
-            self.quantity -= 1
-
             db.session.commit()
             return True, f"Использован предмет: {self.item.display_name}"
 
@@ -3670,7 +5088,7 @@ class PlayerPurchase(db.Model):
 
 
 class PlayerBooster(db.Model):
-    """Active boosters for players"""
+    """Legacy booster rows; purchases now create PlayerActiveBooster"""
 
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
@@ -3710,10 +5128,11 @@ class PlayerBooster(db.Model):
 
     @classmethod
     def cleanup_expired(cls):
-        """Remove expired boosters"""
-        expired = cls.query.filter(cls.expires_at < datetime.utcnow()).all()
-        for booster in expired:
-            booster.is_active = False
+        """Deactivate expired boosters with a single UPDATE"""
+        return cls.query.filter(
+            cls.is_active == True,
+            cls.expires_at < datetime.utcnow()
+        ).update({'is_active': False}, synchronize_session=False)
 
 
 class ReputationLog(db.Model):
@@ -3983,7 +5402,10 @@ class Achievement(db.Model):
                     player_achievement = PlayerAchievement(**achievement_data)
                     db.session.add(player_achievement)
 
-            # Обновляем награды одним запросом
+            # Обновляем награды одним запросом; бустеры умножают койны и репутацию
+            total_coins, total_reputation = PlayerActiveBooster.boost_rewards(
+                player.id, total_coins, total_reputation
+            )
             player.experience += total_xp
             player.coins += total_coins
             player.reputation += total_reputation
@@ -4496,6 +5918,45 @@ class PlayerTitle(db.Model):
         return f'<PlayerTitle {self.player_id}:{self.title_id}>'
 
 
+class DiscordLink(db.Model):
+    """Explicit link between a Discord account and a player.
+
+    The bot prefers these links over matching members by name.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    discord_user_id = db.Column(db.String(32), unique=True, nullable=False, index=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), unique=True, nullable=False)
+    linked_at = db.Column(db.DateTime, default=datetime.utcnow)
+    linked_by = db.Column(db.String(100), default='admin')
+
+    player = db.relationship('Player', backref=db.backref('discord_link', uselist=False))
+
+    @classmethod
+    def link(cls, discord_user_id, player, linked_by='admin'):
+        """Link a Discord account to a player, replacing previous links of either side"""
+        discord_user_id = str(discord_user_id)
+        cls.query.filter(
+            (cls.discord_user_id == discord_user_id) | (cls.player_id == player.id)
+        ).delete(synchronize_session=False)
+        link = cls(discord_user_id=discord_user_id, player_id=player.id, linked_by=linked_by)
+        db.session.add(link)
+        # Let the bot sync the newly linked member's roles right away
+        BotEvent.emit('stats_changed', player_id=player.id, nickname=player.nickname)
+        return link
+
+    def to_dict(self):
+        return {
+            'discord_user_id': self.discord_user_id,
+            'player_id': self.player_id,
+            'nickname': self.player.nickname if self.player else None,
+            'linked_at': self.linked_at.isoformat() if self.linked_at else None
+        }
+
+    def __repr__(self):
+        return f'<DiscordLink {self.discord_user_id}:{self.player_id}>'
+
+
 class PlayerActiveBooster(db.Model):
     """Active boosters that players currently have"""
 
@@ -4531,37 +5992,111 @@ class PlayerActiveBooster(db.Model):
             is_active=True
         ).filter(cls.expires_at > datetime.utcnow()).all()
 
+    COINS_BOOSTER_TYPES = ('active_coins_booster', 'active_mega_booster')
+    REPUTATION_BOOSTER_TYPES = ('active_reputation_booster', 'active_mega_booster')
+
+    # Upper bound on how long a cached timeline is trusted, so boosters added
+    # by another worker process are picked up without an explicit invalidation
+    TIMELINE_MAX_AGE = 300
+
     @classmethod
-    def get_coins_multiplier(cls, player_id):
-        """Get current coins multiplier for a player"""
-        boosters = cls.query.filter_by(
-            player_id=player_id,
-            is_active=True
+    def get_booster_timeline(cls, player_id):
+        """Get cached multiplier products and the next expiry for a player.
+
+        The timeline is rebuilt with one query when a booster is added through
+        add_booster or when the earliest active booster expires.
+        """
+        from cache import Cache
+
+        cache_key = f'booster_timeline:{player_id}'
+        timeline = Cache.get(cache_key)
+        if timeline is not None:
+            return timeline
+
+        now = datetime.utcnow()
+        boosters = cls.query.with_entities(
+            cls.booster_type, cls.multiplier, cls.expires_at
         ).filter(
-            cls.expires_at > datetime.utcnow(),
-            cls.booster_type.in_(['active_coins_booster', 'active_mega_booster'])
+            cls.player_id == player_id,
+            cls.is_active == True,
+            cls.expires_at > now
         ).all()
 
-        multiplier = 1.0
+        timeline = {'coins': 1.0, 'reputation': 1.0, 'next_expiry': None}
         for booster in boosters:
-            multiplier *= booster.multiplier
-        return multiplier
+            if booster.booster_type in cls.COINS_BOOSTER_TYPES:
+                timeline['coins'] *= booster.multiplier
+            if booster.booster_type in cls.REPUTATION_BOOSTER_TYPES:
+                timeline['reputation'] *= booster.multiplier
+            if timeline['next_expiry'] is None or booster.expires_at < timeline['next_expiry']:
+                timeline['next_expiry'] = booster.expires_at
+
+        expire = cls.TIMELINE_MAX_AGE
+        if timeline['next_expiry'] is not None:
+            expire = min(expire, max(1, (timeline['next_expiry'] - now).total_seconds()))
+        Cache.set(cache_key, timeline, expire)
+        return timeline
 
     @classmethod
-    def get_reputation_multiplier(cls, player_id):
-        """Get current reputation multiplier for a player"""
-        boosters = cls.query.filter_by(
+    def invalidate_booster_timeline(cls, player_id):
+        """Drop the cached timeline after a player's boosters change"""
+        from cache import Cache
+        Cache.delete(f'booster_timeline:{player_id}')
+
+    @classmethod
+    def add_booster(cls, player_id, booster_type, multiplier, duration_minutes):
+        """Activate a booster for a player and refresh their timeline.
+
+        A booster of the same type that is still running is extended and
+        keeps the stronger multiplier instead of stacking a second row.
+        """
+        now = datetime.utcnow()
+        booster = cls.query.filter_by(
             player_id=player_id,
+            booster_type=booster_type,
             is_active=True
-        ).filter(
-            cls.expires_at > datetime.utcnow(),
-            cls.booster_type.in_(['active_reputation_booster', 'active_mega_booster'])
-        ).all()
+        ).filter(cls.expires_at > now).first()
+        if booster:
+            booster.expires_at += timedelta(minutes=duration_minutes)
+            booster.multiplier = max(booster.multiplier, multiplier)
+        else:
+            booster = cls(
+                player_id=player_id,
+                booster_type=booster_type,
+                multiplier=multiplier,
+                started_at=now,
+                expires_at=now + timedelta(minutes=duration_minutes)
+            )
+            db.session.add(booster)
+        db.session.commit()
+        cls.invalidate_booster_timeline(player_id)
+        return booster
 
-        multiplier = 1.0
-        for booster in boosters:
-            multiplier *= booster.multiplier
-        return multiplier
+    @classmethod
+    def cleanup_expired(cls):
+        """Deactivate expired boosters with a single UPDATE"""
+        return cls.query.filter(
+            cls.is_active == True,
+            cls.expires_at < datetime.utcnow()
+        ).update({'is_active': False}, synchronize_session=False)
+
+    @classmethod
+    def get_coins_multiplier(cls, player_id):
+        """Get current coins multiplier for a player"""
+        return cls.get_booster_timeline(player_id)['coins']
+
+    @classmethod
+    def get_reputation_multiplier(cls, player_id):
+        """Get current reputation multiplier for a player"""
+        return cls.get_booster_timeline(player_id)['reputation']
+
+    @classmethod
+    def boost_rewards(cls, player_id, coins, reputation):
+        """Scale earned coins and reputation by the player's active boosters"""
+        if not coins and not reputation:
+            return coins or 0, reputation or 0
+        timeline = cls.get_booster_timeline(player_id)
+        return round((coins or 0) * timeline['coins']), round((reputation or 0) * timeline['reputation'])
 
 
 class GradientTheme(db.Model):
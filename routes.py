@@ -4,14 +4,16 @@ import os
 import csv
 import io
 from datetime import datetime, date, timedelta
+from sqlalchemy.orm import joinedload
 
 # Import models
 from models import (Player, Quest, PlayerQuest, Achievement, PlayerAchievement, 
                    CustomTitle, PlayerTitle, GradientTheme, PlayerGradientSetting, 
-                   SiteTheme, ShopItem, ShopPurchase, PlayerActiveBooster, 
+                   SiteTheme, ShopItem, ShopCatalog, ShopPurchase, PlayerActiveBooster, 
                    AdminCustomRole, PlayerAdminRole, Badge, PlayerBadge, 
                    ReputationLog, ASCENDData, Candidate, CandidateComment, 
-                   CandidateReaction, GameMode, ASCENDHistory, Target, TargetReaction)
+                   CandidateReaction, GameMode, GameModeManager, ASCENDHistory, Target, TargetReaction,
+                   LeaderboardSnapshot, BotEvent)
 
 # API routes are handled directly in api_routes.py
 
@@ -81,12 +83,20 @@ def index():
             if search:
                 players = Player.search_players(search, limit=limit, offset=offset)
             else:
-                players = Player.get_leaderboard(sort_by=sort_by, limit=limit, offset=offset)
+                players = Player.get_leaderboard_page(sort_by=sort_by, limit=limit, offset=offset)
         except Exception as e:
             app.logger.error(f"Error getting leaderboard data: {e}")
             players = []
             flash('Ошибка загрузки лидерборда. Попробуйте позже.', 'error')
 
+        # Rank changes since yesterday's snapshot
+        rank_deltas = {}
+        if not search and sort_by in LeaderboardSnapshot.SORT_KEYS:
+            try:
+                rank_deltas = LeaderboardSnapshot.rank_deltas(sort_by, [row['id'] for row in players], offset + 1)
+            except Exception as e:
+                app.logger.error(f"Error getting rank deltas: {e}")
+
         is_admin = session.get('is_admin', False)
 
         try:
@@ -126,6 +136,7 @@ def index():
 
         return render_template('index.html',
                              players=players,
+                             rank_deltas=rank_deltas,
                              current_sort=sort_by,
                              search_query=search,
                              is_admin=is_admin,
@@ -407,9 +418,6 @@ def admin_embed_builder():
 def send_embed():
     """Send embed via Discord bot"""
     try:
-        import requests
-        import json
-
         # Get form data
         title = request.form.get('title', '').strip()
         description = request.form.get('description', '').strip()
@@ -436,12 +444,14 @@ def send_embed():
             'channel_id': channel_id
         }
 
-        # Here you would send this to your Discord bot
-        # For now, we'll just flash a success message
-        flash(f'Embed "{title}" успешно отправлен в канал!', 'success')
+        # The bot picks the embed up from its event queue
+        BotEvent.emit('admin_embed', **embed_data)
+        db.session.commit()
+        flash(f'Embed "{title}" поставлен в очередь на отправку в канал!', 'success')
 
     except Exception as e:
         app.logger.error(f"Error sending embed: {e}")
+        db.session.rollback()
         flash('Ошибка при отправке embed!', 'error')
 
     return redirect(url_for('admin_embed_builder'))
@@ -1252,47 +1262,12 @@ def add_player():
                 flash('Количество побед не может превышать количество игр!', 'error')
                 return redirect(url_for('admin'))
 
-        elif gamemode == 'kitpvp':
-            player.kitpvp_kills = request.form.get('kitpvp_kills', type=int, default=0)
-            player.kitpvp_deaths = request.form.get('kitpvp_deaths', type=int, default=0)
-            player.kitpvp_games = request.form.get('kitpvp_games', type=int, default=0)
-
-        elif gamemode == 'skywars':
-            player.skywars_wins = request.form.get('skywars_wins', type=int, default=0)
-            player.skywars_solo_wins = request.form.get('skywars_solo_wins', type=int, default=0)
-            player.skywars_team_wins = request.form.get('skywars_team_wins', type=int, default=0)
-            player.skywars_mega_wins = request.form.get('skywars_mega_wins', type=int, default=0)
-            player.skywars_mini_wins = request.form.get('skywars_mini_wins', type=int, default=0)
-            player.skywars_ranked_wins = request.form.get('skywars_ranked_wins', type=int, default=0)
-            player.skywars_kills = request.form.get('skywars_kills', type=int, default=0)
-            player.skywars_solo_kills = request.form.get('skywars_solo_kills', type=int, default=0)
-            player.skywars_team_kills = request.form.get('skywars_team_kills', type=int, default=0)
-            player.skywars_mega_kills = request.form.get('skywars_mega_kills', type=int, default=0)
-            player.skywars_mini_kills = request.form.get('skywars_mini_kills', type=int, default=0)
-            player.skywars_ranked_kills = request.form.get('skywars_ranked_kills', type=int, default=0)
-
-        elif gamemode == 'sumo':
-            player.sumo_games_played = request.form.get('sumo_games_played', type=int, default=0)
-            player.sumo_monthly_games = request.form.get('sumo_monthly_games', type=int, default=0)
-            player.sumo_daily_games = request.form.get('sumo_daily_games', type=int, default=0)
-            player.sumo_deaths = request.form.get('sumo_deaths', type=int, default=0)
-            player.sumo_monthly_deaths = request.form.get('sumo_monthly_deaths', type=int, default=0)
-            player.sumo_daily_deaths = request.form.get('sumo_daily_deaths', type=int, default=0)
-            player.sumo_wins = request.form.get('sumo_wins', type=int, default=0)
-            player.sumo_monthly_wins = request.form.get('sumo_monthly_wins', type=int, default=0)
-            player.sumo_daily_wins = request.form.get('sumo_daily_wins', type=int, default=0)
-            player.sumo_losses = request.form.get('sumo_losses', type=int, default=0)
-            player.sumo_monthly_losses = request.form.get('sumo_monthly_losses', type=int, default=0)
-            player.sumo_daily_losses = request.form.get('sumo_daily_losses', type=int, default=0)
-            player.sumo_kills = request.form.get('sumo_kills', type=int, default=0)
-            player.sumo_monthly_kills = request.form.get('sumo_monthly_kills', type=int, default=0)
-            player.sumo_daily_kills = request.form.get('sumo_daily_kills', type=int, default=0)
-            player.sumo_winstreak = request.form.get('sumo_winstreak', type=int, default=0)
-            player.sumo_monthly_winstreak = request.form.get('sumo_monthly_winstreak', type=int, default=0)
-            player.sumo_daily_winstreak = request.form.get('sumo_daily_winstreak', type=int, default=0)
-            player.sumo_best_winstreak = request.form.get('sumo_best_winstreak', type=int, default=0)
-            player.sumo_monthly_best_winstreak = request.form.get('sumo_monthly_best_winstreak', type=int, default=0)
-            player.sumo_daily_best_winstreak = request.form.get('sumo_daily_best_winstreak', type=int, default=0)
+        elif gamemode in GameModeManager.LEGACY_PLAYER_COLUMNS:
+            db.session.flush()
+            GameModeManager.update_from_legacy_fields(player.id, gamemode, {
+                field: request.form.get(field, type=int, default=0)
+                for field in GameModeManager.LEGACY_PLAYER_COLUMNS[gamemode]
+            })
 
         # Handle skin settings
         skin_type = request.form.get('skin_type', 'auto')
@@ -1847,6 +1822,7 @@ def import_database():
             db.session.commit()
             # Очистка кэша статистики
             Player.clear_statistics_cache()
+            ShopCatalog.invalidate()
             flash('База данных успешно импортирована!', 'success')
 
         except Exception as e:
@@ -2063,7 +2039,9 @@ def quests():
         current_player = Player.query.filter_by(nickname=player_nickname).first()
         if current_player:
             # Get player quest progress
-            player_quests = PlayerQuest.query.filter_by(player_id=current_player.id).all()
+            player_quests = PlayerQuest.query.options(
+                joinedload(PlayerQuest.quest)
+            ).filter_by(player_id=current_player.id).all()
             for pq in player_quests:
                 player_progress[pq.quest_id] = pq
 
@@ -2212,10 +2190,13 @@ def complete_quest(quest_id):
             player_quest.completed_at = datetime.utcnow()
             player_quest.current_progress = quest.target_value
 
-            # Award all rewards
+            # Award all rewards; active boosters scale coins and reputation
+            coins, reputation = PlayerActiveBooster.boost_rewards(
+                sample_player.id, quest.reward_coins, quest.reward_reputation
+            )
             sample_player.experience += quest.reward_xp
-            sample_player.coins += quest.reward_coins
-            sample_player.reputation += quest.reward_reputation
+            sample_player.coins += coins
+            sample_player.reputation += reputation
             sample_player.karma += quest.reward_karma
 
             db.session.commit()
@@ -2226,10 +2207,10 @@ def complete_quest(quest_id):
             rewards = []
             if quest.reward_xp > 0:
                 rewards.append(f"{quest.reward_xp} XP")
-            if quest.reward_coins > 0:
-                rewards.append(f"{quest.reward_coins} койнов")
-            if quest.reward_reputation > 0:
-                rewards.append(f"{quest.reward_reputation} репутации")
+            if coins > 0:
+                rewards.append(f"{coins} койнов")
+            if reputation > 0:
+                rewards.append(f"{reputation} репутации")
 
             reward_text = ", ".join(rewards) if rewards else "награды"
             flash(f'Квест "{quest.title}" выполнен! Получено: {reward_text}!', 'success')
@@ -2352,8 +2333,7 @@ def init_demo():
             GameMode.create_default_modes()
 
         # Update quest progress for all players
-        for player in players:
-            PlayerQuest.update_player_quest_progress(player)
+        PlayerQuest.evaluate_progress_batch(players)
 
         # Очистка кэша статистики
         Player.clear_statistics_cache()
@@ -2648,24 +2628,22 @@ def shop():
     if player_nickname:
         current_player = Player.query.filter_by(nickname=player_nickname).first()
 
+    catalog = ShopCatalog.get()
+
     # Initialize default shop items if none exist
-    if ShopItem.query.count() == 0:
+    if not catalog['items'] and ShopItem.query.count() == 0:
         ShopItem.create_default_items()
+        ShopCatalog.invalidate()
+        catalog = ShopCatalog.get()
 
-    # Get all active shop items grouped by category (excluding themes - they're free)
-    categories = {
-        'title': ShopItem.query.filter_by(category='title', is_active=True).all(),
-        'booster': ShopItem.query.filter_by(category='booster', is_active=True).all(),
-        'custom_role': ShopItem.query.filter_by(category='custom_role', is_active=True).all(),
-        'emoji_slot': ShopItem.query.filter_by(category='emoji_slot', is_active=True).all(),
-        'gradient': ShopItem.query.filter_by(category='gradient', is_active=True).all()
-    }
+    # Ownership is loaded once, purchase checks then run against the snapshot
+    owned_item_ids = ShopCatalog.get_owned_item_ids(current_player.id) if current_player else set()
 
-    # Check purchase status and availability for each item
+    # Get all active shop items grouped by category (excluding themes - they're free)
     shop_data = {}
-    for category, items in categories.items():
+    for category in ShopCatalog.PAGE_CATEGORIES:
         shop_data[category] = []
-        for item in items:
+        for item in catalog['by_category'].get(category, []):
             item_data = {
                 'item': item,
                 'can_purchase': True,
@@ -2674,16 +2652,10 @@ def shop():
             }
 
             if current_player:
-                can_purchase, error_msg = item.can_purchase(current_player)
+                can_purchase, error_msg = ShopItem.check_purchase_rules(item, current_player, owned_item_ids)
                 item_data['can_purchase'] = can_purchase
                 item_data['purchase_error'] = error_msg
-
-                # Check if already purchased
-                existing_purchase = ShopPurchase.query.filter_by(
-                    player_id=current_player.id,
-                    item_id=item.id
-                ).first()
-                item_data['already_purchased'] = bool(existing_purchase)
+                item_data['already_purchased'] = item.id in owned_item_ids
             else:
                 item_data['can_purchase'] = False
                 item_data['purchase_error'] = "Требуется авторизация"
@@ -2717,40 +2689,17 @@ def purchase_item():
         if not item or not item.is_active:
             return jsonify({'success': False, 'error': 'Товар не найден или недоступен'}), 404
 
-        # Check if can purchase
-        can_purchase, error_msg = item.can_purchase(player)
-        if not can_purchase:
-            return jsonify({'success': False, 'error': error_msg}), 400
-
-        # Deduct currency
-        player.coins -= item.price_coins
-        player.reputation -= item.price_reputation
-
-        # Create purchase record
-        purchase = ShopPurchase(
-            player_id=player.id,
-            item_id=item.id,
-            price_paid_coins=item.price_coins,
-            price_paid_reputation=item.price_reputation
+        # Debit currency and record the purchase atomically; boosters are
+        # used right away, everything else goes into the inventory
+        success, error_msg, purchase = ShopPurchase.purchase(
+            player, item, add_to_inventory=item.category != 'booster'
         )
-        db.session.add(purchase)
-
-        # Add item to inventory
-        from models import InventoryItem
-        inventory_item = InventoryItem(
-            player_id=player.id,
-            item_id=item.id,
-            status='unused',
-            quantity=1
-        )
-        db.session.add(inventory_item)
+        if not success:
+            return jsonify({'success': False, 'error': error_msg}), 400
 
         # For immediate effect items (boosters), use them right away
         if item.category == 'booster':
-            success, message = item.apply_item_effect(player)
-            if success:
-                inventory_item.status = 'used'
-                inventory_item.used_at = datetime.utcnow()
+            item.apply_item_effect(player)
 
         db.session.commit()
 
@@ -2855,6 +2804,7 @@ def admin_add_shop_item():
 
         db.session.add(shop_item)
         db.session.commit()
+        ShopCatalog.invalidate()
 
         flash(f'Товар "{display_name}" успешно добавлен!', 'success')
 
@@ -2875,6 +2825,7 @@ def admin_toggle_shop_item(item_id):
         item = ShopItem.query.get_or_404(item_id)
         item.is_active = not item.is_active
         db.session.commit()
+        ShopCatalog.invalidate()
 
         status = "активирован" if item.is_active else "деактивирован"
         flash(f'Товар "{item.display_name}" {status}!', 'success')
@@ -2936,6 +2887,7 @@ def admin_edit_shop_item(item_id):
                 return redirect(url_for('admin_shop'))
 
         db.session.commit()
+        ShopCatalog.invalidate()
         flash(f'Товар "{display_name}" успешно обновлен!', 'success')
 
     except Exception as e:
@@ -2960,6 +2912,7 @@ def admin_delete_shop_item(item_id):
 
         db.session.delete(item)
         db.session.commit()
+        ShopCatalog.invalidate()
 
         flash(f'Товар "{name}" удален!', 'success')
 
@@ -3065,13 +3018,14 @@ def admin_player_quests():
         flash('Доступ запрещен!', 'error')
         return redirect(url_for('login'))
 
-    players = Player.query.all()
     player_quests = {}
 
-    for player in players:
-        quests = PlayerQuest.query.filter_by(player_id=player.id).all()
-        if quests:
-            player_quests[player] = quests
+    all_player_quests = PlayerQuest.query.options(
+        joinedload(PlayerQuest.player),
+        joinedload(PlayerQuest.quest)
+    ).order_by(PlayerQuest.player_id).all()
+    for player_quest in all_player_quests:
+        player_quests.setdefault(player_quest.player, []).append(player_quest)
 
     return render_template('admin_player_quests.html', player_quests=player_quests)
 
@@ -3190,10 +3144,13 @@ def assign_achievement():
         )
         db.session.add(player_achievement)
 
-        # Award rewards
+        # Award rewards; active boosters scale coins and reputation
+        coins, reputation = PlayerActiveBooster.boost_rewards(
+            player.id, achievement.reward_coins, achievement.reward_reputation
+        )
         player.experience += achievement.reward_xp
-        player.coins += achievement.reward_coins
-        player.reputation += achievement.reward_reputation
+        player.coins += coins
+        player.reputation += reputation
 
         db.session.commit()
 
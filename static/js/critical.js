@@ -48,7 +48,8 @@ function initializeBasicLeaderboard() {
 function loadFullFeatures() {
     // Load full JavaScript functionality after initial load
     const script = document.createElement('script');
-    script.src = '/static/js/main.js';
+    // Fingerprinted URL from base.html when assets are built
+    script.src = window.MAIN_JS_URL || '/static/js/main.js';
     script.onload = function() {
         console.log('🚀 Full features loaded');
     };
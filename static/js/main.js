@@ -1727,11 +1727,11 @@ function initializeAvatarPopups() {
         const popup = document.createElement('div');
         popup.className = 'avatar-popup data-popup';
         
-        const skinUrl = data.minecraft_skin_url || `https://mc-heads.net/avatar/${data.nickname || 'steve'}/64`;
+        const skinUrl = data.minecraft_skin_url || `/avatar/${data.nickname || 'steve'}/64`;
         
         popup.innerHTML = `
             <div class="popup-header">
-                <img src="${skinUrl}" alt="Скин ${data.nickname}" class="popup-avatar" onerror="this.src='https://mc-heads.net/avatar/steve/64'">
+                <img src="${skinUrl}" alt="Скин ${data.nickname}" class="popup-avatar" onerror="this.src='/avatar/steve/64'">
                 <div class="popup-player-info">
                     <h4 class="popup-nickname">${escapeHtml(data.nickname || 'Неизвестно')}</h4>
                     <span class="popup-level">Уровень ${data.level || 1}</span>
@@ -2752,7 +2752,7 @@ function renderGamemodeLeaderboard(players, gamemode) {
 
                 <div class="player-cell">
                     <div class="player-avatar">
-                        <img src="${player.minecraft_skin_url || 'https://mc-heads.net/avatar/steve/48'}"
+                        <img src="${player.minecraft_skin_url || '/avatar/steve/64'}"
                              alt="${player.nickname}" class="avatar-img">
                     </div>
                     <div class="player-info">
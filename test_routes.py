@@ -6,7 +6,12 @@ import os
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# The engine is created when app is imported, so the test database has to be
+# chosen before that; otherwise tests run against instance/bedwars_leaderboard.db
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
 from app import app, db
+from cache import Cache
 from models import Player
 
 @pytest.fixture
@@ -20,6 +25,9 @@ def client():
             db.create_all()
             yield client
             db.drop_all()
+            Player.clear_statistics_cache()
+            # Keyed by row ids, which the next test's fresh database reuses
+            Cache.clear_pattern('*')
 
 @pytest.fixture
 def sample_player():
@@ -130,6 +138,416 @@ def test_api_stats(client):
     assert 'stats' in data
     assert 'charts' in data
 
+def test_quest_progress_batch(client, sample_player):
+    """Test batched quest evaluation completes quests and awards rewards"""
+    from models import Quest, PlayerQuest
+    quest = Quest(title='Batch', description='Batch quest', type='kills',
+                  target_value=50, reward_coins=100)
+    db.session.add(quest)
+    db.session.flush()
+    db.session.add(PlayerQuest(player_id=sample_player.id, quest_id=quest.id,
+                               is_accepted=True, baseline_value=40))
+    db.session.commit()
+
+    coins_before = sample_player.coins
+    completed = PlayerQuest.evaluate_progress_batch([sample_player])
+
+    assert completed == {sample_player.id: [quest.id]}
+    assert sample_player.coins == coins_before + 100
+    player_quest = PlayerQuest.query.filter_by(quest_id=quest.id).first()
+    assert player_quest.is_completed
+    assert player_quest.current_progress == 60
+
+def test_shop_catalog_invalidation(client):
+    """Test shop catalog snapshot is rebuilt only after invalidation"""
+    from models import ShopItem, ShopCatalog
+    ShopCatalog.invalidate()
+    before = len(ShopCatalog.get()['items'])
+
+    db.session.add(ShopItem(name='catalog_test_item', display_name='Catalog Test',
+                            description='Test item', category='booster'))
+    db.session.commit()
+    assert len(ShopCatalog.get()['items']) == before
+
+    ShopCatalog.invalidate()
+    assert len(ShopCatalog.get()['items']) == before + 1
+
+def test_atomic_purchase_guards_balance_and_ownership(client, sample_player):
+    """Test purchases debit atomically and non-consumables are bought once"""
+    from models import ShopItem, ShopPurchase
+    sample_player.coins = 150
+    item = ShopItem(name='atomic_title', display_name='Atomic', description='Title',
+                    category='title', price_coins=100)
+    db.session.add(item)
+    db.session.commit()
+
+    success, _, purchase = ShopPurchase.purchase(sample_player, item)
+    assert success and purchase.is_permanent
+    db.session.commit()
+    assert sample_player.coins == 50
+
+    sample_player.coins = 500
+    db.session.commit()
+    success, message, _ = ShopPurchase.purchase(sample_player, item)
+    assert not success and message == "Уже приобретено"
+    assert sample_player.coins == 500
+
+    item.category = 'booster'
+    item.price_coins = 1000
+    db.session.commit()
+    success, message, _ = ShopPurchase.purchase(sample_player, item)
+    assert not success and message == "Недостаточно койнов"
+    assert sample_player.coins == 500
+
+def test_booster_timeline_cache(client, sample_player):
+    """Test booster multipliers are cached until a booster is added"""
+    from models import PlayerActiveBooster
+    PlayerActiveBooster.invalidate_booster_timeline(sample_player.id)
+    assert PlayerActiveBooster.get_coins_multiplier(sample_player.id) == 1.0
+
+    PlayerActiveBooster.add_booster(sample_player.id, 'active_mega_booster', 2.0, 30)
+    assert PlayerActiveBooster.get_coins_multiplier(sample_player.id) == 2.0
+    assert PlayerActiveBooster.get_reputation_multiplier(sample_player.id) == 2.0
+
+    timeline = PlayerActiveBooster.get_booster_timeline(sample_player.id)
+    assert timeline['next_expiry'] is not None
+
+def test_shop_booster_scales_quest_rewards(client, sample_player):
+    """Test a bought booster feeds the cached multiplier used for rewards"""
+    import json
+    from models import ShopItem, PlayerActiveBooster, Quest, PlayerQuest
+    item = ShopItem(name='coin_booster_test', display_name='Coins x2', description='Booster',
+                    category='booster', item_data=json.dumps({'type': 'coin_multiplier',
+                                                              'multiplier': 2.0, 'duration_hours': 1}))
+    db.session.add(item)
+    db.session.commit()
+    assert PlayerActiveBooster.get_coins_multiplier(sample_player.id) == 1.0
+
+    success, _ = item.apply_item_effect(sample_player)
+    assert success
+    assert PlayerActiveBooster.get_coins_multiplier(sample_player.id) == 2.0
+
+    item.apply_item_effect(sample_player)  # a second purchase extends the same booster
+    boosters = PlayerActiveBooster.get_active_boosters(sample_player.id)
+    assert [b.booster_type for b in boosters] == ['active_coins_booster']
+
+    quest = Quest(title='Boosted', description='Boosted quest', type='kills',
+                  target_value=1, reward_coins=100, reward_reputation=10)
+    db.session.add(quest)
+    db.session.flush()
+    db.session.add(PlayerQuest(player_id=sample_player.id, quest_id=quest.id,
+                               is_accepted=True, baseline_value=0))
+    db.session.commit()
+
+    coins_before, reputation_before = sample_player.coins, sample_player.reputation
+    PlayerQuest.evaluate_progress_batch([sample_player])
+    assert sample_player.coins == coins_before + 200
+    assert sample_player.reputation == reputation_before + 10
+
+def test_inventory_counters_and_api(client, sample_player):
+    """Test inventory upserts into one row and the API reads it back"""
+    from models import ShopItem, InventoryItem
+    item = ShopItem(name='inventory_pack', display_name='Pack', description='Coins pack',
+                    category='coins', item_data='{"effect_value": 50}')
+    db.session.add(item)
+    db.session.commit()
+
+    sample_player.add_inventory_item('coins', item.id, 2)
+    sample_player.add_inventory_item('coins', item.id)
+    db.session.commit()
+    assert InventoryItem.query.filter_by(player_id=sample_player.id).count() == 1
+    assert sample_player.get_inventory_item_count('coins', item.id) == 3
+
+    inventory_item = InventoryItem.query.filter_by(player_id=sample_player.id).first()
+    success, _ = inventory_item.use_item()
+    assert success
+    assert sample_player.coins == 50
+    assert sample_player.get_inventory() == {'coins': {str(item.id): 2}}
+
+    # Titles are applied at purchase time and only leave a ShopPurchase row
+    from models import ShopPurchase
+    title = ShopItem(name='inventory_title', display_name='Title', description='Title', category='title')
+    db.session.add(title)
+    db.session.flush()
+    db.session.add(ShopPurchase(player_id=sample_player.id, item_id=title.id, is_permanent=True))
+    db.session.commit()
+
+    response = client.get(f'/api/player/{sample_player.id}/inventory')
+    data = response.get_json()
+    assert data['inventory'] == {'coins': {str(item.id): 2}, 'title': {str(title.id): 1}}
+    assert [entry['purchased_at'] is not None for entry in data['items']] == [False, True]
+    assert data['level'] == sample_player.level
+
+def test_ascend_global_ranks_batch(client):
+    """Test gamemode ranks are recomputed for every row with shared ties"""
+    from models import ASCENDData
+    scores = {'A': 90, 'B': 70, 'C': 90, 'D': 50}
+    rows = {}
+    for nickname, score in scores.items():
+        player = Player(nickname=f'Rank{nickname}')
+        db.session.add(player)
+        db.session.flush()
+        rows[nickname] = ASCENDData(player_id=player.id, gamemode='bedwars', skill1_score=score,
+                                    skill2_score=score, skill3_score=score, skill4_score=score)
+        rows[nickname].update_tiers_from_scores()
+        db.session.add(rows[nickname])
+    db.session.commit()
+
+    ASCENDData.recompute_global_ranks(['bedwars'])
+    db.session.commit()
+    assert [rows[n].global_rank for n in 'ABCD'] == [1, 3, 1, 4]
+
+    # The pure-Python fallback must agree with the window function
+    for row in rows.values():
+        row.global_rank = None
+    db.session.commit()
+    original = ASCENDData._supports_window_functions
+    ASCENDData._supports_window_functions = staticmethod(lambda: False)
+    try:
+        ASCENDData.recompute_global_ranks(['bedwars'])
+    finally:
+        ASCENDData._supports_window_functions = original
+    db.session.commit()
+    assert [rows[n].global_rank for n in 'ABCD'] == [1, 3, 1, 4]
+
+def test_ascend_leaderboard_read_is_clean(client, sample_player):
+    """Test the ASCEND leaderboard uses the stored average and never dirties rows"""
+    from models import ASCENDData
+    ascend = ASCENDData(player_id=sample_player.id, gamemode='bedwars', skill1_score=80,
+                        skill2_score=90, skill3_score=70, skill4_score=60)
+    ascend.update_tiers_from_scores()
+    db.session.add(ascend)
+    db.session.commit()
+    assert ascend.avg_score == 75
+
+    response = client.get('/api/global-leaderboard?gamemode=bedwars')
+    data = response.get_json()
+    assert data['leaderboard'][0]['average_score'] == 75
+    assert data['leaderboard'][0]['ascend']['overall_tier'] == 'B+'
+    assert not db.session.dirty
+
+def test_ascend_bulk_import(client, sample_player):
+    """Test a CSV evaluation session is validated, upserted and ranked in one go"""
+    import io
+    from models import ASCENDData, ASCENDHistory, Player
+    other = Player(nickname='BulkPlayer')
+    db.session.add(other)
+    db.session.commit()
+
+    response = client.post('/api/ascend/bulk-import', json=[])
+    assert response.status_code == 403
+
+    with client.session_transaction() as sess:
+        sess['is_admin'] = True
+
+    response = client.post('/api/ascend/bulk-import', json=[{'nickname': 'BulkPlayer'}])
+    assert response.status_code == 400
+
+    bad_csv = ('nickname,gamemode,skill1_score\nNobody,bedwars,50\nBulkPlayer,bedwars,150\nBulkPlayer,bedwars,inf\n'
+               'BulkPlayer,notamode,50\n')
+    response = client.post('/api/ascend/bulk-import', data={'file': (io.BytesIO(bad_csv.encode()), 'session.csv')})
+    assert response.status_code == 400
+    errors = response.get_json()['errors']
+    assert [e['row'] for e in errors] == [1, 2, 3, 4]
+    assert errors[3]['error'] == 'Unknown gamemode: notamode'
+    assert ASCENDData.query.count() == 0
+
+    csv_data = ('nickname,gamemode,skill1_score,skill2_score,skill3_score,skill4_score\n'
+                f'{sample_player.nickname},bedwars,80,80,80,80\n'
+                'BulkPlayer,bedwars,60,60,60,60\n')
+    response = client.post('/api/ascend/bulk-import', data={'file': (io.BytesIO(csv_data.encode()), 'session.csv')})
+    data = response.get_json()
+    assert data['success'] and data['created'] == 2 and data['history'] == 2
+
+    response = client.post('/api/ascend/bulk-import', json={'players': [
+        {'player_id': other.id, 'gamemodes': {'bedwars': {'skill1_score': 100, 'skill2_score': 100}}}
+    ]})
+    data = response.get_json()
+    assert data['success'] and data['updated'] == 1
+
+    rows = {row.player_id: row for row in ASCENDData.query.filter_by(gamemode='bedwars')}
+    assert rows[other.id].avg_score == 80
+    assert rows[other.id].previous_tier is not None
+    assert ASCENDHistory.query.filter_by(player_id=other.id).count() == 2
+    assert {rows[sample_player.id].global_rank, rows[other.id].global_rank} == {1}
+
+def test_ascend_history_compaction(client, sample_player):
+    """Test old history collapses into monthly summaries while recent detail stays"""
+    from datetime import datetime
+    from models import ASCENDData, ASCENDHistory
+    ascend = ASCENDData(player_id=sample_player.id, gamemode='bedwars', evaluator_name='Eval',
+                        skill1_score=50, skill2_score=50, skill3_score=50, skill4_score=50)
+    ascend.update_tiers_from_scores()
+
+    now = datetime(2026, 6, 15)
+    for created_at, score in [(datetime(2026, 1, 3), 40), (datetime(2026, 1, 20), 60),
+                              (datetime(2026, 2, 10), 70), (datetime(2026, 6, 1), 80)]:
+        old_scores = [ascend.skill1_score] * 4
+        old_tier = ascend.overall_tier
+        ascend.skill1_score = ascend.skill2_score = ascend.skill3_score = ascend.skill4_score = score
+        ascend.update_tiers_from_scores()
+        db.session.add(ASCENDHistory.from_change(ascend, old_tier=old_tier, old_scores=old_scores,
+                                                 created_at=created_at))
+    db.session.commit()
+
+    assert ASCENDHistory.compact(now=now) == (2, 3)
+    db.session.commit()
+    assert ASCENDHistory.compact(now=now) == (0, 0)
+
+    rows = ASCENDHistory.query.order_by(ASCENDHistory.created_at).all()
+    january = rows[0].to_dict()
+    assert january['is_summary'] and january['entry_count'] == 2
+    assert january['old_scores']['skill1'] == 50 and january['new_scores']['skill1'] == 60
+    assert january['created_at'].startswith('2026-01-01')
+    assert [row.is_summary for row in rows] == [True, True, False]
+
+    response = client.get(f'/api/player/{sample_player.id}/ascend-history?gamemode=bedwars')
+    history = response.get_json()['history']
+    assert history[0]['new_scores']['skill1'] == 80 and not history[0]['is_summary']
+
+def test_gamemode_stats_live_in_mode_tables(client, sample_player):
+    """Test admin writes and leaderboard reads go through the per-mode tables"""
+    from models import GameModeManager, KitPvPStats
+    with client.session_transaction() as sess:
+        sess['is_admin'] = True
+
+    client.post('/add', data={'nickname': 'KitPlayer', 'gamemode': 'kitpvp',
+                              'kitpvp_kills': 40, 'kitpvp_deaths': 10, 'kitpvp_games': 5})
+    stats = KitPvPStats.query.one()
+    assert (stats.kills, stats.deaths, stats.games_played) == (40, 10, 5)
+    assert not hasattr(sample_player, 'kitpvp_kills')
+
+    data = client.get('/api/gamemode-leaderboard?gamemode=kitpvp').get_json()
+    assert data['players'][0]['nickname'] == 'KitPlayer'
+    assert data['players'][0]['kd_ratio'] == 4.0
+
+    assert sample_player.get_gamemode_stats('sumo')['wins'] == 0
+    assert GameModeManager.get_top_player('kitpvp', 'kills').nickname == 'KitPlayer'
+
+def test_gamemode_leaderboard_keyset_pages(client):
+    """Test registry-driven leaderboards page by cursor and resolve roles without loading players"""
+    from models import AdminCustomRole, PlayerAdminRole
+    players = [Player(nickname=f'Page{n}', experience=xp, kills=n, deaths=1)
+               for n, xp in enumerate([900, 500, 500, 100], 1)]
+    db.session.add_all(players)
+    db.session.commit()
+    role = AdminCustomRole(name='Moderator')
+    db.session.add(role)
+    db.session.commit()
+    db.session.add(PlayerAdminRole(player_id=players[2].id, role_id=role.id))
+    db.session.commit()
+
+    first = client.get('/api/gamemode-leaderboard?gamemode=bedwars&limit=2').get_json()
+    assert [p['nickname'] for p in first['players']] == ['Page1', 'Page2']
+    assert first['players'][0]['kd_ratio'] == 1 and first['players'][0]['level'] >= 1
+
+    second = client.get(f"/api/gamemode-leaderboard?gamemode=bedwars&limit=2&cursor={first['next_cursor']}").get_json()
+    assert [(p['rank'], p['nickname']) for p in second['players']] == [(3, 'Page3'), (4, 'Page4')]
+    assert second['players'][0]['role'] == 'Moderator'
+    assert second['next_cursor'] is None
+
+    assert client.get('/api/gamemode-leaderboard?gamemode=bedwars&cursor=bad').status_code == 400
+
+    # Ranks come from the database and cursor pages never enter the cache
+    from cache import _memory_cache
+    before = set(_memory_cache)
+    assert client.get('/api/gamemode-leaderboard?gamemode=bedwars&cursor=999999:500:0').status_code == 400
+    forged = client.get('/api/gamemode-leaderboard?gamemode=bedwars&limit=2&cursor=500:0').get_json()
+    assert [(p['rank'], p['nickname']) for p in forged['players']] == [(2, 'Page2'), (3, 'Page3')]
+    assert client.get('/api/gamemode-leaderboard?gamemode=bedwars&limit=-5').get_json()['total'] == 1
+    assert set(_memory_cache) == before
+
+def test_period_leaderboards_from_rollups(client, sample_player):
+    """Test stat writes become hourly events that roll up into period leaderboards"""
+    from datetime import datetime, timedelta
+    from models import GameModeManager, StatEvent, StatRollup
+    GameModeManager.set_player_stats(sample_player.id, 'sumo', wins=1, games_played=1)
+    db.session.commit()
+    assert StatEvent.query.count() == 0  # new rows are a baseline, not gains
+
+    sample_player.wins += 5
+    GameModeManager.set_player_stats(sample_player.id, 'sumo', wins=4, games_played=5)
+    db.session.commit()
+
+    events = {(e.gamemode, e.stat): e.delta for e in StatEvent.query.all()}
+    assert events[('bedwars', 'wins')] == 5
+    assert events[('sumo', 'wins')] == 3
+
+    # Fresh events wait out the lag in case a lower id is still uncommitted
+    assert StatRollup.refresh() == 0
+    later = datetime.utcnow() + timedelta(seconds=StatRollup.FOLD_LAG_SECONDS + 1)
+    assert StatRollup.refresh(now=later) == len(events)
+    db.session.commit()
+    assert StatRollup.refresh(now=later) == 0
+
+    sample_player.wins += 2
+    db.session.commit()
+    StatRollup.refresh(now=later)
+    db.session.commit()
+
+    for period in StatRollup.PERIODS:
+        board = StatRollup.get_leaderboard('bedwars', 'wins', period)
+        assert board['players'][0]['value'] == 7
+
+    data = client.get('/api/period-leaderboard?gamemode=sumo&stat=wins&period=month').get_json()
+    assert data['players'][0]['nickname'] == sample_player.nickname
+    assert client.get('/api/period-leaderboard?period=year').status_code == 400
+
+def test_player_history_downsampling(client, sample_player):
+    """Test counter changes become snapshots that downsample by age"""
+    from datetime import datetime, timedelta
+    from models import PlayerStatSnapshot
+    sample_player.kills += 10
+    db.session.commit()
+    sample_player.coins = 5  # not a tracked counter
+    db.session.commit()
+
+    data = client.get(f'/api/player/{sample_player.id}/history').get_json()
+    assert data['kills'] == [100, 110]
+    assert len(data['timestamps']) == 2
+
+    now = datetime(2026, 6, 30)
+    old = [now - timedelta(days=10, minutes=m) for m in (50, 40, 10)] + [now - timedelta(days=200, hours=h) for h in (1, 3)]
+    db.session.add_all([PlayerStatSnapshot(player_id=sample_player.id, taken_at=t, kills=i)
+                        for i, t in enumerate(old)])
+    db.session.commit()
+
+    assert PlayerStatSnapshot.downsample(now=now) == 3
+    db.session.commit()
+    resolutions = sorted(r for (r,) in db.session.query(PlayerStatSnapshot.resolution).filter(
+        PlayerStatSnapshot.taken_at < now - timedelta(days=7)))
+    assert resolutions == ['day', 'hour']
+
+def test_leaderboard_rank_deltas(client):
+    """Test rank changes are diffed against the previous day's snapshot"""
+    from datetime import datetime, timedelta
+    from models import LeaderboardSnapshot
+    players = [Player(nickname=f'Delta{n}', experience=xp) for n, xp in enumerate([300, 200, 100])]
+    db.session.add_all(players)
+    db.session.commit()
+    LeaderboardSnapshot.take(['experience'], now=datetime.utcnow() - timedelta(days=1, hours=1))
+    db.session.commit()
+
+    players[2].experience = 1000
+    newcomer = Player(nickname='DeltaNew', experience=250)
+    db.session.add(newcomer)
+    db.session.commit()
+
+    data = client.get('/api/leaderboard?sort=experience&include_delta=1').get_json()
+    deltas = {p['nickname']: p['rank_delta'] for p in data['players']}
+    assert deltas == {'Delta2': 2, 'Delta0': -1, 'DeltaNew': None, 'Delta1': -2}
+    assert 'rank_delta' not in client.get('/api/leaderboard').get_json()['players'][0]
+
+    response = client.get('/?sort=experience')
+    assert '▲2' in response.get_data(as_text=True)
+
+    now = datetime(2026, 6, 15, 12)
+    for hours in (1, 2, 24 * 5, 24 * 5 + 1, 24 * 40):
+        LeaderboardSnapshot.take(['kills'], now=now - timedelta(hours=hours))
+    db.session.commit()
+    assert LeaderboardSnapshot.prune(now=now) == 2
+    db.session.commit()
+
 # Performance test
 def test_index_page_performance(client):
     """Test that main page loads reasonably fast"""
@@ -145,3 +563,215 @@ def test_index_page_performance(client):
 if __name__ == '__main__':
     # Run tests if script is executed directly
     pytest.main([__file__])
+
+def test_leaderboard_pages_invalidate_by_range(client):
+    """Test materialized leaderboard pages are dropped only when a write touches their range"""
+    from cache import LeaderboardPageCache
+    db.session.add_all([Player(nickname=f'Page{n}', experience=1000 - n * 100) for n in range(6)])
+    db.session.commit()
+
+    first = Player.get_leaderboard_page('experience', limit=2, offset=0)
+    Player.get_leaderboard_page('experience', limit=2, offset=2)
+    Player.get_leaderboard_page('experience', limit=2, offset=4)
+    assert [row['nickname'] for row in first] == ['Page0', 'Page1']
+
+    # 600 -> 650 stays inside the last page's range
+    tail = Player.query.filter_by(nickname='Page4').first()
+    tail.experience = 650
+    db.session.commit()
+    assert LeaderboardPageCache.get('experience', 2, 0) is first
+    assert LeaderboardPageCache.get('experience', 2, 2) is not None
+    assert LeaderboardPageCache.get('experience', 2, 4) is None
+
+    # Climbing to the top touches every page between old and new value
+    tail.experience = 2000
+    db.session.commit()
+    assert LeaderboardPageCache.get('experience', 2, 0) is None
+    assert LeaderboardPageCache.get('experience', 2, 2) is None
+    assert Player.get_leaderboard_page('experience', limit=2, offset=0)[0]['nickname'] == 'Page4'
+
+    # Display-only changes drop just the pages showing the player
+    Player.get_leaderboard_page('experience', limit=2, offset=4)
+    tail.nickname = 'Renamed'
+    db.session.commit()
+    assert LeaderboardPageCache.get('experience', 2, 0) is None
+    assert LeaderboardPageCache.get('experience', 2, 4) is not None
+
+    data = client.get('/api/leaderboard?sort=experience&limit=2').get_json()
+    assert [p['nickname'] for p in data['players']] == ['Renamed', 'Page0']
+    assert data['players'][0]['rank'] == 1
+
+def test_discord_links_require_bot_token(client, sample_player):
+    """Test Discord links are bot-only and relinking replaces the previous link"""
+    from models import DiscordLink
+    assert client.get('/api/discord/links').status_code == 403
+
+    app.config['BOT_API_TOKEN'] = 'secret'
+    try:
+        headers = {'X-Bot-Token': 'secret'}
+        response = client.post('/api/discord/link', headers=headers,
+                               json={'discord_user_id': '1234', 'nickname': 'testplayer'})
+        assert response.get_json()['link']['player_id'] == sample_player.id
+        client.post('/api/discord/link', headers=headers,
+                    json={'discord_user_id': '5678', 'player_id': sample_player.id})
+
+        links = client.get('/api/discord/links', headers=headers).get_json()['links']
+        assert [(link['discord_user_id'], link['nickname']) for link in links] == [('5678', 'TestPlayer')]
+        assert client.get('/api/discord/links', headers={'X-Bot-Token': 'wrong'}).status_code == 403
+        assert client.post('/api/discord/link', headers=headers, json={'discord_user_id': 'abc'}).status_code == 400
+        assert DiscordLink.query.count() == 1
+    finally:
+        app.config['BOT_API_TOKEN'] = None
+
+def test_players_bulk_stats(client, sample_player):
+    """Test bulk role stats by id or nickname and the streamed linked-player variant"""
+    import json
+    from models import DiscordLink
+    other = Player(nickname='Other', kills=10, deaths=0, beds_broken=3)
+    db.session.add(other)
+    DiscordLink.link('42', sample_player)
+    db.session.commit()
+
+    data = client.get(f'/api/players/bulk?ids={other.id}&nicknames=testplayer').get_json()
+    assert sorted(p['nickname'] for p in data['players']) == ['Other', 'TestPlayer']
+    assert {p['nickname']: p['kd_ratio'] for p in data['players']} == {'Other': 10, 'TestPlayer': 2.0}
+    assert client.get('/api/players/bulk').status_code == 400
+    assert client.get('/api/players/bulk?ids=x').status_code == 400
+
+    assert client.get('/api/players/bulk?linked=1').status_code == 403
+    with client.session_transaction() as sess:
+        sess['is_admin'] = True
+    response = client.get('/api/players/bulk?linked=1')
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert rows == [{'id': sample_player.id, 'nickname': 'TestPlayer', 'kills': 100, 'deaths': 50,
+                     'beds_broken': 0, 'kd_ratio': 2.0, 'discord_user_id': '42'}]
+
+def test_bot_event_queue(client, sample_player):
+    """Test stat, karma and embed changes queue bot events that the cursor acknowledges"""
+    from models import BotEvent
+    sample_player.kills += 5
+    sample_player.karma = 10
+    sample_player.karma = BotEvent.KARMA_WARNING_THRESHOLD - 1
+    db.session.commit()
+    sample_player.karma = -50
+    db.session.commit()
+
+    assert client.get('/api/bot/events').status_code == 403
+    with client.session_transaction() as sess:
+        sess['is_admin'] = True
+    client.post('/admin/send-embed', data={'title': 'Hi', 'description': 'There', 'channel_id': '99'})
+
+    data = client.get('/api/bot/events').get_json()
+    assert [event['type'] for event in data['events']] == ['stats_changed', 'admin_embed']
+    assert data['events'][1]['payload']['channel_id'] == '99'
+
+    sample_player.karma = 100
+    db.session.commit()
+    sample_player.karma = 5
+    db.session.commit()
+    delivered = [event['id'] for event in data['events']]
+    data = client.get(f"/api/bot/events?ack={','.join(map(str, delivered))}").get_json()
+    assert [(event['type'], event['payload']['karma']) for event in data['events']] == [('karma_low', 5)]
+    assert BotEvent.query.count() == 1
+
+    # A transaction that commits late can make a lower id visible after higher ones were delivered
+    late = BotEvent(id=min(delivered), event_type='admin_embed', payload='{}')
+    db.session.add(late)
+    db.session.commit()
+    data = client.get(f"/api/bot/events?ack={data['events'][0]['id']}").get_json()
+    assert [event['id'] for event in data['events']] == [late.id]
+
+def test_ascend_card_png_etag(client, sample_player):
+    """Test the ASCEND card renders as PNG and revalidates with its ETag"""
+    from models import ASCENDData
+    ascend = ASCENDData(player_id=sample_player.id, gamemode='bedwars', skill1_score=80,
+                        skill2_score=90, skill3_score=70, skill4_score=60)
+    ascend.update_tiers_from_scores()
+    db.session.add(ascend)
+    db.session.commit()
+
+    response = client.get(f'/api/ascend/{sample_player.id}/bedwars/card.png')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.data.startswith(b'\x89PNG')
+    etag = response.headers['ETag']
+
+    cached = client.get(f'/api/ascend/{sample_player.id}/bedwars/card.png', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert client.get(f'/api/ascend/{sample_player.id}/kitpvp/card.png').status_code == 404
+
+def test_players_karma_pages_and_changes(client, sample_player):
+    """Test the at-risk karma listing pages by cursor and the since mode returns only changed rows"""
+    sample_player.karma = 50
+    db.session.add_all([Player(nickname=name, karma=karma) for name, karma in (('LowA', -5), ('LowB', 3), ('LowC', 3))])
+    db.session.commit()
+
+    first = client.get('/api/players/karma?below=20&limit=2').get_json()
+    assert [p['nickname'] for p in first['players']] == ['LowA', 'LowB']
+    rest = client.get(f"/api/players/karma?below=20&limit=2&cursor={first['next_cursor']}").get_json()
+    assert [p['nickname'] for p in rest['players']] == ['LowC']
+    assert rest['next_cursor'] is None
+    assert client.get('/api/players/karma?cursor=bad').status_code == 400
+
+    checked_at = rest['checked_at']
+    assert client.get(f'/api/players/karma?since={checked_at}').get_json()['players'] == []
+    sample_player.karma = 10
+    Player.query.filter_by(nickname='LowA').one().karma = 40
+    db.session.add(Player(nickname='Newcomer'))  # starts at karma 0, below the threshold
+    db.session.commit()
+    changed = client.get(f'/api/players/karma?since={checked_at}').get_json()['players']
+    assert {p['nickname']: p['at_risk'] for p in changed} == {'TestPlayer': True, 'LowA': False, 'Newcomer': True}
+
+def test_avatar_proxy_disk_cache(client, tmp_path, monkeypatch):
+    """Test avatars are fetched once, resized, shared by content and revalidated by ETag"""
+    import time
+    from avatars import AVATAR_NAME_TTL, StubFetcher, avatar_store
+    fetcher = StubFetcher()
+    monkeypatch.setattr(avatar_store, 'root', str(tmp_path))
+    monkeypatch.setattr(avatar_store, 'fetcher', fetcher)
+
+    response = client.get('/avatar/Notch/64')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert 'max-age=86400' in response.headers['Cache-Control']
+    assert client.get('/avatar/notch/32').status_code == 200
+    assert fetcher.calls == ['notch']
+    assert len(list((tmp_path / 'blobs').iterdir())) == 3
+
+    cached = client.get('/avatar/Notch/64', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert client.get('/avatar/Notch/4096').status_code == 400
+    assert client.get('/avatar/Notch/65').status_code == 400
+    assert Player(nickname='Notch', skin_type='auto').minecraft_skin_url == '/avatar/Notch/128'
+
+    # Expired names go, and so do the blobs only they referenced
+    assert client.get('/avatar/Dinnerbone/64').status_code == 200
+    assert avatar_store.prune() == 0
+    assert avatar_store.prune(now=time.time() + AVATAR_NAME_TTL + 1) == 2 + 5
+    assert list((tmp_path / 'names').iterdir()) == []
+    assert list((tmp_path / 'blobs').iterdir()) == []
+    assert client.get('/avatar/Notch/64').status_code == 200
+
+def test_built_assets_fingerprinted_and_precompressed(client, tmp_path, monkeypatch):
+    """Test the asset build splits the stylesheet per page and serves gzip with immutable caching"""
+    import assets
+    monkeypatch.setattr(assets, 'DIST_DIR', str(tmp_path))
+    try:
+        manifest = assets.build()
+        assert manifest['js/main.js'].startswith('js/main.') and manifest['js/main.js'] != 'js/main.js'
+        assert 'css/pages/target_list.css' in manifest
+
+        page = client.get('/').get_data(as_text=True)
+        assert f"/assets/{manifest['css/base.css']}" in page
+        assert f"/assets/{manifest['js/critical.js']}" in page
+        assert '/static/css/style.css' not in page
+
+        response = client.get(f"/assets/{manifest['js/main.js']}", headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.mimetype in ('text/javascript', 'application/javascript')
+        assert 'immutable' in response.headers['Cache-Control']
+        assert client.get('/assets/manifest.json').status_code == 404
+    finally:
+        assets.reset_manifest()